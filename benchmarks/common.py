@@ -0,0 +1,86 @@
+"""Inputs shared by the benchmarks
+
+The benchmarks run on the input files of the tests (those of both test directories), copied to a directory of their
+own, so that the binary versions of text inputs (see `input_cache`) are not written next to the test inputs.
+
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).parents[1] / "tests"
+VERSIONS_INPUTS = TESTS_DIR / "cascade_test_versions_inputs"
+HUMAN_INPUTS = TESTS_DIR / "cascade_test_human_inputs"
+
+PARAMETERS = dict(
+    storm_file="StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
+    elevation_file="b3d_pt75_3284yrs_low-elevations.csv",
+    dune_file="pathways-dunes.npy",
+    parameter_file="barrier3d-default-parameters.yaml",
+    wave_height=1,
+    wave_period=7,
+    wave_asymmetry=0.8,
+    wave_angle_high_fraction=0.2,
+    sea_level_rise_rate=0.004,
+    sea_level_rise_constant=True,
+    background_erosion=0.0,
+    min_dune_growth_rate=0.55,
+    max_dune_growth_rate=0.95,
+    num_cores=1,
+    roadway_management_module=False,
+    alongshore_transport_module=False,
+    beach_nourishment_module=False,
+    community_economics_module=False,
+)
+
+# parameters of each configuration of the human dynamics modules
+ROADWAY = dict(
+    parameter_file="roadway-parameters.yaml",
+    roadway_management_module=True,
+    road_ele=1.2,
+    road_width=20,
+    road_setback=20,
+    dune_design_elevation=3.2,
+    dune_minimum_elevation=1.7,
+)
+NOURISHMENT = dict(
+    parameter_file="nourishment-parameters.yaml",
+    elevation_file="b3d_pt45_8750yrs_low-elevations.csv",
+    beach_nourishment_module=True,
+    dune_design_elevation=3.7,
+    nourishment_interval=10,
+    nourishment_volume=100,
+    overwash_filter=40,
+    overwash_to_dune=10,
+)
+COMMUNITY_ECONOMICS = dict(NOURISHMENT, community_economics_module=True)
+ALONGSHORE_TRANSPORT = dict(
+    parameter_file="ast-barrier3d-parameters.yaml", alongshore_transport_module=True
+)
+
+
+def copy_inputs():
+    """Copy the input files of the tests to a temporary directory
+
+    :return: temporary directory (remove it with `shutil.rmtree` when done)
+    """
+    datadir = Path(tempfile.mkdtemp(prefix="cascade-benchmark-"))
+    for source in (VERSIONS_INPUTS, HUMAN_INPUTS):
+        for path in source.iterdir():
+            if path.is_file():
+                shutil.copy(path, datadir)
+    return datadir
+
+
+def new_cascade(datadir, ny=1, nt=50, **kwds):
+    """A Cascade model of `ny` domains, initialized from the (copied) inputs in `datadir`"""
+    from cascade import Cascade
+
+    parameters = dict(PARAMETERS, **kwds)
+    return Cascade(
+        str(datadir) + "/",
+        name="benchmark",
+        alongshore_section_count=ny,
+        time_step_count=nt,
+        **parameters,
+    )
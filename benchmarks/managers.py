@@ -0,0 +1,91 @@
+"""Benchmarks of the kernels of the human dynamics modules, on synthetic Barrier3D domains [dam]
+
+Each kernel is timed on a domain the size of a single Barrier3D domain (50 dam alongshore) and on a domain ten times
+longer, as for a batch of domains.
+"""
+import numpy as np
+
+from cascade.beach_dune_manager import filter_overwash, resize_interior_domain
+from cascade.roadway_manager import bulldoze, rebuild_dunes, set_growth_parameters
+
+
+def _domains(length, width=30, seed=1973):
+    """Interior (cross-shore x alongshore) and dune (alongshore x cross-shore) domains of a barrier [dam]"""
+    rng = np.random.default_rng(seed)
+    interior = 0.1 + rng.uniform(0, 0.1, (width, length))
+    interior[-5:] = -0.3  # back-barrier bay
+    dunes = rng.uniform(0, 0.2, (length, 2))
+    return interior, dunes
+
+
+class RoadwayKernels:
+    """Kernels of the RoadwayManager"""
+
+    params = [50, 500]
+    param_names = ["length"]
+
+    def setup(self, length):
+        self.interior, self.dunes = _domains(length)
+        self.growthparam = np.random.default_rng(1973).uniform(0.55, 0.95, (1, length))
+        self.growthparam[0, ::3] = 0
+
+    def time_bulldoze(self, length):
+        bulldoze(
+            time_index=1,
+            xyz_interior_grid=self.interior.copy(),
+            yxz_dune_grid=self.dunes,
+            road_ele=1.2,
+            road_width=20,
+            road_setback=20,
+        )
+
+    def time_rebuild_dunes(self, length):
+        rebuild_dunes(self.dunes, max_dune_height=3.2, min_dune_height=1.7)
+
+    def time_set_growth_parameters(self, length):
+        set_growth_parameters(
+            self.dunes,
+            0.1,
+            self.growthparam,
+            original_growth_param=np.full_like(self.growthparam, 0.75),
+        )
+
+
+class BeachDuneKernels:
+    """Kernels of the BeachDuneManager"""
+
+    params = [50, 500]
+    param_names = ["length"]
+
+    def setup(self, length):
+        self.pre_storm_interior, self.dunes = _domains(length)
+        self.post_storm_interior = self.pre_storm_interior + np.random.default_rng(
+            1974
+        ).uniform(0, 0.02, self.pre_storm_interior.shape)
+        self.wider_post_storm_interior = np.vstack(
+            [self.post_storm_interior, np.full((3, length), -0.3)]
+        )
+
+    def time_filter_overwash(self, length):
+        filter_overwash(
+            overwash_filter=40,
+            overwash_to_dune=10,
+            post_storm_xyz_interior_grid=self.post_storm_interior,
+            pre_storm_xyz_interior_grid=self.pre_storm_interior,
+            post_storm_yxz_dune_grid=self.dunes,
+            artificial_maximum_dune_height=0.3,
+            sea_level=0,
+            barrier_length=length,
+            x_s=100,
+            x_t=50,
+            beach_width=3,
+            shoreface_depth=1,
+        )
+
+    def time_resize_interior_domain(self, length):
+        resize_interior_domain(
+            self.pre_storm_interior,
+            self.wider_post_storm_interior,
+            bay_depth=0.3,
+            dune_migration=0,
+        )
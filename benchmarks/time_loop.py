@@ -0,0 +1,125 @@
+"""Benchmarks of the initialization, time loop and output of Cascade"""
+import os
+import shutil
+
+from .common import (
+    ALONGSHORE_TRANSPORT,
+    COMMUNITY_ECONOMICS,
+    NOURISHMENT,
+    ROADWAY,
+    copy_inputs,
+    new_cascade,
+)
+
+MODULES = {
+    "roadway": ROADWAY,
+    "nourishment": NOURISHMENT,
+    "community_economics": COMMUNITY_ECONOMICS,
+}
+
+
+def _require_chom(module):
+    """Skip the benchmarks of the community economics module if CHOM is not installed"""
+    if module == "community_economics":
+        try:
+            import chom  # noqa: F401
+        except ImportError:
+            raise NotImplementedError("chom is not installed")
+
+
+class _Model:
+    """A model, initialized from a fresh copy of the inputs for each repeat, that is advanced a few years"""
+
+    years = 5
+    number = 1
+    repeat = 5
+    warmup_time = 0
+    timeout = 1200
+
+    def _setup(self, **kwds):
+        self.datadir = copy_inputs()
+        self.cascade = new_cascade(self.datadir, **kwds)
+
+    def teardown(self, *args):
+        shutil.rmtree(self.datadir, ignore_errors=True)
+
+    def _advance(self):
+        for _ in range(self.years):
+            self.cascade.update()
+            if self.cascade.b3d_break:
+                break
+
+
+class NaturalDynamics(_Model):
+    """`Cascade.update` without human dynamics, with and without alongshore sediment transport (AST)"""
+
+    params = ([1, 6, 12, 24], [False, True])
+    param_names = ["ny", "alongshore_transport"]
+
+    def setup(self, ny, alongshore_transport):
+        self._setup(ny=ny, **(ALONGSHORE_TRANSPORT if alongshore_transport else {}))
+
+    def time_update(self, ny, alongshore_transport):
+        self._advance()
+
+    def peakmem_update(self, ny, alongshore_transport):
+        self._advance()
+
+
+class HumanDynamics(_Model):
+    """`Cascade.update` with the roadway, beach nourishment, or community economics (CHOM) module on every domain"""
+
+    params = ([1, 6], list(MODULES))
+    param_names = ["ny", "module"]
+
+    def setup(self, ny, module):
+        _require_chom(module)
+        self._setup(ny=ny, **MODULES[module])
+
+    def time_update(self, ny, module):
+        self._advance()
+
+
+class Startup:
+    """Initialization of a model (BRIE, and the Barrier3D domains with `initialize_equal`)"""
+
+    params = [1, 6, 12, 24]
+    param_names = ["ny"]
+    number = 1
+    repeat = 3
+    warmup_time = 0
+    timeout = 1200
+
+    def setup(self, ny):
+        self.datadir = copy_inputs()
+
+    def teardown(self, ny):
+        shutil.rmtree(self.datadir, ignore_errors=True)
+
+    def time_initialize(self, ny):
+        new_cascade(self.datadir, ny=ny)
+
+
+class Output(_Model):
+    """Writing a model that has run a few years (`Cascade.save`, and `cascade.output.write_output`)"""
+
+    params = [1, 6]
+    param_names = ["ny"]
+    repeat = 3
+
+    def setup(self, ny):
+        self._setup(ny=ny, **ROADWAY)
+        self._advance()
+        self.cwd = os.getcwd()
+
+    def teardown(self, ny):
+        os.chdir(self.cwd)  # Cascade.save changes the working directory
+        super().teardown(ny)
+
+    def time_save(self, ny):
+        self.cascade.save(str(self.datadir))
+
+    def time_write_output(self, ny):
+        from cascade.output import write_output
+
+        write_output(self.cascade, self.datadir / "benchmark-output.npz")
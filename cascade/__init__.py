@@ -1,8 +1,15 @@
-import pkg_resources
+try:
+    from importlib.metadata import version as _version
+except ImportError:  # python < 3.8; pkg_resources is slow to import, so only used if needed
+    from pkg_resources import get_distribution as _get_distribution
+
+    def _version(name):
+        return _get_distribution(name).version
+
 
 from .cascade import Cascade
 
-__version__ = pkg_resources.get_distribution("cascade").version
+__version__ = _version("cascade")
 __all__ = ["Cascade"]
 
-del pkg_resources
+del _version
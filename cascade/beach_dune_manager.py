@@ -36,6 +36,7 @@ import numpy as np
 import math
 import copy
 from .roadway_manager import rebuild_dunes, set_growth_parameters
+from .events import COMMUNITY_ABANDONED, DUNE_REBUILT, NOURISHMENT
 
 dm3_to_m3 = 1000  # convert from cubic decameters to cubic meters
 
@@ -311,7 +312,7 @@ def width_drown_checks(
     Parameters
     ----------
     time_index: int
-        Time index for drowning error message
+        Time index (not used; drowning is reported by the BeachDuneManager, see `cascade.events`)
     average_barrier_width: float
         The average barrier width from the last time step [m]
     minimum_community_width: float
@@ -331,11 +332,6 @@ def width_drown_checks(
     # if the community gets eaten up by the back-barrier, then it is lost...and should no longer be managed
     if average_barrier_width <= minimum_community_width:
         narrow_break = 1
-        print(
-            "Community reached minimum width, drowned at {time} years".format(
-                time=time_index - 1
-            )
-        )
 
     return narrow_break
 
@@ -523,6 +519,7 @@ class BeachDuneManager:
         self._nt = time_step_count
         self._narrow_break = 0  # boolean for tracking drowning
         self._time_index = 1
+        self._events = []  # events of the last update, as (kind, message) tuples
         self._overwash_removal = True  # boolean for turning overwash removal on and off; for sensitivity testing
         self._overwash_filter = overwash_filter
         self._overwash_to_dune = overwash_to_dune  # percent of overwash moved to the dunes; filter+dune <= 100
@@ -570,6 +567,7 @@ class BeachDuneManager:
     ):
 
         self._time_index = barrier3d.time_index
+        self._events = []
 
         # if nourishment interval was updated in cascade, update here; otherwise just update the counter if it exists
         if self._nourishment_interval != nourishment_interval:
@@ -606,6 +604,14 @@ class BeachDuneManager:
             self._minimum_community_width,  # m
         )
         if self._narrow_break == 1:
+            self._events.append(
+                (
+                    COMMUNITY_ABANDONED,
+                    "Community reached minimum width, drowned at {time} years".format(
+                        time=self._time_index - 1
+                    ),
+                )
+            )
             self.abandonment_cleanup_tasks(barrier3d)
             return nourish_now, rebuild_dune_now
 
@@ -708,6 +714,7 @@ class BeachDuneManager:
             self._rebuild_dune_volume_TS[self._time_index - 1] = (
                 rebuild_dune_volume * dm3_to_m3
             )  # m^3
+            self._events.append((DUNE_REBUILT, None))
 
             # set dune growth rate to zero for next time step if the dune elevation (front row) is larger than the
             # natural eq. dune height (Dmax)
@@ -748,6 +755,7 @@ class BeachDuneManager:
             self._beach_width[self._time_index - 1] *= 10  # convert dam back to m
             self._nourishment_TS[self._time_index - 1] = 1
             self._nourishment_volume_TS[self._time_index - 1] = self._nourishment_volume
+            self._events.append((NOURISHMENT, None))
             barrier3d.x_s_TS[-1] = barrier3d.x_s
             # note x_b_TS is modified in CASCADE
 
@@ -809,6 +817,11 @@ class BeachDuneManager:
     def overwash_volume_removed(self):
         return self._overwash_volume_removed
 
+    @property
+    def events(self):
+        """Events of the last update, as (kind, message) tuples (see `cascade.events`)"""
+        return self._events
+
     @property
     def narrow_break(self):
         return self._narrow_break
@@ -27,10 +27,13 @@ turned on).
 
 import numpy as np
 import math
+import os
+import tempfile
+from pathlib import Path
 
 from yaml import full_load, dump
-from brie import Brie
-from barrier3d import Barrier3d
+
+from .input_cache import binary_input
 
 
 def set_yaml(var_name, new_vals, file_name):
@@ -56,6 +59,24 @@ def batchB3D(subB3D):
     return sub_x_t_dt, sub_x_s_dt, sub_h_b_dt, subB3D
 
 
+def storm_free_year(subB3D):
+    """Check if a B3D domain will be free of storms in the upcoming time step
+
+    Mirrors the storm selection in Barrier3D's update: storms only occur on or after StormStart, and only if the
+    current time index appears in the first column (year) of the storm series. Without storms, a B3D update is cheap
+    (dune growth, shoreface dynamics, sea level rise), so it is not worth sending the domain to a worker process.
+
+    :param subB3D: a Barrier3D model instance
+
+    :return: True if no storms are scheduled for this time step
+    """
+
+    if subB3D.time_index < subB3D.StormStart:
+        return True
+
+    return not np.any(subB3D.StormSeries[:, 0] == subB3D.time_index)
+
+
 def initialize_equal(
     datadir,
     brie,
@@ -73,7 +94,9 @@ def initialize_equal(
     """
     For each B3D domain, modify the default parameters to match the shoreface configuration in BRIE, which depends on
     local wave and sediment characteristics as well as the offshore wave climate (Hallermeier, 1980;
-    Ferguson & Church, 2004; Lorenzo-Trueba & Ashton, 2014; Ortiz & Ashton, 2016).
+    Ferguson & Church, 2004; Lorenzo-Trueba & Ashton, 2014; Ortiz & Ashton, 2016). The Barrier3D parameter file is
+    read, not modified: each domain is loaded from a private copy with the modified parameters (and absolute paths to
+    the input files), so simulations can share a parameter file.
 
     :param datadir: directory containing the Barrier3D parameter file
     :param brie: the brie class
@@ -91,94 +114,111 @@ def initialize_equal(
     :return: barrier3d
 
     """
+    from barrier3d import Barrier3d
+
     barrier3d = []
 
+    with open(datadir + parameter_file) as f:
+        default_parameters = full_load(f)
+    parameter_file_prefix = parameter_file.replace("-parameters.yaml", "")
+
+    # Barrier3D loads its inputs relative to the parameter file, which is written to a private directory
+    def input_path(file_name):
+        return str((Path(datadir) / file_name).resolve())
+
+    for name, value in default_parameters.items():
+        if isinstance(value, str) and (Path(datadir) / value).is_file():
+            default_parameters[name] = input_path(value)
+
     for iB3D in range(brie.ny):
 
-        fid = datadir + parameter_file
-        parameter_file_prefix = parameter_file.replace("-parameters.yaml", "")
+        # update variables in a copy of the Barrier3D parameters (the remaining variables are set to default; the
+        # user's parameter file is not modified) ---------
+        parameters = dict(default_parameters)
 
-        # update variables in Barrier3D yaml file (the remaining variables are set to default) ---------
         # barrier and shoreface geometry, simulation parameters
-        set_yaml("Shrub_ON", 0, fid)  # make sure that shrubs are turned off
-        set_yaml(
-            "TMAX", brie.nt, fid
-        )  # [yrs] duration of simulation (if brie._dt = 1 yr, set to ._nt)
-        set_yaml(
-            "BarrierLength", brie._dy, fid
-        )  # [m] dtatic length of island segment (comprised of 10x10 cells)
-        set_yaml(
-            "DShoreface", brie.d_sf, fid
-        )  # [m] depth of shoreface (set to brie depth, function of wave height)
-        set_yaml(
-            "LShoreface", float(brie.x_s[iB3D] - brie.x_t[iB3D]), fid
-        )  # [m] length of shoreface (calculate from brie variables, shoreline - shoreface toe)
-        set_yaml(
-            "ShorefaceToe", float(brie.x_t[iB3D]), fid
-        )  # [m] start location of shoreface toe
-        set_yaml(
-            "k_sf", float(brie.k_sf), fid
-        )  # [m^3/m/y] shoreface flux rate constant (function of wave parameters from brie)
-        set_yaml(
-            "s_sf_eq", float(brie.s_sf_eq), fid
-        )  # equilibrium shoreface slope (function of wave and sediment parameters from brie)
-        set_yaml(
-            "BayDepth", brie._bb_depth, fid
-        )  # [m] depth of bay behind island segment (set to brie bay depth)
+        parameters["Shrub_ON"] = 0  # make sure that shrubs are turned off
+        # [yrs] duration of simulation (if brie._dt = 1 yr, set to ._nt)
+        parameters["TMAX"] = brie.nt
+        # [m] dtatic length of island segment (comprised of 10x10 cells)
+        parameters["BarrierLength"] = brie._dy
+        # [m] depth of shoreface (set to brie depth, function of wave height)
+        parameters["DShoreface"] = brie.d_sf
+        # [m] length of shoreface (calculate from brie variables, shoreline - shoreface toe)
+        parameters["LShoreface"] = float(brie.x_s[iB3D] - brie.x_t[iB3D])
+        # [m] start location of shoreface toe
+        parameters["ShorefaceToe"] = float(brie.x_t[iB3D])
+        # [m^3/m/y] shoreface flux rate constant (function of wave parameters from brie)
+        parameters["k_sf"] = float(brie.k_sf)
+        # equilibrium shoreface slope (function of wave and sediment parameters from brie)
+        parameters["s_sf_eq"] = float(brie.s_sf_eq)
+        # [m] depth of bay behind island segment (set to brie bay depth)
+        parameters["BayDepth"] = brie._bb_depth
 
         # sea level rise variables
-        set_yaml(
-            "RSLR_Constant", slr_constant, fid
-        )  # relative sea-level rise rate will be constant, otherwise logistic growth function used for acc SLR
-        set_yaml(
-            "RSLR_const", brie._slr[0], fid
-        )  # [m/y] relative sea-level rise rate; initialized in brie, but saved as time series, so we use index 0
+        # relative sea-level rise rate will be constant, otherwise logistic growth function used for acc SLR
+        parameters["RSLR_Constant"] = slr_constant
+        # [m/y] relative sea-level rise rate; initialized in brie, but saved as time series, so we use index 0
+        parameters["RSLR_const"] = brie._slr[0]
 
         # dune variables
-        set_yaml(
-            "DuneParamStart", True, fid
-        )  # dune height will come from external file
-        set_yaml(
-            "GrowthParamStart", False, fid
-        )  # dune growth parameter WILL NOT come from external file
+        parameters["DuneParamStart"] = True  # dune height will come from external file
+        # dune growth parameter WILL NOT come from external file
+        parameters["GrowthParamStart"] = False
+        # minimum and maximum growth rate for logistic dune growth
         if np.size(rmin) > 1:
-            set_yaml(
-                "rmin", rmin[iB3D], fid
-            )  # minimum growth rate for logistic dune growth
+            parameters["rmin"] = rmin[iB3D]
         else:
-            set_yaml("rmin", rmin, fid)  # minimum growth rate for logistic dune growth
+            parameters["rmin"] = rmin
         if np.size(rmax) > 1:
-            set_yaml(
-                "rmax", rmax[iB3D], fid
-            )  # maximum growth rate for logistic dune growth
+            parameters["rmax"] = rmax[iB3D]
         else:
-            set_yaml("rmax", rmax, fid)  # Maximum growth rate for logistic dune growth
+            parameters["rmax"] = rmax
 
         # rate of shoreline retreat attributed to gradients in alongshore transport; (-) = erosion, (+) = acc [m / y]
         if np.size(background_erosion) > 1:
-            set_yaml("Rat", background_erosion[iB3D], fid)
+            parameters["Rat"] = background_erosion[iB3D]
         else:
-            set_yaml("Rat", background_erosion, fid)
+            parameters["Rat"] = background_erosion
 
         # external file names used for initialization
-        set_yaml("storm_file", storm_file, fid)
+        # (text files are replaced by their binary version, see `input_cache`)
+        parameters["storm_file"] = input_path(
+            binary_input(datadir, storm_file, "storm")
+        )
         if np.size(dune_file) > 1:
-            set_yaml("dune_file", dune_file[iB3D], fid)
+            parameters["dune_file"] = input_path(
+                binary_input(datadir, dune_file[iB3D], "dune")
+            )
         else:
-            set_yaml("dune_file", dune_file, fid)
+            parameters["dune_file"] = input_path(
+                binary_input(datadir, dune_file, "dune")
+            )
         if np.size(elevation_file) > 1:
-            set_yaml("elevation_file", elevation_file[iB3D], fid)
+            parameters["elevation_file"] = input_path(
+                binary_input(datadir, elevation_file[iB3D], "elevation")
+            )
         else:
-            set_yaml("elevation_file", elevation_file, fid)
+            parameters["elevation_file"] = input_path(
+                binary_input(datadir, elevation_file, "elevation")
+            )
 
         # the following parameters CANNOT be changed or else the MSSM storm list & storm time series needs to be remade
-        set_yaml("MHW", MHW, fid)  # [m] elevation of Mean High Water
-        set_yaml("beta", beta, fid)  # beach slope for runup calculations
-        set_yaml(
-            "BermEl", float(brie._h_b_crit), fid
-        )  # [m] static elevation of berm
-
-        barrier3d.append(Barrier3d.from_yaml(datadir, prefix=parameter_file_prefix))
+        parameters["MHW"] = MHW  # [m] elevation of Mean High Water
+        parameters["beta"] = beta  # beach slope for runup calculations
+        parameters["BermEl"] = float(brie._h_b_crit)  # [m] static elevation of berm
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory(prefix="cascade-") as directory:
+            with open(os.path.join(directory, parameter_file), "w") as f:
+                dump(parameters, f)
+            try:
+                barrier3d.append(
+                    Barrier3d.from_yaml(directory, prefix=parameter_file_prefix)
+                )
+            finally:
+                # Barrier3D loads from within the directory, and does not change back if loading fails
+                os.chdir(cwd)
 
         # now update the BRIE barrier geometry and SLR variables from Barrier3D so that all the initial conditions are
         # the same! The rate of SLR can only be constant in brie, whereas it can accelerate in Barrier3D, so by
@@ -278,6 +318,8 @@ class BrieCoupler:
         dtsave = 1  # save spacing (every year) -- do not change
 
         # start by initializing BRIE b/c it has parameters related to wave climate that we use to initialize B3D
+        from brie import Brie
+
         self._brie = Brie(
             name=name,
             ast_model=brie_ast_model,
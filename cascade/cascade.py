@@ -1,12 +1,32 @@
+from concurrent.futures import as_completed
 from pathlib import Path
-from joblib import Parallel, delayed
 import numpy as np
+import copy
 import os
+import time
+import uuid
 
 from .roadway_manager import RoadwayManager, set_growth_parameters
 from .beach_dune_manager import BeachDuneManager
-from .brie_coupler import BrieCoupler, initialize_equal, batchB3D
+from .managers import LazyManagerList
+from .domain_history import DomainHistory
+from .brie_coupler import BrieCoupler, initialize_equal, batchB3D, storm_free_year
 from .chom_coupler import ChomCoupler
+from .parallel_tuner import ParallelTuner, available_cores, timed_call
+from .checkpoint import write_checkpoint, load_checkpoint, history_lists
+from .storm_library import StormLibrary
+from .output import summary_path, write_summary
+from .memory import memory_report, resident_set_size
+from .events import (
+    EventBus,
+    DOMAIN_DROWNED,
+    PARALLEL_DISPATCH,
+    POST_MANAGEMENT,
+    POST_PHYSICS,
+    POST_UPDATE,
+    PRE_MANAGEMENT,
+    PRE_PHYSICS,
+)
 
 
 class CascadeError(Exception):
@@ -147,6 +167,15 @@ class Cascade:
         house_footprint_x=15,
         house_footprint_y=20,
         beach_full_cross_shore=70,
+        freeze_drowned_domains=False,
+        pipeline_management=False,
+        checkpoint_interval=None,
+        checkpoint_directory=None,
+        storm_library=None,
+        storm_library_member=0,
+        storage_dtype="float64",
+        sample_memory=False,
+        verbose=True,
     ):
         """
 
@@ -194,8 +223,11 @@ class Cascade:
             Minimum dune growth rate [unitless]; for Houser et al., (2015) growth rate formulation
         max_dune_growth_rate: float or list of floats, optional
             Maximum dune growth rate [unitless]; for Houser et al., (2015) growth rate formulation
-        num_cores: int, optional
-            Number of (parallel) processing cores to be used; helpful to have >1 for multiple Barrier3D segments
+        num_cores: int or "auto", optional
+            Number of (parallel) processing cores to be used; helpful to have >1 for multiple Barrier3D segments. Only
+            domains with storms in a given year are sent to the parallel pool; storm-free domains are updated in-process.
+            If "auto", the number of workers and the backend (in-process, threads, processes) are chosen from measured
+            update and serialization times, and re-evaluated periodically; see `parallel_report`
         roadway_management_module: boolean or list of booleans, optional
             If True, use roadway management module (overwash removal, road relocation, dune management)
         alongshore_transport_module: boolean or list of booleans, optional
@@ -244,6 +276,40 @@ class Cascade:
             Subsidy on cost of entire nourishment plan
         beach_full_cross_shore: int, optional
             The cross-shore extent (meters) of fully nourished beach (i.e., the community desired beach width) [m]
+        freeze_drowned_domains: boolean, optional
+            If True, a Barrier3D domain that drowns is frozen (its state is retained, but it is no longer updated or
+            managed) and the remaining domains continue; the simulation stops (b3d_break) once all domains have drowned.
+            The domain history of a frozen domain is padded with its last interior domain (see `domain_history`).
+            Otherwise, the simulation stops when any domain drowns. Requires alongshore transport and CHOM to be off
+        pipeline_management: boolean, optional
+            If True, the dune domain update, drowning check and human management (RoadwayManager, BeachDuneManager) of
+            each Barrier3D domain run as soon as its physics update is complete, while the workers are still updating
+            other domains (with num_cores="auto", the parallel tuner chooses the workers as usual). Requires alongshore
+            transport and CHOM to be off and no group roadway abandonment, because then management of a domain only
+            depends on that domain. Results are the same as the sequential schedule, except in a year when a domain
+            drowns (and drowned domains are not frozen): domains completed before the drowned domain are managed in that
+            year, the remaining domains only have their dune domain updated, and then the simulation stops
+        checkpoint_interval: int, optional
+            If specified, write a checkpoint of the full model state every `checkpoint_interval` years; the simulation
+            can be continued from the latest checkpoint with `Cascade.resume`
+        checkpoint_directory: string, optional
+            Directory for checkpoints [default: "<name>-checkpoint" in the current working directory]
+        storm_library: string or StormLibrary, optional
+            Storm library (see `cascade.storm_library`); if specified, the storm series of all Barrier3D domains is a
+            read-only view of member `storm_library_member` of the (memory-mapped) library instead of `storm_file`
+        storm_library_member: int or string, optional
+            Index or name of the storm series in the storm library
+        storage_dtype: string, optional
+            Precision of the history held by CASCADE -- Barrier3D's DomainTS and the post-storm interior and dune
+            domains of the human management modules -- and therefore of checkpoints and saved output, "float64" or
+            "float32". The model is always computed in double precision; only years that are finalized (i.e., not
+            modified anymore) are stored in single precision, which halves their memory and storage. Single precision
+            keeps elevations to about 1e-7 dam (a micrometer), far below the resolution that has meaning in Barrier3D
+        sample_memory: boolean, optional
+            If True, record the resident set size of the process after each time step (see `memory_samples`)
+        verbose: boolean, optional
+            If True, print management events such as road and community abandonment (see `events`); turn off for
+            large ensembles
 
 
         Examples
@@ -265,6 +331,7 @@ class Cascade:
         self._slr_constant = sea_level_rise_constant
         self._background_erosion = background_erosion
         self._num_cores = num_cores
+        self._parallel_tuner = None
         self._alongshore_transport_module = alongshore_transport_module
         self._community_economics_module = community_economics_module
         self._filename = name
@@ -274,6 +341,18 @@ class Cascade:
         self._parameter_file = parameter_file
         self._number_of_communities = number_of_communities
         self._b3d_break = 0
+        self._domain_break = [0] * self._ny
+        self._freeze_drowned_domains = freeze_drowned_domains
+        self._pipeline_management = pipeline_management
+        self._checkpoint_interval = checkpoint_interval
+        if checkpoint_directory is None:
+            checkpoint_directory = os.path.join(os.getcwd(), name + "-checkpoint")
+        self._checkpoint_directory = checkpoint_directory
+        self._checkpoint_run_id = uuid.uuid4().hex
+        self._storage_dtype = np.dtype(storage_dtype)
+        self._storage_end = [0] * self._ny  # years of the history that are in the storage precision
+        self._memory_samples = [] if sample_memory else None
+        self._events = EventBus(echo=verbose)
         self._road_break = [
             0
         ] * self._ny
@@ -293,6 +372,27 @@ class Cascade:
             raise CascadeError(
                 "The default storms only apply for a berm elevation=1.9 m NAVD88, MHW=0.46 m NAVD88 & beach slope=0.04."
             )
+        if num_cores == "auto":
+            self._parallel_tuner = ParallelTuner()
+        elif not isinstance(num_cores, (int, np.integer)):
+            raise CascadeError("num_cores must be an integer or 'auto'")
+        if self._storage_dtype not in (np.float32, np.float64):
+            raise CascadeError("storage_dtype must be float64 or float32")
+        if freeze_drowned_domains and (
+            alongshore_transport_module or community_economics_module
+        ):
+            raise CascadeError(
+                "Drowned domains can only be frozen if alongshore transport and community economics modules are off"
+            )
+        if pipeline_management and (
+            alongshore_transport_module
+            or community_economics_module
+            or group_roadway_abandonment is not None
+        ):
+            raise CascadeError(
+                "Pipelined management requires the alongshore transport and community economics modules to be off and "
+                "no group roadway abandonment"
+            )
         if (sea_level_rise_constant is False) and (time_step_count > 200):
             raise CascadeError(
                 "The sigmoidal accelerated SLR formulation used in this model by Rohling et al., (2013) should not be"
@@ -333,6 +433,27 @@ class Cascade:
             elevation_file=self._elevation_file,  # can be array
         )
 
+        # replace the storm series with a shared view into the storm library
+        self._storm_series = None
+        if storm_library is not None:
+            if not isinstance(storm_library, StormLibrary):
+                storm_library = StormLibrary(storm_library)
+            self._storm_series = storm_library[storm_library_member]
+            for iB3D in range(self._ny):
+                self._barrier3d[iB3D].StormSeries = self._storm_series
+
+        # preallocated history of the interior domains, mirrored from (and sharing memory with) DomainTS
+        self._domain_history = []
+        for barrier3d in self._barrier3d:
+            self._domain_history.append(
+                DomainHistory(
+                    len(barrier3d.DomainTS),
+                    barrier3d.BarrierLength,
+                    dtype=self._storage_dtype,
+                )
+            )
+            self._domain_history[-1].mirror(barrier3d.DomainTS, barrier3d.time_index)
+
         ###############################################################################
         # initialize human dynamics modules
         ###############################################################################
@@ -377,14 +498,14 @@ class Cascade:
                     beach_full_cross_shore=beach_full_cross_shore,
                 )  # contains the CHOM model instances, one per community
 
-        # initialize RoadwayManager and BeachDuneManager modules
-        # (always initialize just in case we want to add a road or start nourishing during the simulation)
-        self._roadways = []
-        self._nourishments = []
+        # initialize RoadwayManager and BeachDuneManager modules; managers are constructed when they are first used
+        # (e.g., if we add a road or start nourishing during the simulation), with the parameters given here
+        roadway_parameters = []
+        nourishment_parameters = []
 
         for iB3D in range(self._ny):
-            self._roadways.append(
-                RoadwayManager(
+            roadway_parameters.append(
+                dict(
                     initial_road_elevation=self._road_ele[iB3D],
                     road_width=self._road_width[iB3D],
                     road_setback=self._road_setback[iB3D],
@@ -398,8 +519,8 @@ class Cascade:
             self._initial_beach_width[iB3D] = (
                 int(self._barrier3d[iB3D].BermEl / self._barrier3d[iB3D]._beta) * 10
             )
-            self._nourishments.append(
-                BeachDuneManager(
+            nourishment_parameters.append(
+                dict(
                     nourishment_interval=self._nourishment_interval[iB3D],
                     nourishment_volume=self._nourishment_volume[iB3D],
                     initial_beach_width=self._initial_beach_width[iB3D],
@@ -411,6 +532,9 @@ class Cascade:
                 )
             )
 
+        self._roadways = LazyManagerList(RoadwayManager, roadway_parameters)
+        self._nourishments = LazyManagerList(BeachDuneManager, nourishment_parameters)
+
         # use the initial beach width as a check on the Barrier3D user input for mulitple domains; the beach width
         # must be the same for all domains because there is only one storm file, which is made for a set berm
         # elevation and beach slope
@@ -431,6 +555,15 @@ class Cascade:
     def b3d_break(self):
         return self._b3d_break
 
+    @property
+    def domain_break(self):
+        return self._domain_break
+
+    @property
+    def active_domains(self):
+        """Indices of the Barrier3D domains that have not drowned (i.e., are still updated)"""
+        return [iB3D for iB3D in range(self._ny) if not self._domain_break[iB3D]]
+
     @property
     def barrier3d(self):
         return self._barrier3d
@@ -439,10 +572,31 @@ class Cascade:
     def barrier3d(self, value):
         self._barrier3d = value
 
+    @property
+    def domain_history(self):
+        """Preallocated history of the interior domain of each Barrier3D domain (see `cascade.domain_history`)"""
+        self._update_history()
+        return self._domain_history
+
     @property
     def roadways(self):
         return self._roadways
 
+    @property
+    def events(self):
+        """Event bus of the simulation: subscribe to the stages of each time step and to management events (see
+        `cascade.events`)"""
+        return self._events
+
+    @property
+    def memory_samples(self):
+        """Resident set size of the process after each time step, as (year, bytes) tuples, if `sample_memory`"""
+        return self._memory_samples
+
+    def memory_report(self):
+        """Bytes held by each component of the model, per Barrier3D domain (see `cascade.memory`)"""
+        return memory_report(self)
+
     @property
     def chom(self):
         return self._chom_coupler.chom
@@ -511,30 +665,417 @@ class Cascade:
     def time_step_count(self):
         return self._nt
 
+    @property
+    def time_index(self):
+        """Time index of the Barrier3D domains (the most advanced domain, if drowned domains are frozen)"""
+        return max(barrier3d.time_index for barrier3d in self._barrier3d)
+
+    @property
+    def parallel_report(self):
+        """Backend and number of workers used for the Barrier3D updates, and (for num_cores="auto") the measurements
+        and per-year decisions of the tuner"""
+        if self._parallel_tuner is None:
+            backend = "sequential" if self._num_cores == 1 else "loky"
+            return {"backend": backend, "n_jobs": self._num_cores, "decisions": []}
+        return self._parallel_tuner.report()
+
+    def _emit_parallel_dispatch(self, decisions):
+        """Emit the latest decision of the parallel tuner, if it made one since it had made `decisions` decisions"""
+        history = self._parallel_tuner.decisions
+        if len(history) == decisions:
+            return
+
+        decision = dict(history[-1])
+        year = decision.pop("year")
+        message = None
+        if len(history) == 1 or (history[-2]["backend"], history[-2]["n_jobs"]) != (
+            decision["backend"],
+            decision["n_jobs"],
+        ):
+            message = "Barrier3D updates: {} with {} worker(s){}".format(
+                decision["backend"],
+                decision["n_jobs"],
+                " (trial)" if decision["trial"] else "",
+            )
+        self._events.emit(PARALLEL_DISPATCH, year=year, message=message, **decision)
+
+    def _complete_domain(self, iB3D, output, manage=True):
+        """Finish the time step of a single Barrier3D domain after its (parallel) physics update: update the dune
+        domain, check for drowning, and (if `manage`) run human management; only used when `pipeline_management`
+
+        :return: False if the domain drowned and the simulation should stop
+        """
+        (_, _, _, self._barrier3d[iB3D]) = output
+        if self._storm_series is not None:
+            # a domain returned by a worker process holds a copy of the storm series; share the library view again
+            self._barrier3d[iB3D].StormSeries = self._storm_series
+        self._barrier3d[iB3D].update_dune_domain()
+        year = self._barrier3d[iB3D].time_index - 1
+        self._events.emit(POST_PHYSICS, year=year, domain=iB3D)
+
+        if self._barrier3d[iB3D].drown_break == 1:
+            self._domain_break[iB3D] = 1
+            self._events.emit(DOMAIN_DROWNED, year=year, domain=iB3D)
+            return self._freeze_drowned_domains
+
+        if manage:
+            self._update_roadway(iB3D)
+            self._update_nourishment(iB3D)
+
+        return True
+
+    def _update_pipelined(self, active_domains, stormy_domains):
+        """Update cascade by a single time step, chaining the management of each domain onto its physics update
+
+        Storm-affected domains are submitted to the workers first; storm-free domains are completed in the parent
+        process while the workers route overwash, and then each storm-affected domain is completed as soon as its
+        result arrives. With num_cores="auto", the backend and number of workers for the storm-affected domains are
+        chosen by the parallel tuner, as in the sequential schedule (see `cascade.parallel_tuner`).
+        """
+        year = self._barrier3d[active_domains[0]].time_index
+        tuner = self._parallel_tuner if stormy_domains else None
+        if tuner is not None:
+            decisions = len(tuner.decisions)
+            backend, n_jobs, predicted = tuner.dispatch(
+                self._barrier3d, stormy_domains, year
+            )
+        else:
+            if self._num_cores == "auto":
+                n_jobs = 1
+            elif self._num_cores < 0:
+                n_jobs = max(available_cores() + 1 + self._num_cores, 1)
+            else:
+                n_jobs = self._num_cores
+            backend = "loky" if n_jobs > 1 and len(stormy_domains) > 1 else "sequential"
+
+        futures = {}
+        finished = []  # times at which the workers finished their updates
+        start = time.perf_counter()
+        if backend == "threading":
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=n_jobs)
+        elif backend == "loky":
+            from joblib.executor import get_memmapping_executor
+
+            # the worker processes of joblib's loky backend (shared with `ParallelTuner` and the sequential schedule),
+            # which pass memory-mapped arrays (e.g., storm library series) to the workers without copying them
+            executor = get_memmapping_executor(n_jobs)
+        if backend != "sequential":
+            for iB3D in stormy_domains:
+                future = executor.submit(timed_call, batchB3D, self._barrier3d[iB3D])
+                future.add_done_callback(lambda _: finished.append(time.perf_counter()))
+                futures[future] = iB3D
+
+        step_times = {}
+        continue_run = True
+        for iB3D in active_domains:
+            if iB3D not in futures.values():
+                step_times[iB3D], output = timed_call(batchB3D, self._barrier3d[iB3D])
+                continue_run = (
+                    self._complete_domain(iB3D, output, manage=continue_run)
+                    and continue_run
+                )
+
+        for future in as_completed(futures):
+            iB3D = futures[future]
+            step_times[iB3D], output = future.result()
+            continue_run = (
+                self._complete_domain(iB3D, output, manage=continue_run)
+                and continue_run
+            )
+
+        if backend == "threading":
+            executor.shutdown()
+
+        if tuner is not None:
+            # the physics only: the workers finished while the parent process was managing the completed domains (the
+            # callback of the last worker may not have run yet, in which case it finished just now)
+            if futures:
+                end = (
+                    max(finished)
+                    if len(finished) == len(futures)
+                    else time.perf_counter()
+                )
+                wall_time = end - start
+            else:
+                wall_time = sum(step_times[iB3D] for iB3D in stormy_domains)
+            tuner.record(
+                stormy_domains,
+                [step_times[iB3D] for iB3D in stormy_domains],
+                wall_time,
+                backend,
+                n_jobs,
+                predicted,
+                year,
+            )
+            self._emit_parallel_dispatch(decisions)
+
+        if not continue_run or len(self.active_domains) == 0:
+            self._b3d_break = 1
+
+    def _manage(self, iB3D, module, update, *args, **kwds):
+        """Update a manager of a Barrier3D domain with `update(*args, **kwds)`, and emit its events"""
+        year = self._barrier3d[iB3D].time_index - 1
+        self._events.emit(PRE_MANAGEMENT, year=year, domain=iB3D, module=module)
+
+        result = update(*args, **kwds)
+
+        for kind, message in getattr(self, "_" + module)[iB3D].events:
+            self._events.emit(kind, year=year, domain=iB3D, message=message)
+        self._events.emit(POST_MANAGEMENT, year=year, domain=iB3D, module=module)
+
+        return result
+
+    def _update_roadway(self, iB3D):
+        """RoadwayManager update for a single Barrier3D domain; see `update`"""
+
+        if self._roadway_management_module[iB3D]:
+
+            # if the roadway drowned or was too narrow for the road to be relocated, stop managing the road!
+            # NOTE: dune heights must drop below Dmax before reset, so while calling reset_dune_growth rates seems
+            # redundant, it doesn't slow us down computationally, so just do it
+            if (
+                self._roadways[iB3D].drown_break
+                or self._roadways[iB3D].relocation_break
+            ):
+                # if it was specified that roadways are abandonded in groups, abandon the group
+                if self._group_roadway_abandonment is not None:
+
+                    # find the group indices
+                    group_roadways = np.where(
+                        np.array(self._group_roadway_abandonment)
+                        == self._group_roadway_abandonment[iB3D]
+                    )[0]
+                    self._road_break[group_roadways[0] : group_roadways[-1] + 1] = [
+                        1
+                    ] * len(group_roadways)
+
+                    # label the other group indices as broken
+                    for iRoad in group_roadways:
+                        if self._roadways[iB3D].drown_break:
+                            self._roadways[iRoad].drown_break = 1
+                        else:
+                            self._roadways[iRoad].relocation_break = 1
+
+                        # set dune growth rates back to original only when dune elevation is less than equilibrium
+                        self._barrier3d[
+                            iRoad
+                        ].growthparam = self.reset_dune_growth_rates(
+                            original_growth_param=self._roadways[
+                                iRoad
+                            ]._original_growth_param,
+                            iB3D=iRoad,
+                        )
+
+                else:
+                    self._road_break[iB3D] = 1
+
+                    # set dune growth rates back to original only when dune elevation is less than equilibrium
+                    self._barrier3d[
+                        iB3D
+                    ].growthparam = self.reset_dune_growth_rates(
+                        original_growth_param=self._roadways[
+                            iB3D
+                        ]._original_growth_param,
+                        iB3D=iB3D,
+                    )
+
+            else:
+                # manage that road!
+                self._roadways[iB3D].road_relocation_width = self._road_width[
+                    iB3D
+                ]  # type: float
+                self._roadways[iB3D].road_relocation_setback = self._road_setback[
+                    iB3D
+                ]
+                self._manage(
+                    iB3D,
+                    "roadways",
+                    self._roadways[iB3D].update,
+                    self._barrier3d[iB3D],
+                    self._trigger_dune_knockdown,
+                )
+
+            # update x_b to include a fake beach width and the dune line; we add a fake beach width for coupling
+            # with the beach nourishment module below (i.e., if half the domain is initialized with roadways and
+            # the other half with a community, I want them to start with the same beach back barrier position)
+            self._barrier3d[iB3D].x_b_TS[-1] = (
+                self._barrier3d[iB3D].x_s
+                + self._barrier3d[iB3D].InteriorWidth_AvgTS[-1]
+                + np.size(
+                    self._barrier3d[iB3D].DuneDomain, 2
+                )  # dune domain width in dam
+                + (self._initial_beach_width[iB3D] / 10)  # dam
+            )
+
+    def _update_nourishment(self, iB3D):
+        """BeachDuneManager update for a single Barrier3D domain; see `update`"""
+
+        if self._beach_nourishment_module[iB3D]:
+            # if barrier was too narrow to sustain a community in the last time step, stop managing beach and dunes!
+            # NOTE: dune heights must drop below Dmax before reset, so while calling reset_dune_growth rates seems
+            # redundant, it doesn't slow us down computationally, so just do it
+            if self._nourishments[iB3D].narrow_break:
+                self._community_break[iB3D] = 1
+
+                # set dune growth rates back to original only when dune elevation is less than equilibrium
+                self._barrier3d[iB3D].growthparam = self.reset_dune_growth_rates(
+                    original_growth_param=self._nourishments[
+                        iB3D
+                    ]._original_growth_param,
+                    iB3D=iB3D,
+                )
+
+            # else manage that community!
+            else:
+                self._nourishments[
+                    iB3D
+                ].dune_design_elevation = self._dune_design_elevation[
+                    iB3D
+                ]  # m MHW
+                self._nourishments[
+                    iB3D
+                ].nourishment_volume = self._nourishment_volume[iB3D]
+                [
+                    self._nourish_now[iB3D],
+                    self._rebuild_dune_now[iB3D],
+                ] = self._manage(
+                    iB3D,
+                    "nourishments",
+                    self._nourishments[iB3D].update,
+                    barrier3d=self._barrier3d[iB3D],
+                    nourish_now=self._nourish_now[iB3D],
+                    rebuild_dune_now=self._rebuild_dune_now[iB3D],
+                    nourishment_interval=self._nourishment_interval[iB3D],
+                )
+
+            # update x_b to include a beach width and the dune line; after the community is abandoned, we set the
+            # beach width for the remaining time steps to the last managed beach width in order to not have a huge
+            # jump in the back-barrier position in Barrier3D
+            self._barrier3d[iB3D].x_b_TS[-1] = (
+                self._barrier3d[iB3D].x_s
+                + self._barrier3d[iB3D].InteriorWidth_AvgTS[-1]
+                + np.size(
+                    self._barrier3d[iB3D].DuneDomain, 2
+                )  # dune domain width in dam
+                + (
+                    self._nourishments[iB3D].beach_width[
+                        self._barrier3d[iB3D].time_index - 1
+                    ]
+                    / 10
+                )  # dam
+            )
+
     ###############################################################################
     # time loop
     ###############################################################################
 
     def update(self):
-        """Update cascade by a single time step"""
+        """Update cascade by a single time step, and write a checkpoint if one is due"""
 
         # check for drowning from the last time step in brie. Note that this will stay false if brie is not used for AST
         if self._brie_coupler._brie.drown == True:
             return
 
+        self._update_time_step()
+
+        self._update_history()
+
+        if self._memory_samples is not None:
+            self._memory_samples.append((self.time_index - 1, resident_set_size()))
+
+        if (
+            self._checkpoint_interval is not None
+            and not self._b3d_break
+            and (self.time_index - 1) % self._checkpoint_interval == 0
+        ):
+            self.checkpoint()
+
+        self._events.emit(POST_UPDATE, year=self.time_index - 1)
+
+    def _update_history(self):
+        """Mirror DomainTS into the domain histories (padding those of frozen domains), and convert the post-storm
+        domains of finalized years to the storage precision (see `storage_dtype`)"""
+
+        time_index = self.time_index
+        for iB3D, barrier3d in enumerate(self._barrier3d):
+            self._domain_history[iB3D].mirror(barrier3d.DomainTS, barrier3d.time_index)
+            if self._freeze_drowned_domains and self._domain_break[iB3D]:
+                self._domain_history[iB3D].pad(time_index)
+            if self._storage_dtype == np.float64:
+                continue
+
+            histories = []
+            for managers in (self._roadways, self._nourishments):
+                if managers.is_built(iB3D):
+                    histories.append(managers[iB3D]._post_storm_interior)
+                    histories.append(managers[iB3D]._post_storm_dunes)
+
+            # a year is finalized once the next year has been simulated
+            finalized = barrier3d.time_index - 1
+            for history in histories:
+                for t in range(self._storage_end[iB3D], min(finalized, len(history))):
+                    if isinstance(history[t], np.ndarray):
+                        history[t] = history[t].astype(self._storage_dtype)
+            self._storage_end[iB3D] = max(self._storage_end[iB3D], finalized)
+
+    def _update_time_step(self):
+        """Update cascade by a single time step"""
+
+        self._events.emit(PRE_PHYSICS, year=self.time_index)
+
         # advance B3D by one time step (B3D initializes at time_index = 1 and then updates the time_index after
         # update_dune_domain). Set n_jobs=1 for no parallel processing (debugging) and -2 for all but 1 CPU;
-        # note that joblib uses a threshold on the size of arrays passed to the workers
-        batch_output = Parallel(n_jobs=self._num_cores, max_nbytes="10M")(
-            delayed(batchB3D)(self._barrier3d[iB3D]) for iB3D in range(self._ny)
-        )
+        # note that joblib uses a threshold on the size of arrays passed to the workers. Domains without storms this
+        # year are cheap to update, so only storm-affected domains are sent to the pool (if there are enough of them
+        # to be worth the dispatch); the rest are updated in-process
+        active_domains = self.active_domains
+        stormy_domains = [
+            iB3D
+            for iB3D in active_domains
+            if not storm_free_year(self._barrier3d[iB3D])
+        ]
+
+        if self._pipeline_management:
+            self._update_pipelined(active_domains, stormy_domains)
+            return
 
-        # reshape output from parallel processing and convert from tuple to list
-        x_t_dt, x_s_dt, h_b_dt, b3d = zip(*batch_output)
-        x_t_dt = list(x_t_dt)
-        x_s_dt = list(x_s_dt)
-        h_b_dt = list(h_b_dt)
-        self._barrier3d = list(b3d)
+        batch_output = [None] * self._ny
+
+        if self._parallel_tuner is not None:
+            decisions = len(self._parallel_tuner.decisions)
+            parallel_output = self._parallel_tuner.map(
+                batchB3D,
+                self._barrier3d,
+                stormy_domains,
+                year=self._barrier3d[active_domains[0]].time_index,
+            )
+            for iB3D, output in zip(stormy_domains, parallel_output):
+                batch_output[iB3D] = output
+            self._emit_parallel_dispatch(decisions)
+        elif self._num_cores != 1 and len(stormy_domains) > 1:
+            from joblib import Parallel, delayed
+
+            parallel_output = Parallel(n_jobs=self._num_cores, max_nbytes="10M")(
+                delayed(batchB3D)(self._barrier3d[iB3D]) for iB3D in stormy_domains
+            )
+            for iB3D, output in zip(stormy_domains, parallel_output):
+                batch_output[iB3D] = output
+
+        for iB3D in active_domains:
+            if batch_output[iB3D] is None:
+                batch_output[iB3D] = batchB3D(self._barrier3d[iB3D])
+
+        # reshape output from parallel processing (frozen domains keep their state, with no change in position)
+        [x_t_dt, x_s_dt, h_b_dt] = [[0.0] * self._ny for _ in range(3)]
+        for iB3D in active_domains:
+            (
+                x_t_dt[iB3D],
+                x_s_dt[iB3D],
+                h_b_dt[iB3D],
+                self._barrier3d[iB3D],
+            ) = batch_output[iB3D]
 
         # use brie to connect B3D models with AST; otherwise, just update (erode/prograde) dune domain
         if self._alongshore_transport_module:
@@ -542,14 +1083,25 @@ class Cascade:
                 self._barrier3d, x_t_dt, x_s_dt, h_b_dt
             )  # also updates dune domain
         else:
-            for iB3D in range(self._ny):
+            for iB3D in active_domains:
                 self._barrier3d[iB3D].update_dune_domain()
+        year = self.time_index - 1
+        self._events.emit(POST_PHYSICS, year=year)
 
-        # check also for width/height drowning in B3D (would occur in update_dune_domain)
-        for iB3D in range(self._ny):
+        # check also for width/height drowning in B3D (would occur in update_dune_domain); if specified, freeze the
+        # drowned domains and only stop the simulation once all domains have drowned
+        for iB3D in active_domains:
             if self._barrier3d[iB3D].drown_break == 1:
-                self._b3d_break = 1
-                return
+                self._domain_break[iB3D] = 1
+                self._events.emit(DOMAIN_DROWNED, year=year, domain=iB3D)
+                if not self._freeze_drowned_domains:
+                    self._b3d_break = 1
+                    return
+
+        active_domains = self.active_domains
+        if len(active_domains) == 0:
+            self._b3d_break = 1
+            return
 
         ###############################################################################
         # human dynamics modules
@@ -558,82 +1110,8 @@ class Cascade:
         # ~~~~~~~~~~~~~~ RoadwayManager ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Remove overwash from roadway after each model year, place on the dune, rebuild dunes if
         # fall below height threshold, and check if dunes should grow naturally.
-        for iB3D in range(self._ny):
-
-            if self._roadway_management_module[iB3D]:
-
-                # if the roadway drowned or was too narrow for the road to be relocated, stop managing the road!
-                # NOTE: dune heights must drop below Dmax before reset, so while calling reset_dune_growth rates seems
-                # redundant, it doesn't slow us down computationally, so just do it
-                if (
-                    self._roadways[iB3D].drown_break
-                    or self._roadways[iB3D].relocation_break
-                ):
-                    # if it was specified that roadways are abandonded in groups, abandon the group
-                    if self._group_roadway_abandonment is not None:
-
-                        # find the group indices
-                        group_roadways = np.where(
-                            np.array(self._group_roadway_abandonment)
-                            == self._group_roadway_abandonment[iB3D]
-                        )[0]
-                        self._road_break[group_roadways[0] : group_roadways[-1] + 1] = [
-                            1
-                        ] * len(group_roadways)
-
-                        # label the other group indices as broken
-                        for iRoad in group_roadways:
-                            if self._roadways[iB3D].drown_break:
-                                self._roadways[iRoad].drown_break = 1
-                            else:
-                                self._roadways[iRoad].relocation_break = 1
-
-                            # set dune growth rates back to original only when dune elevation is less than equilibrium
-                            self._barrier3d[
-                                iRoad
-                            ].growthparam = self.reset_dune_growth_rates(
-                                original_growth_param=self._roadways[
-                                    iRoad
-                                ]._original_growth_param,
-                                iB3D=iRoad,
-                            )
-
-                    else:
-                        self._road_break[iB3D] = 1
-
-                        # set dune growth rates back to original only when dune elevation is less than equilibrium
-                        self._barrier3d[
-                            iB3D
-                        ].growthparam = self.reset_dune_growth_rates(
-                            original_growth_param=self._roadways[
-                                iB3D
-                            ]._original_growth_param,
-                            iB3D=iB3D,
-                        )
-
-                else:
-                    # manage that road!
-                    self._roadways[iB3D].road_relocation_width = self._road_width[
-                        iB3D
-                    ]  # type: float
-                    self._roadways[iB3D].road_relocation_setback = self._road_setback[
-                        iB3D
-                    ]
-                    self._roadways[iB3D].update(
-                        self._barrier3d[iB3D], self._trigger_dune_knockdown
-                    )
-
-                # update x_b to include a fake beach width and the dune line; we add a fake beach width for coupling
-                # with the beach nourishment module below (i.e., if half the domain is initialized with roadways and
-                # the other half with a community, I want them to start with the same beach back barrier position)
-                self._barrier3d[iB3D].x_b_TS[-1] = (
-                    self._barrier3d[iB3D].x_s
-                    + self._barrier3d[iB3D].InteriorWidth_AvgTS[-1]
-                    + np.size(
-                        self._barrier3d[iB3D].DuneDomain, 2
-                    )  # dune domain width in dam
-                    + (self._initial_beach_width[iB3D] / 10)  # dam
-                )
+        for iB3D in active_domains:
+            self._update_roadway(iB3D)
 
         # ~~~~~~~~~~~~~~ CHOM coupler (in development) ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Provide agents in the Coastal Home Ownership Model (CHOM) with variables describing the physical environment
@@ -666,59 +1144,8 @@ class Cascade:
         # or rebuild_dunes_now to rebuild dunes. Resets any "now" parameters to false after nourishment. Module
         # also filters overwash deposition for residential or commercial communities (user specified) and bulldozes
         # some of remaining overwash to dunes.
-        for iB3D in range(self._ny):
-
-            if self._beach_nourishment_module[iB3D]:
-                # if barrier was too narrow to sustain a community in the last time step, stop managing beach and dunes!
-                # NOTE: dune heights must drop below Dmax before reset, so while calling reset_dune_growth rates seems
-                # redundant, it doesn't slow us down computationally, so just do it
-                if self._nourishments[iB3D].narrow_break:
-                    self._community_break[iB3D] = 1
-
-                    # set dune growth rates back to original only when dune elevation is less than equilibrium
-                    self._barrier3d[iB3D].growthparam = self.reset_dune_growth_rates(
-                        original_growth_param=self._nourishments[
-                            iB3D
-                        ]._original_growth_param,
-                        iB3D=iB3D,
-                    )
-
-                # else manage that community!
-                else:
-                    self._nourishments[
-                        iB3D
-                    ].dune_design_elevation = self._dune_design_elevation[
-                        iB3D
-                    ]  # m MHW
-                    self._nourishments[
-                        iB3D
-                    ].nourishment_volume = self._nourishment_volume[iB3D]
-                    [
-                        self._nourish_now[iB3D],
-                        self._rebuild_dune_now[iB3D],
-                    ] = self._nourishments[iB3D].update(
-                        barrier3d=self._barrier3d[iB3D],
-                        nourish_now=self._nourish_now[iB3D],
-                        rebuild_dune_now=self._rebuild_dune_now[iB3D],
-                        nourishment_interval=self._nourishment_interval[iB3D],
-                    )
-
-                # update x_b to include a beach width and the dune line; after the community is abandoned, we set the
-                # beach width for the remaining time steps to the last managed beach width in order to not have a huge
-                # jump in the back-barrier position in Barrier3D
-                self._barrier3d[iB3D].x_b_TS[-1] = (
-                    self._barrier3d[iB3D].x_s
-                    + self._barrier3d[iB3D].InteriorWidth_AvgTS[-1]
-                    + np.size(
-                        self._barrier3d[iB3D].DuneDomain, 2
-                    )  # dune domain width in dam
-                    + (
-                        self._nourishments[iB3D].beach_width[
-                            self._barrier3d[iB3D].time_index - 1
-                        ]
-                        / 10
-                    )  # dam
-                )
+        for iB3D in active_domains:
+            self._update_nourishment(iB3D)
 
         ###############################################################################
         # update BRIE for any human modifications to the barrier
@@ -739,10 +1166,79 @@ class Cascade:
                 x_t, x_s, x_b, h_b, s_sf
             )
 
+    ###############################################################################
+    # scenario branching
+    ###############################################################################
+
+    def fork(self, name=None, checkpoint_directory=None):
+        """Clone the model at the current year, e.g. to branch several management scenarios from a shared history
+
+        The history of finalized years (Barrier3D's DomainTS and the post-storm interior and dune domains saved by the
+        managers, see `cascade.checkpoint`) and the storm series are shared between the original model and the clone
+        instead of being copied; all other state is copied. The shared arrays are made read-only, so modifying them
+        in place raises an error instead of changing the history of the other branches (the history of a year can
+        still be replaced, which only affects one branch).
+
+        :param name: name of the cloned simulation [default: name of this simulation]
+        :param checkpoint_directory: checkpoint directory of the clone [default: the checkpoint directory of this
+            simulation, suffixed with a unique id]
+
+        :return: cascade
+        """
+        memo = {}
+        for _, history in history_lists(self):
+            for t in range(min(self.time_index - 1, len(history))):
+                if isinstance(history[t], np.ndarray):
+                    history[t].flags.writeable = False
+                    memo[id(history[t])] = history[t]
+        for barrier3d in self._barrier3d:
+            memo[id(barrier3d.StormSeries)] = barrier3d.StormSeries
+
+        branch = copy.deepcopy(self, memo)
+
+        branch._checkpoint_run_id = uuid.uuid4().hex
+        if name is not None:
+            branch._filename = name
+        if checkpoint_directory is None:
+            checkpoint_directory = "{}-{}".format(
+                os.path.normpath(self._checkpoint_directory),
+                branch._checkpoint_run_id[:8],
+            )
+        branch._checkpoint_directory = checkpoint_directory
+
+        return branch
+
     ###############################################################################
     # save data
     ###############################################################################
 
+    def checkpoint(self, directory=None):
+        """Write a checkpoint of the full model state (see `cascade.checkpoint`)
+
+        :param directory: checkpoint directory [default: `checkpoint_directory`]
+
+        :return: path to the checkpoint pointer file
+        """
+        if directory is None:
+            directory = self._checkpoint_directory
+
+        return write_checkpoint(self, directory)
+
+    @classmethod
+    def resume(cls, path):
+        """Load a Cascade instance from its latest checkpoint, to continue the simulation exactly where it left off
+
+        :param path: checkpoint directory (or its pointer file)
+
+        :return: cascade
+
+        """
+        cascade = load_checkpoint(path)
+        if not isinstance(cascade, cls):
+            raise CascadeError("Checkpoint does not contain a Cascade instance")
+
+        return cascade
+
     def save(self, directory):
 
         filename = self._filename + ".npz"
@@ -752,3 +1248,4 @@ class Cascade:
 
         os.chdir(directory)
         np.savez(filename, cascade=csc8d)
+        write_summary(self, summary_path(filename))
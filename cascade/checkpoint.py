@@ -0,0 +1,197 @@
+"""Checkpoint and resume CASCADE simulations
+
+A checkpoint directory contains:
+    1) `checkpoint.json`, a pointer to the latest complete checkpoint,
+    2) `state-<time index>.pkl.gz`, the full model state (Barrier3D domains, BRIE, managers, CHOM, and the states of the
+       global random number generators), without the history of finalized model years,
+    3) `history-<start>-<stop>.npz`, the history of finalized model years [start, stop) -- Barrier3D's DomainTS and the
+       post-storm interior and dune domains saved by the managers -- written once by the checkpoint that first sees them.
+
+Because only the latest state file is kept and the history is appended in chunks, each checkpoint costs about as much
+as the current state of the model rather than a full `save()` of its history. Every file is first written to a
+temporary file and then moved into place, and the pointer is updated last, so a job that is killed while writing a
+checkpoint leaves the previous checkpoint intact.
+
+Notes
+---------
+The entries of the history lists for years before the most recent model year (`time_index - 1`) are never modified
+again during a simulation (Barrier3D creates a new interior domain every year, and the managers only modify the most
+recent year), which is what makes it safe to write them once.
+
+"""
+import gzip
+import json
+import os
+import pickle
+import random
+from pathlib import Path
+
+import numpy as np
+
+POINTER_FILE = "checkpoint.json"
+
+
+def history_lists(cascade):
+    """Key and list for each of the (append-only) history lists held by a Cascade instance
+
+    :param cascade: a Cascade instance
+
+    :return: list of (key, list) tuples
+    """
+    histories = []
+
+    for iB3D, barrier3d in enumerate(cascade.barrier3d):
+        histories.append(("barrier3d{}_DomainTS".format(iB3D), barrier3d.DomainTS))
+
+    for module_name, managers in [
+        ("roadways", cascade.roadways),
+        ("nourishments", cascade.nourishments),
+    ]:
+        for iB3D, manager in managers.built():  # without constructing unused managers
+            histories.append(
+                (
+                    "{}{}_post_storm_interior".format(module_name, iB3D),
+                    manager._post_storm_interior,
+                )
+            )
+            histories.append(
+                (
+                    "{}{}_post_storm_dunes".format(module_name, iB3D),
+                    manager._post_storm_dunes,
+                )
+            )
+
+    return histories
+
+
+def _atomic_write(path, write):
+    """Write a file with `write(file_object)` to a temporary file, and then move it into place"""
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_pointer(directory):
+    """Return the contents of the checkpoint pointer file, or None if the directory does not contain a checkpoint"""
+
+    pointer_file = Path(directory) / POINTER_FILE
+    if not pointer_file.is_file():
+        return None
+
+    with open(pointer_file) as f:
+        return json.load(f)
+
+
+def write_checkpoint(cascade, directory):
+    """Write a checkpoint of a Cascade instance, appending any newly finalized history to the checkpoint directory
+
+    :param cascade: a Cascade instance
+    :param directory: checkpoint directory (created if it does not exist)
+
+    :return: path to the checkpoint pointer file
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # start over if the directory holds the checkpoint of another simulation
+    pointer = read_pointer(directory)
+    if pointer is None or pointer.get("run_id") != cascade._checkpoint_run_id:
+        pointer = {"run_id": cascade._checkpoint_run_id, "chunks": [], "history_end": 0}
+    time_index = cascade.time_index
+    finalized = max(time_index - 1, 0)
+    histories = history_lists(cascade)
+
+    # append the history of years that were finalized since the last checkpoint
+    start = pointer["history_end"]
+    if finalized > start:
+        arrays = {}
+        for key, history in histories:
+            for t in range(start, min(finalized, len(history))):
+                if history[t] is not None:
+                    arrays["{}__{}".format(key, t)] = np.asarray(history[t])
+
+        chunk = "history-{:06d}-{:06d}.npz".format(start, finalized)
+        _atomic_write(directory / chunk, lambda f: np.savez_compressed(f, **arrays))
+        pointer["chunks"].append(chunk)
+        pointer["history_end"] = finalized
+
+    # write the state without the finalized history (detach, pickle, and then restore the history entries)
+    detached = []
+    for _, history in histories:
+        for t in range(min(pointer["history_end"], len(history))):
+            if history[t] is not None:
+                detached.append((history, t, history[t]))
+                history[t] = None
+
+    state = {
+        "cascade": cascade,
+        "numpy_random_state": np.random.get_state(),
+        "random_state": random.getstate(),
+    }
+    state_file = "state-{:06d}.pkl.gz".format(time_index)
+
+    def write_state(f):
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=1) as gz:
+            pickle.dump(state, gz, protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        _atomic_write(directory / state_file, write_state)
+    finally:
+        for history, t, entry in detached:
+            history[t] = entry
+
+    previous_state_file = pointer.get("state")
+    pointer["state"] = state_file
+    pointer["time_index"] = time_index
+    _atomic_write(
+        directory / POINTER_FILE,
+        lambda f: f.write(json.dumps(pointer, indent=2).encode("utf-8")),
+    )
+
+    if previous_state_file is not None and previous_state_file != state_file:
+        try:
+            (directory / previous_state_file).unlink()
+        except FileNotFoundError:
+            pass
+
+    return directory / POINTER_FILE
+
+
+def load_checkpoint(path):
+    """Load a Cascade instance from a checkpoint, and restore the states of the global random number generators
+
+    :param path: checkpoint directory (or its pointer file)
+
+    :return: cascade
+    """
+    directory = Path(path)
+    if directory.is_file():
+        directory = directory.parent
+
+    pointer = read_pointer(directory)
+    if pointer is None:
+        raise FileNotFoundError(
+            "No checkpoint found in {}".format(os.path.abspath(directory))
+        )
+
+    with gzip.open(directory / pointer["state"], "rb") as f:
+        state = pickle.load(f)
+
+    cascade = state["cascade"]
+
+    # reattach the history of finalized years
+    histories = dict(history_lists(cascade))
+    for chunk in pointer["chunks"]:
+        with np.load(directory / chunk) as data:
+            for name in data.files:
+                key, t = name.rsplit("__", 1)
+                histories[key][int(t)] = data[name]
+
+    np.random.set_state(state["numpy_random_state"])
+    random.setstate(state["random_state"])
+
+    return cascade
@@ -21,7 +21,6 @@ CHOM are then averaged for each set of indices before passing to CHOM.
 """
 import numpy as np
 
-from chom import Chom
 from .roadway_manager import rebuild_dunes
 
 dm3_to_m3 = 1000  # convert from cubic decameters to cubic meters
@@ -236,6 +235,8 @@ class ChomCoupler:
 
         """
         self._dune_design_elevation = dune_design_elevation
+        from chom import Chom
+
         self._chom = []
         ny = len(barrier3d)
 
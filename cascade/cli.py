@@ -0,0 +1,312 @@
+"""Command line interface for batch runs
+
+    $ cascade run config.yaml
+    $ cascade ensemble sweep.yaml --member $SLURM_ARRAY_TASK_ID
+    $ cascade monitor telemetry/
+
+A configuration file (YAML) describes one simulation::
+
+    datadir: pathways_data/     # directory with the Barrier3D input files (relative to the configuration file)
+    output: output/             # output directory (relative to the configuration file) [default: working directory]
+    parameters:                 # keyword arguments of `Cascade`
+      name: RUN4-pt75-low
+      parameter_file: RUN4-CASCADE-parameters.yaml
+      storm_file: StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy
+      elevation_file: b3d_pt75_3284yrs_low-elevations.csv
+      dune_file: pathways-dunes.npy
+      alongshore_section_count: 1
+      time_step_count: 1000
+      alongshore_transport_module: false
+      beach_nourishment_module: false
+
+A simulation runs until `time_step_count` is reached or the barrier drowns (`b3d_break`), and its output is written
+to `<output>/<name>.npz` (see `cascade.output`). If the parameters include `checkpoint_interval`, checkpoints are
+written to `<output>/<name>-checkpoint` (unless `checkpoint_directory` is given), and `--resume` continues an
+interrupted simulation from its latest checkpoint.
+
+An ensemble file describes a set of simulations (members), as a configuration (inline, or in a `base` configuration
+file) and the parameters that vary between members::
+
+    base: config.yaml           # configuration of all members (relative to the ensemble file)
+    parameters:                 # parameters (of `Cascade`) that override those of the base configuration
+      time_step_count: 200
+    sweep:                      # the members are all combinations of these values...
+      min_dune_growth_rate: [0.25, 0.35, 0.45]
+      storm_library_member: [0, 1, 2, 3]
+    members:                    # ...for each of these (optional) sets of parameters
+      - {sea_level_rise_rate: 0.004}
+      - {sea_level_rise_rate: 0.008}
+
+Member `i` is named `<name>-<i>` (zero-padded). `cascade ensemble --member i` runs a single member, so that the members
+can be distributed over the tasks of a job array of a scheduler; without `--member`, all members are run in turn.
+Members share the input files, including the Barrier3D `parameter_file`, which is only read (see
+`brie_coupler.initialize_equal`).
+
+With `--telemetry`, `run` and `ensemble` send a record of each model year to a directory (one file per simulation), a
+named pipe, or a socket (see `cascade.telemetry`), and `cascade monitor` follows the progress of all of the simulations
+that report to a set of directories or to a socket::
+
+    $ cascade ensemble sweep.yaml --member $SLURM_ARRAY_TASK_ID --telemetry udp://login1:9999
+    $ cascade monitor --listen udp://0.0.0.0:9999
+
+"""
+import itertools
+import os
+import time
+from pathlib import Path
+
+import click
+from yaml import safe_load
+
+
+def _resolve(path, base):
+    """`path` relative to the directory `base` (if it is not absolute)"""
+    return Path(base) / Path(os.path.expanduser(str(path)))
+
+
+def load_config(path):
+    """Read a configuration file
+
+    :param path: configuration file (YAML)
+
+    :return: dict with the data directory ("datadir"), output directory ("output"), and Cascade parameters
+        ("parameters")
+    """
+    path = Path(path)
+    with open(path) as f:
+        config = safe_load(f) or {}
+
+    base = {}
+    if "base" in config:
+        base = load_config(_resolve(config["base"], path.parent))
+
+    parameters = dict(base.get("parameters", {}))
+    parameters.update(config.get("parameters") or {})
+
+    if "datadir" in config:
+        datadir = _resolve(config["datadir"], path.parent)
+    elif "datadir" in base:
+        datadir = Path(base["datadir"])
+    else:
+        raise click.UsageError("{}: no datadir specified".format(path))
+
+    if "output" in config:
+        output = _resolve(config["output"], path.parent)
+    else:
+        output = Path(base.get("output", os.getcwd()))
+
+    return {
+        "datadir": str(datadir),
+        "output": str(output),
+        "parameters": parameters,
+        "sweep": config.get("sweep") or {},
+        "members": config.get("members") or [{}],
+    }
+
+
+def ensemble_members(config):
+    """Parameters of each member of an ensemble (see the module docstring)
+
+    :param config: ensemble configuration (see `load_config`)
+
+    :return: list of dicts of Cascade parameters
+    """
+    name = config["parameters"].get("name", "default")
+    names = list(config["sweep"])
+    combinations = list(itertools.product(*[config["sweep"][key] for key in names]))
+    n_members = len(config["members"]) * len(combinations)
+
+    members = []
+    for member, (fixed, values) in enumerate(
+        itertools.product(config["members"], combinations)
+    ):
+        parameters = dict(config["parameters"])
+        parameters.update(fixed)
+        parameters.update(zip(names, values))
+        parameters["name"] = "{}-{:0{}d}".format(
+            name, member, len(str(max(n_members - 1, 0)))
+        )
+        members.append(parameters)
+
+    return members
+
+
+def run_simulation(
+    datadir, parameters, output, resume=False, config=None, telemetry=None
+):
+    """Run a simulation until the end of the time loop or until the barrier drowns (in Barrier3D or BRIE), and write its
+    output
+
+    :param datadir: directory with the Barrier3D input files
+    :param parameters: keyword arguments of `Cascade`
+    :param output: output directory
+    :param resume: continue from the latest checkpoint of the simulation, if there is one
+    :param config: configuration stored with the output
+    :param telemetry: target of the telemetry of the simulation (see `cascade.telemetry`), if any
+
+    :return: Cascade instance, path to the output file
+    """
+    from .cascade import Cascade
+    from .checkpoint import read_pointer
+    from .output import write_output
+
+    parameters = dict(parameters)
+    name = parameters.setdefault("name", "default")
+    if parameters.get("checkpoint_interval") is not None:
+        parameters.setdefault(
+            "checkpoint_directory", str(Path(output) / (name + "-checkpoint"))
+        )
+
+    checkpoint_directory = parameters.get("checkpoint_directory")
+    if resume and checkpoint_directory and read_pointer(checkpoint_directory):
+        model = Cascade.resume(checkpoint_directory)
+    else:
+        model = Cascade(os.path.join(datadir, ""), **parameters)
+
+    if telemetry is not None:
+        from .telemetry import Telemetry
+
+        telemetry = Telemetry(telemetry).attach(model)
+
+    try:
+        while (
+            model.time_index < model.time_step_count
+            and not model.b3d_break
+            and not model.brie.drown
+        ):
+            model.update()
+    finally:
+        if telemetry is not None:
+            telemetry.detach()
+
+    path = write_output(model, Path(output) / (name + ".npz"), config=config)
+
+    return model, path
+
+
+def _report(cascade, path):
+    status = "drowned" if cascade.b3d_break else "completed"
+    click.echo(
+        "{}: {} after {} years, output written to {}".format(
+            cascade._filename, status, cascade.time_index - 1, path
+        )
+    )
+
+
+@click.group()
+@click.version_option(package_name="cascade")
+def cascade():
+    """The CoAStal Community-lAnDscape Evolution (CASCADE) model"""
+
+
+@cascade.command()
+@click.argument("config", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--output", "-o", type=click.Path(file_okay=False), help="Output directory."
+)
+@click.option(
+    "--resume", is_flag=True, help="Continue from the latest checkpoint, if any."
+)
+@click.option(
+    "--telemetry",
+    help="Send a record of each year to a directory, named pipe, or socket (udp://host:port or unix:///path).",
+)
+def run(config, output, resume, telemetry):
+    """Run the simulation of a configuration file"""
+    config = load_config(config)
+    simulation, path = run_simulation(
+        config["datadir"],
+        config["parameters"],
+        output or config["output"],
+        resume=resume,
+        config=config,
+        telemetry=telemetry,
+    )
+    _report(simulation, path)
+
+
+@cascade.command()
+@click.argument("ensemble", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--member",
+    "-m",
+    type=int,
+    multiple=True,
+    help="Index of the member to run (e.g., $SLURM_ARRAY_TASK_ID); can be repeated [default: all members].",
+)
+@click.option(
+    "--output", "-o", type=click.Path(file_okay=False), help="Output directory."
+)
+@click.option(
+    "--resume", is_flag=True, help="Continue from the latest checkpoints, if any."
+)
+@click.option(
+    "--list", "list_members", is_flag=True, help="List the members and exit."
+)
+@click.option(
+    "--telemetry",
+    help="Send a record of each year to a directory, named pipe, or socket (udp://host:port or unix:///path).",
+)
+def ensemble(ensemble, member, output, resume, list_members, telemetry):
+    """Run the members of an ensemble file"""
+    config = load_config(ensemble)
+    members = ensemble_members(config)
+
+    if list_members:
+        for index, parameters in enumerate(members):
+            click.echo("{}\t{}".format(index, parameters["name"]))
+        return
+
+    indices = member or range(len(members))
+    for index in indices:
+        if not 0 <= index < len(members):
+            raise click.BadParameter(
+                "the ensemble has {} members".format(len(members)), param_hint="--member"
+            )
+
+    for index in indices:
+        simulation, path = run_simulation(
+            config["datadir"],
+            members[index],
+            output or config["output"],
+            resume=resume,
+            config=dict(config, parameters=members[index], member=index),
+            telemetry=telemetry,
+        )
+        _report(simulation, path)
+
+
+@cascade.command()
+@click.argument("directories", nargs=-1, type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--listen", help="Receive records on a socket (udp://host:port or unix:///path)."
+)
+@click.option(
+    "--interval",
+    type=float,
+    default=5.0,
+    show_default=True,
+    help="Seconds between updates.",
+)
+@click.option("--once", is_flag=True, help="Show the progress once and exit.")
+def monitor(directories, listen, interval, once):
+    """Follow the progress of the simulations that send telemetry to DIRECTORIES or a socket"""
+    from .telemetry import Aggregator
+
+    if not directories and listen is None:
+        raise click.UsageError("give telemetry directories, or a socket to --listen on")
+
+    aggregator = Aggregator(directories, listen=listen)
+    try:
+        while True:
+            aggregator.poll()
+            if not once:
+                click.clear()
+            click.echo(aggregator.table())
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        aggregator.close()
@@ -0,0 +1,195 @@
+"""Preallocated history of the interior domain of a Barrier3D model
+
+Barrier3D keeps the interior domain of each year in a list (`DomainTS`) of arrays whose cross-shore width changes as the
+barrier evolves, so each year of the history is a separate allocation, and analyses stack the list to use it. A
+`DomainHistory` stores the history of a domain in preallocated 3-D blocks (time x cross-shore x alongshore), each
+holding `block_years` years, along with the valid cross-shore width of each year; cells beyond the width of a year are
+NaN. The cross-shore capacity of a block grows (by 25%) if the barrier becomes wider than any year before it.
+
+CASCADE mirrors the DomainTS of each domain into its history after every time step (see `mirror`), and replaces the
+entries of finalized years in DomainTS by views into the history, so the two share memory and code that indexes
+DomainTS works as before. The years of a block can be read as a single slice (`array`), and the whole history can be
+written with `save`. The history of a domain that is no longer updated (a frozen drowned domain, see `Cascade`) is
+padded with its last year (`pad`), so the histories of all domains cover the same years.
+
+The blocks are only a mirror of DomainTS: they are not pickled (e.g., in checkpoints, which store DomainTS, see
+`cascade.checkpoint`) and are rebuilt from DomainTS on the next call to `mirror`. Copies (e.g., `Cascade.fork`) share
+the blocks with the original, and a shared block is copied (by whichever of the two writes to it) before it is modified.
+
+"""
+import numpy as np
+
+
+class DomainHistory:
+    def __init__(self, time_step_count, alongshore_length, dtype=np.float64, block_years=100):
+        """History of an interior domain
+
+        :param time_step_count: number of years of the history
+        :param alongshore_length: alongshore length of the domain [dam]
+        :param dtype: storage precision of the history
+        :param block_years: number of years per block
+        """
+        self._nt = time_step_count
+        self._ny = alongshore_length
+        self._dtype = np.dtype(dtype)
+        self._block_years = block_years
+        self._blocks = None
+        self._widths = None
+        self._end = 0
+        self._capacity = 0
+
+    def _reset(self):
+        self._blocks = [None] * -(-self._nt // self._block_years)
+        self._widths = np.zeros(self._nt, dtype=np.int64)
+        self._end = 0
+        self._capacity = 0
+
+    def __getstate__(self):
+        # the blocks are rebuilt from DomainTS (see `mirror`)
+        state = self.__dict__.copy()
+        state.update(_blocks=None, _widths=None, _end=0, _capacity=0)
+        return state
+
+    def __deepcopy__(self, memo):
+        # share the blocks with the copy until either of them writes to a block
+        clone = DomainHistory.__new__(DomainHistory)
+        clone.__dict__.update(self.__dict__)
+        if self._blocks is not None:
+            for block in self._blocks:
+                if block is not None:
+                    block.flags.writeable = False
+            clone._blocks = list(self._blocks)
+            clone._widths = self._widths.copy()
+        memo[id(self)] = clone
+        return clone
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def block_years(self):
+        return self._block_years
+
+    @property
+    def widths(self):
+        """Cross-shore width of the interior domain in each year (0 for years that have not been recorded)"""
+        return self._widths
+
+    @property
+    def end(self):
+        """Number of years that have been recorded"""
+        return self._end
+
+    def __len__(self):
+        return self._nt
+
+    def __getitem__(self, t):
+        """Interior domain of a year (a view into the history), or None if the year has not been recorded"""
+        if self._widths is None or not self._widths[t]:
+            return None
+        block, row = divmod(t, self._block_years)
+        return self._blocks[block][row, : self._widths[t]]
+
+    def _write(self, t, domain):
+        """Copy the interior domain of a year into the history; return True if its block was reallocated"""
+        domain = np.asarray(domain)
+        width = domain.shape[0]
+        block_index, row = divmod(t, self._block_years)
+        block = self._blocks[block_index]
+
+        reallocated = (
+            block is None or block.shape[1] < width or not block.flags.writeable
+        )
+        if reallocated:
+            if block is None:
+                capacity = max(width, self._capacity)
+            elif block.shape[1] < width:
+                capacity = max(width, int(np.ceil(block.shape[1] * 1.25)))
+            else:  # shared with a copy
+                capacity = block.shape[1]
+            self._capacity = max(self._capacity, capacity)
+            new_block = np.full(
+                (self._block_years, capacity, self._ny), np.nan, dtype=self._dtype
+            )
+            if block is not None:
+                new_block[:, : block.shape[1]] = block
+            block = self._blocks[block_index] = new_block
+
+        block[row, :width] = domain
+        block[row, width:] = np.nan
+        self._widths[t] = width
+
+        return reallocated
+
+    def mirror(self, domain_ts, time_index):
+        """Record the years before `time_index` of a Barrier3D DomainTS list, and replace the entries of finalized
+        years (before `time_index - 1`) with views into the history
+
+        :param domain_ts: Barrier3D's DomainTS
+        :param time_index: Barrier3D's time index
+        """
+        if self._blocks is None:
+            self._reset()
+        start = max(self._end - 1, 0)  # the last recorded year may have changed since
+        stop = min(time_index, len(domain_ts), self._nt)
+
+        views = set()
+        for t in range(start, stop):
+            if domain_ts[t] is None:
+                continue
+            if self._write(t, domain_ts[t]):
+                # the entries of a reallocated block must point to the new block
+                first = (t // self._block_years) * self._block_years
+                views.update(range(first, t))
+            views.add(t)
+        self._end = max(self._end, stop)
+
+        finalized = time_index - 1
+        for t in views:
+            if t < finalized and self._widths[t]:
+                domain_ts[t] = self[t]
+
+    def pad(self, stop):
+        """Repeat the last recorded year in the years up to `stop` (these years are not part of DomainTS)
+
+        :param stop: number of years the history should cover
+        """
+        stop = min(stop, self._nt)
+        if self._blocks is None or self._end == 0 or stop <= self._end:
+            return
+
+        last = self[self._end - 1]
+        for t in range(self._end, stop):
+            self._write(t, last)
+        self._end = stop
+
+    def array(self, start=0, stop=None):
+        """Interior domains of years [start, stop) as an array (years x cross-shore x alongshore; NaN beyond the
+        width of each year); a view into the history if the years are within one block"""
+        if stop is None:
+            stop = self._end
+        if self._blocks is None or stop <= start:
+            return np.empty((0, 0, self._ny), dtype=self._dtype)
+
+        first_block, last_block = start // self._block_years, (stop - 1) // self._block_years
+        width = int(self._widths[start:stop].max())
+        if first_block == last_block:
+            offset = first_block * self._block_years
+            return self._blocks[first_block][start - offset : stop - offset, :width]
+
+        domains = np.full((stop - start, width, self._ny), np.nan, dtype=self._dtype)
+        for block_index in range(first_block, last_block + 1):
+            block = self._blocks[block_index]
+            offset = block_index * self._block_years
+            rows = slice(max(start, offset), min(stop, offset + self._block_years))
+            if block is not None:
+                block_width = min(width, block.shape[1])
+                domains[rows.start - start : rows.stop - start, :block_width] = block[
+                    rows.start - offset : rows.stop - offset, :block_width
+                ]
+        return domains
+
+    def save(self, file):
+        """Write the recorded history (`array` and `widths`) to a .npz file"""
+        np.savez(file, domain=self.array(), widths=self.widths[: self._end])
@@ -0,0 +1,328 @@
+"""Statistics of an ensemble of simulations, one summary per run
+
+The statistics of the pathways experiments (e.g., the year a community abandoned its road, or how often the dunes were
+rebuilt) are computed from each of the (hundreds of) runs of an ensemble, and most of the time goes into loading the
+pickled runs (see `Cascade.save`). `aggregate` maps a summary function -- a function of a loaded run that returns a
+dict of scalars, e.g. `roadway_summary` or `nourishment_summary` -- over the run files of an ensemble with a pool of
+processes, and collects the summaries into a pandas DataFrame, one row per run::
+
+    summaries = aggregate("Run_Output/Roadway_100sims", roadway_summary, pattern="Roadway_100sims*.npz", n_jobs=-1)
+    summaries["year_abandoned"].mean()
+
+Each summary is cached in a small sidecar file next to its run, `<run file>.summary-<key>.json`, where the key
+identifies the summary function and its arguments, and the sidecar records a digest (sha256) of the run file, so a
+summary is only computed again if the run file changes. The digest is only recomputed if the size or modification time
+of the run file changes.
+
+Every run also writes a compact summary of its outcome when it is saved (`<name>.summary.json`; see
+`cascade.output.run_summary`), and `scan_summaries` reads these into a DataFrame without loading any of the runs::
+
+    summaries = scan_summaries("Run_Output/Roadway_100sims")
+    summaries["road_abandoned_year_0"].mean()
+
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+from .input_cache import file_digest
+
+
+def load_run(path):
+    """Load a run saved with `Cascade.save`
+
+    :param path: run file (.npz)
+
+    :return: Cascade instance
+    """
+    with np.load(path, allow_pickle=True) as output:
+        return output["cascade"][0]
+
+
+def _barrier_differences(b3d, tmax_sim, natural_barrier_width, natural_barrier_elev):
+    """Difference between the barrier width and elevation of a natural run and of this run, at the end of tmax_sim"""
+    final_barrier_width = (
+        np.array(b3d.x_b_TS[tmax_sim - 1]) - np.array(b3d.x_s_TS[tmax_sim - 1])
+    ) * 10  # m
+    final_domain = np.array(b3d.DomainTS[tmax_sim - 1]) * 10
+    final_barrier_elev = final_domain[final_domain > 0].mean()  # m MHW
+
+    return {
+        "diff_barrier_width": (
+            np.nan
+            if natural_barrier_width is None
+            else natural_barrier_width - final_barrier_width
+        ),
+        "diff_barrier_elev": (
+            np.nan
+            if natural_barrier_elev is None
+            else natural_barrier_elev - final_barrier_elev
+        ),
+    }
+
+
+def roadway_summary(
+    cascade, iB3D=0, tmax=None, natural_barrier_width=None, natural_barrier_elev=None
+):
+    """
+    :param cascade: a Cascade instance (from a roadway management run)
+    :param iB3D: the B3D subdomain that you want statistics for
+    :param tmax: if given, the statistics are calculated for the years before tmax (instead of the whole simulation)
+    :param natural_barrier_width: barrier width at the end of the corresponding natural run [m]
+    :param natural_barrier_elev: barrier elevation at the end of the corresponding natural run [m MHW]
+    :return: dict of
+    year_abandoned (year the roadway was abandoned),
+    sim_max (total length of simulation),
+    road_bulldozed (number of times overwash was removed from the road),
+    overwash_removed (total m^3 of overwash removed),
+    dune_rebuilt (number of times the dune was rebuilt),
+    road_relocated (number of road relocations),
+    diff_barrier_width, diff_barrier_elev (natural minus managed barrier width [m] and elevation [m MHW] at the end;
+    NaN if the natural values are not given)
+    """
+    b3d = cascade.barrier3d[iB3D]
+    roadways = cascade.roadways[iB3D]
+
+    tmax_sim = b3d.time_index - 1
+    summary = {"sim_max": tmax_sim}
+
+    # if user specified a window for statistics, then just set tmax to that window
+    if tmax is not None:
+        tmax_sim = tmax
+
+    summary.update(
+        year_abandoned=roadways._time_index - 1,
+        road_bulldozed=int(np.sum(roadways._road_overwash_volume[0:tmax_sim] > 0)),
+        overwash_removed=float(np.sum(roadways._road_overwash_volume[0:tmax_sim])),
+        dune_rebuilt=int(np.sum(roadways._dunes_rebuilt_TS[0:tmax_sim])),
+        road_relocated=int(np.sum(roadways._road_relocated_TS[0:tmax_sim])),
+    )
+    summary.update(
+        _barrier_differences(b3d, tmax_sim, natural_barrier_width, natural_barrier_elev)
+    )
+
+    return summary
+
+
+def nourishment_summary(
+    cascade, iB3D=0, tmax=None, natural_barrier_width=None, natural_barrier_elev=None
+):
+    """
+    :param cascade: a Cascade instance (from a beach and dune management run)
+    :param iB3D: the B3D subdomain that you want statistics for
+    :param tmax: if given, the statistics are calculated for the years before tmax (instead of the whole simulation)
+    :param natural_barrier_width: barrier width at the end of the corresponding natural run [m]
+    :param natural_barrier_elev: barrier elevation at the end of the corresponding natural run [m MHW]
+    :return: dict of
+    year_abandoned (year the community stopped managing the beach and dunes),
+    sim_max (total length of simulation),
+    overwash_filtered_removed (total m^3 of overwash removed),
+    dune_rebuilt (number of times the dune was rebuilt),
+    beach_nourished (number of beach nourishments),
+    diff_barrier_width, diff_barrier_elev (natural minus managed barrier width [m] and elevation [m MHW] at the end;
+    NaN if the natural values are not given)
+    """
+    b3d = cascade.barrier3d[iB3D]
+    nourishments = cascade.nourishments[iB3D]
+
+    tmax_sim = b3d.time_index - 1
+    summary = {"sim_max": tmax_sim}
+
+    # if user specified a window for statistics, then just set tmax to that window
+    if tmax is not None:
+        tmax_sim = tmax
+
+    summary.update(
+        year_abandoned=nourishments._time_index - 1,
+        overwash_filtered_removed=float(
+            np.sum(nourishments._overwash_volume_removed[0:tmax_sim])
+        ),
+        dune_rebuilt=int(np.sum(nourishments._dunes_rebuilt_TS[0:tmax_sim])),
+        beach_nourished=int(np.sum(nourishments._nourishment_TS[0:tmax_sim])),
+    )
+    summary.update(
+        _barrier_differences(b3d, tmax_sim, natural_barrier_width, natural_barrier_elev)
+    )
+
+    return summary
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def summary_key(summary, **kwds):
+    """Key of a summary function and its arguments (part of the name of the sidecar files)"""
+    description = json.dumps(
+        {
+            "function": "{}.{}".format(summary.__module__, summary.__qualname__),
+            "arguments": kwds,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(description.encode()).hexdigest()[:16]
+
+
+def sidecar_path(path, key):
+    """Sidecar file of the summary (with key `key`) of a run file"""
+    path = Path(path)
+    return path.with_name("{}.summary-{}.json".format(path.name, key))
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_sidecar(path, key):
+    """The cached summary of a run file, or None if there is none or the run file has changed since"""
+    try:
+        with open(sidecar_path(path, key)) as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if {name: sidecar.get(name) for name in ("size", "mtime_ns")} == _file_state(path):
+        return sidecar["summary"]
+    if sidecar.get("digest") == file_digest(path):
+        write_sidecar(path, key, sidecar["summary"], digest=sidecar["digest"])
+        return sidecar["summary"]
+    return None
+
+
+def write_sidecar(path, key, summary, digest=None):
+    """Cache the summary of a run file (written to a temporary file first, so concurrent readers never see a
+    partially written sidecar)"""
+    sidecar = dict(
+        _file_state(path),
+        digest=digest or file_digest(path),
+        summary={name: _to_json(value) for name, value in summary.items()},
+    )
+
+    file_name = sidecar_path(path, key)
+    tmp_file_name = file_name.with_name(file_name.name + ".{}.tmp".format(os.getpid()))
+    with open(tmp_file_name, "w") as f:
+        json.dump(sidecar, f)
+    os.replace(tmp_file_name, file_name)
+
+
+def _compute_summary(path, summary, key, loader, cache, kwds):
+    result = summary(loader(path), **kwds)
+    if cache:
+        write_sidecar(path, key, result)
+    return result
+
+
+def summarize_run(path, summary, loader=load_run, cache=True, **kwds):
+    """Summary of a single run file, from its sidecar if it is up to date
+
+    :param path: run file
+    :param summary: summary function (see `aggregate`)
+    :param loader: function that loads a run file
+    :param cache: read and write the sidecar file
+    :param kwds: keyword arguments of `summary`
+
+    :return: dict
+    """
+    key = summary_key(summary, **kwds)
+    if cache:
+        cached = read_sidecar(path, key)
+        if cached is not None:
+            return cached
+
+    return _compute_summary(path, summary, key, loader, cache, kwds)
+
+
+def _natural_key(path):
+    """Sort key of file names with numbers in their natural order (e.g., run2 before run10)"""
+    return [
+        int(part) if part.isdigit() else part
+        for part in re.split(r"(\d+)", Path(path).name)
+    ]
+
+
+def run_files(directory, pattern="*.npz"):
+    """Run files of an ensemble directory, in natural order (e.g., run2 before run10)"""
+    return sorted(Path(directory).glob(pattern), key=_natural_key)
+
+
+def aggregate(
+    runs, summary, pattern="*.npz", n_jobs=1, loader=load_run, cache=True, **kwds
+):
+    """Summarize each run of an ensemble, in parallel, into a DataFrame
+
+    :param runs: directory with the run files of the ensemble, or a list of run files
+    :param summary: summary function, which takes a loaded run (and `kwds`) and returns a dict of scalars, e.g.
+        `roadway_summary` or `nourishment_summary`
+    :param pattern: glob pattern of the run files in `runs` (if it is a directory)
+    :param n_jobs: number of processes (see joblib.Parallel; -1 for all CPUs)
+    :param loader: function that loads a run file [default: `load_run`, for runs saved with `Cascade.save`]
+    :param cache: read and write the summaries in sidecar files next to the run files
+    :param kwds: keyword arguments of `summary` (e.g., iB3D, tmax)
+
+    :return: pandas DataFrame with one row per run, indexed by the name of the run file (without extension)
+    """
+    import pandas as pd
+    from joblib import Parallel, delayed
+
+    if isinstance(runs, (str, os.PathLike)):
+        paths = run_files(runs, pattern)
+    else:
+        paths = [Path(path) for path in runs]
+    key = summary_key(summary, **kwds)
+
+    # read the cached summaries here, and only send the runs without one to the pool
+    summaries = [read_sidecar(path, key) if cache else None for path in paths]
+    missing = [i for i, result in enumerate(summaries) if result is None]
+    computed = Parallel(n_jobs=n_jobs)(
+        delayed(_compute_summary)(paths[i], summary, key, loader, cache, kwds)
+        for i in missing
+    )
+    for i, result in zip(missing, computed):
+        summaries[i] = result
+
+    return pd.DataFrame(
+        summaries, index=pd.Index([path.stem for path in paths], name="run")
+    )
+
+
+def _flatten(summary):
+    """A run summary with the per-domain lists as columns (e.g., drowned_year -> drowned_year_0, drowned_year_1)"""
+    row = {}
+    for name, value in summary.items():
+        if isinstance(value, list):
+            row.update(
+                ("{}_{}".format(name, i), np.nan if item is None else item)
+                for i, item in enumerate(value)
+            )
+        else:
+            row[name] = value
+    return row
+
+
+def scan_summaries(directory, pattern="*.summary.json"):
+    """Read the summaries written with the runs of an ensemble (see `cascade.output.run_summary`) into a DataFrame
+
+    :param directory: directory with the runs of the ensemble
+    :param pattern: glob pattern of the summary files
+
+    :return: pandas DataFrame with one row per run, indexed by the name of the run, with one column per value of each
+        Barrier3D domain (e.g., drowned_year_0, drowned_year_1; NaN for events that did not happen)
+    """
+    import pandas as pd
+
+    rows, names = [], []
+    for path in run_files(directory, pattern):
+        with open(path) as f:
+            summary = json.load(f)
+        names.append(summary.pop("name", path.name[: -len(".summary.json")]))
+        rows.append(_flatten(summary))
+
+    return pd.DataFrame(rows, index=pd.Index(names, name="run"))
@@ -0,0 +1,152 @@
+"""Events of a simulation, for instrumentation and control from outside the time loop
+
+Each Cascade instance has an `EventBus` (`Cascade.events`) that calls the subscribed functions with an `Event` at each
+stage of a time step and for each management event. Step events, with the year being simulated:
+
+    pre_physics         before the Barrier3D domains are updated
+    post_physics        after the Barrier3D domains (and their dunes) are updated, before human management; with
+                        `pipeline_management`, once for each domain (as soon as its physics update is complete)
+    pre_management      before a manager of a domain is updated; the name of the module ("roadways" or
+                        "nourishments") is in `data["module"]`
+    post_management     after a manager of a domain is updated
+    post_update         after the time step is complete (including the checkpoint, if one is due)
+    parallel_dispatch   with `num_cores="auto"`, after the storm-affected domains are updated: the backend and number
+                        of workers chosen by the tuner, and the measured wall time (the decision of the tuner, see
+                        `cascade.parallel_tuner`, is in `data`); the event has a message when the choice changes
+
+and management events, with the year and the index of the Barrier3D domain:
+
+    road_relocated          the road was relocated landward
+    road_drowned            the road was abandoned (drowned in place, drowned by the bay, or too narrow to relocate)
+    community_abandoned     the barrier became too narrow for the community, which stopped managing it
+    nourishment             the beach was nourished
+    dune_rebuilt            the dunes were rebuilt (for the road or by the community)
+    domain_drowned          the Barrier3D domain drowned
+
+    >>> from cascade.events import EventBus, ROAD_DROWNED
+    >>> events = EventBus(echo=False)
+    >>> abandoned = []
+    >>> _ = events.subscribe(lambda event: abandoned.append(event.domain), ROAD_DROWNED)
+    >>> events.emit(ROAD_DROWNED, year=42, domain=3, message="Roadway drowned")
+    >>> abandoned
+    [3]
+
+Events of the managers that carry a message (e.g., why a road was abandoned) are printed if the bus echoes them
+(`Cascade(..., verbose=False)` turns this off for ensembles). Subscribers are not saved with the model (`save`,
+checkpoints, `fork`), since they are often closures of the code that runs the simulation.
+
+"""
+PRE_PHYSICS = "pre_physics"
+POST_PHYSICS = "post_physics"
+PRE_MANAGEMENT = "pre_management"
+POST_MANAGEMENT = "post_management"
+POST_UPDATE = "post_update"
+PARALLEL_DISPATCH = "parallel_dispatch"
+
+ROAD_RELOCATED = "road_relocated"
+ROAD_DROWNED = "road_drowned"
+COMMUNITY_ABANDONED = "community_abandoned"
+NOURISHMENT = "nourishment"
+DUNE_REBUILT = "dune_rebuilt"
+DOMAIN_DROWNED = "domain_drowned"
+
+STEP_EVENTS = (
+    PRE_PHYSICS,
+    POST_PHYSICS,
+    PRE_MANAGEMENT,
+    POST_MANAGEMENT,
+    POST_UPDATE,
+    PARALLEL_DISPATCH,
+)
+MANAGEMENT_EVENTS = (
+    ROAD_RELOCATED,
+    ROAD_DROWNED,
+    COMMUNITY_ABANDONED,
+    NOURISHMENT,
+    DUNE_REBUILT,
+    DOMAIN_DROWNED,
+)
+
+
+class Event:
+    __slots__ = ("kind", "year", "domain", "message", "data")
+
+    def __init__(self, kind, year=None, domain=None, message=None, data=None):
+        """An event of a simulation
+
+        :param kind: kind of event (see the module docstring)
+        :param year: model year
+        :param domain: index of the Barrier3D domain (None for events of the whole model)
+        :param message: description of the event
+        :param data: dict of other values of the event
+        """
+        self.kind = kind
+        self.year = year
+        self.domain = domain
+        self.message = message
+        self.data = data or {}
+
+    def __repr__(self):
+        return "Event({!r}, year={!r}, domain={!r})".format(
+            self.kind, self.year, self.domain
+        )
+
+
+class EventBus:
+    def __init__(self, echo=True):
+        """Calls the subscribed functions with the events of a simulation
+
+        :param echo: print the message of each event that has one
+        """
+        self._echo = echo
+        self._subscribers = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_subscribers"] = {}
+        return state
+
+    def __deepcopy__(self, memo):
+        return EventBus(echo=self._echo)
+
+    @property
+    def echo(self):
+        return self._echo
+
+    @echo.setter
+    def echo(self, value):
+        self._echo = value
+
+    def subscribe(self, callback, *kinds):
+        """Call `callback(event)` for each event of the given kinds (of all kinds, if none are given)
+
+        :return: callback (so this can be used as a decorator)
+        """
+        for kind in kinds or (None,):
+            self._subscribers.setdefault(kind, []).append(callback)
+        return callback
+
+    def unsubscribe(self, callback, *kinds):
+        """Stop calling `callback` for events of the given kinds (of all kinds, if none are given)"""
+        for kind in kinds or list(self._subscribers):
+            subscribers = self._subscribers.get(kind, [])
+            if callback in subscribers:
+                subscribers.remove(callback)
+
+    def has_subscribers(self, kind):
+        """True if any function is subscribed to events of this kind"""
+        return bool(self._subscribers.get(kind) or self._subscribers.get(None))
+
+    def emit(self, kind, year=None, domain=None, message=None, **data):
+        """Print the message of an event (if `echo`) and call its subscribers; the event is only created if it has
+        subscribers, so events are cheap when nobody listens"""
+        if self._echo and message is not None:
+            print(message)
+        if not self.has_subscribers(kind):
+            return
+
+        event = Event(kind, year=year, domain=domain, message=message, data=data)
+        for callback in self._subscribers.get(kind, []) + self._subscribers.get(
+            None, []
+        ):
+            callback(event)
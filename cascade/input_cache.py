@@ -0,0 +1,104 @@
+"""Binary cache for Barrier3D text inputs
+
+Initial topographies (e.g., `b3d_pt75_4261yrs_low-elevations.csv`) and other Barrier3D inputs can be text files, which
+are parsed every time a Barrier3D domain is initialized -- for every domain of every CASCADE instance of an ensemble.
+This module converts a text input once to a binary `.npy` file in a hidden `.cascade-cache` directory next to the input
+(parsed with Barrier3D's own loaders, so the values are identical), and CASCADE then points Barrier3D to the binary
+file instead. A cached file is regenerated if its source changes: the modification time and size of the source are
+checked first, and its sha256 digest is used to decide if a changed file is actually different.
+
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+CACHE_DIRECTORY_NAME = ".cascade-cache"
+
+
+def file_digest(path):
+    """Digest (sha256) of the contents of a file"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _loader(kind):
+    # parse exactly as Barrier3D would
+    from barrier3d.load_input import load_dunes, load_elevation, load_storms
+
+    return {"elevation": load_elevation, "dune": load_dunes, "storm": load_storms}[
+        kind
+    ]
+
+
+def binary_input(datadir, file_name, kind):
+    """Return the name of the binary version of a Barrier3D input file, creating or refreshing the cache if needed
+
+    :param datadir: directory containing the Barrier3D input files
+    :param file_name: name of the input file, relative to `datadir`
+    :param kind: type of input, one of "elevation", "dune", "storm"
+
+    :return: name of the file Barrier3D should load, relative to `datadir` (`file_name` itself if it is not a text file
+        or if the cache cannot be written)
+    """
+    source = Path(datadir) / file_name
+    if source.suffix.lower() != ".csv" or not source.is_file():
+        return file_name
+
+    cache_directory = source.parent / CACHE_DIRECTORY_NAME
+    cached = cache_directory / (source.name + ".npy")
+    metadata_file = cache_directory / (source.name + ".json")
+    stat = source.stat()
+
+    metadata = None
+    if cached.is_file() and metadata_file.is_file():
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+
+    if metadata is not None and (
+        metadata["mtime_ns"] != stat.st_mtime_ns or metadata["size"] != stat.st_size
+    ):
+        digest = file_digest(source)
+        if digest != metadata["sha256"]:
+            metadata = None
+        else:  # touched, but not changed
+            metadata.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            _write_metadata(metadata_file, metadata)
+
+    if metadata is None:
+        try:
+            cache_directory.mkdir(exist_ok=True)
+            data = np.asarray(_loader(kind)(str(source), fmt="csv"))
+
+            tmp = cached.with_name(cached.name + ".{}.tmp".format(os.getpid()))
+            with open(tmp, "wb") as f:
+                np.save(f, data)
+            os.replace(tmp, cached)
+
+            _write_metadata(
+                metadata_file,
+                {
+                    "source": source.name,
+                    "kind": kind,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha256": file_digest(source),
+                },
+            )
+        except OSError:  # e.g., a read-only data directory; Barrier3D will parse the text file
+            return file_name
+
+    return str(Path(file_name).parent / CACHE_DIRECTORY_NAME / cached.name)
+
+
+def _write_metadata(metadata_file, metadata):
+    tmp = metadata_file.with_name(metadata_file.name + ".{}.tmp".format(os.getpid()))
+    with open(tmp, "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp, metadata_file)
+
@@ -0,0 +1,58 @@
+"""Lists of human management modules, one per Barrier3D domain, that are constructed on first use
+
+CASCADE can start managing a domain (e.g., add a road or start nourishing) at any time during a simulation, so each
+domain needs a RoadwayManager and a BeachDuneManager -- but each manager preallocates a dozen time series and snapshot
+lists of length `time_step_count`, which most domains of most simulations (e.g., natural runs) never use. A
+`LazyManagerList` stores the arguments of each manager and only constructs a manager when it is first accessed. The
+arguments are taken when the list is created, so a manager is the same as if it had been constructed with the
+Cascade instance (its time series are filled with zeros, or NaN, until it is first updated).
+
+"""
+from collections.abc import Sequence
+
+
+class LazyManagerList(Sequence):
+    def __init__(self, manager_class, parameters):
+        """List of managers, constructed on first access
+
+        :param manager_class: class of the managers (e.g., RoadwayManager)
+        :param parameters: list of keyword arguments of `manager_class`, one dict per Barrier3D domain
+        """
+        self._manager_class = manager_class
+        self._parameters = list(parameters)
+        self._managers = [None] * len(self._parameters)
+
+    def __len__(self):
+        return len(self._managers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[iB3D] for iB3D in range(len(self))[index]]
+
+        iB3D = range(len(self))[index]  # raises IndexError, and handles negative indices
+        if self._managers[iB3D] is None:
+            self._managers[iB3D] = self._manager_class(**self._parameters[iB3D])
+            self._parameters[iB3D] = None
+        return self._managers[iB3D]
+
+    def __setitem__(self, index, manager):
+        iB3D = range(len(self))[index]
+        self._managers[iB3D] = manager
+        self._parameters[iB3D] = None
+
+    def is_built(self, index):
+        """True if the manager of a domain has been constructed"""
+        return self._managers[index] is not None
+
+    def built(self):
+        """Index and manager of each domain whose manager has been constructed (without constructing the others)"""
+        return [
+            (iB3D, manager)
+            for iB3D, manager in enumerate(self._managers)
+            if manager is not None
+        ]
+
+    def __repr__(self):
+        return "LazyManagerList({}, built={})".format(
+            self._manager_class.__name__, [iB3D for iB3D, _ in self.built()]
+        )
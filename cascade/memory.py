@@ -0,0 +1,153 @@
+"""Memory held by a Cascade instance, and the resident set size of the process during a simulation
+
+Most of the memory of a long simulation is held by its history: Barrier3D's DomainTS (see `cascade.domain_history`)
+and DuneDomain, the post-storm domains saved by the human management modules, and the time series of BRIE and CHOM.
+`memory_report` walks a Cascade instance and reports the bytes held by each of these components, for each Barrier3D
+domain:
+
+    DomainTS          interior domain of each year (the domain history and the entries of DomainTS that are not views
+                      into it)
+    DuneDomain        dune domain of each year
+    post_storm        post-storm interior and dune domains (and other post-storm variables) of the managers
+    barrier3d         everything else held by the Barrier3D model (e.g., its time series)
+    roadways          everything else held by the RoadwayManager
+    nourishments      everything else held by the BeachDuneManager
+
+and for the whole model:
+
+    brie              BRIE (e.g., its `*_save` arrays)
+    chom              CHOM
+    other             everything else held by the Cascade instance
+
+Arrays are counted once, by the first component that holds them (or a view into them), so the components add up to
+the total. Memory-mapped arrays (e.g., the storms of a storm library) are not counted, since they are backed by a file.
+
+With `Cascade(..., sample_memory=True)`, the resident set size of the process is recorded after each time step (see
+`Cascade.memory_samples`), e.g., to size the jobs of an ensemble.
+
+"""
+import os
+import sys
+
+import numpy as np
+
+DOMAIN_COMPONENTS = (
+    "DomainTS",
+    "DuneDomain",
+    "post_storm",
+    "barrier3d",
+    "roadways",
+    "nourishments",
+)
+MODEL_COMPONENTS = ("brie", "chom", "other")
+
+# objects of these packages are walked attribute by attribute; other objects are counted with sys.getsizeof
+_PACKAGES = ("cascade", "barrier3d", "brie", "chom")
+
+
+def _owner(array):
+    """The array that owns the memory of `array` (None if it is memory mapped)"""
+    while True:
+        if isinstance(array, np.memmap):
+            return None
+        if not isinstance(array.base, np.ndarray):
+            return array
+        array = array.base
+
+
+def nbytes(obj, seen=None):
+    """Bytes held by an object: the arrays, containers and objects of CASCADE, Barrier3D, BRIE and CHOM it refers to
+
+    :param obj: object
+    :param seen: ids of the objects (and array buffers) already counted, which are not counted again; updated
+
+    :return: int
+    """
+    if seen is None:
+        seen = set()
+
+    if isinstance(obj, np.ndarray):
+        owner = _owner(obj)
+        if owner is None or id(owner) in seen:
+            return 0
+        seen.add(id(owner))
+        return owner.nbytes
+
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(nbytes(value, seen) for value in obj.values())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(nbytes(item, seen) for item in obj)
+    elif type(obj).__module__.split(".")[0] in _PACKAGES and hasattr(obj, "__dict__"):
+        size += nbytes(vars(obj), seen)
+
+    return size
+
+
+def memory_report(cascade):
+    """Bytes held by each component of a Cascade instance (see the module docstring)
+
+    :param cascade: a Cascade instance
+
+    :return: dict of the bytes of each component, a list (one value per Barrier3D domain) for the components of a
+        domain and an int for those of the whole model, and the "total"
+    """
+    seen = set()
+    report = {name: [0] * len(cascade.barrier3d) for name in DOMAIN_COMPONENTS}
+
+    # the components that hold (views into) the arrays of others come first
+    for iB3D, barrier3d in enumerate(cascade.barrier3d):
+        history = cascade.domain_history[iB3D]
+        report["DomainTS"][iB3D] = nbytes(history, seen) + nbytes(
+            barrier3d.DomainTS, seen
+        )
+        report["DuneDomain"][iB3D] = nbytes(barrier3d.DuneDomain, seen)
+        for managers in (cascade.roadways, cascade.nourishments):
+            if managers.is_built(iB3D):
+                report["post_storm"][iB3D] += sum(
+                    nbytes(value, seen)
+                    for name, value in vars(managers[iB3D]).items()
+                    if "post_storm" in name
+                )
+
+    for iB3D, barrier3d in enumerate(cascade.barrier3d):
+        report["barrier3d"][iB3D] = nbytes(barrier3d, seen)
+        for name, managers in (
+            ("roadways", cascade.roadways),
+            ("nourishments", cascade.nourishments),
+        ):
+            if managers.is_built(iB3D):
+                report[name][iB3D] = nbytes(managers[iB3D], seen)
+
+    report["brie"] = nbytes(cascade._brie_coupler, seen)
+    report["chom"] = nbytes(getattr(cascade, "_chom_coupler", None), seen)
+    report["other"] = nbytes(cascade, seen)
+    report["total"] = sum(
+        sum(report[name]) for name in DOMAIN_COMPONENTS
+    ) + sum(report[name] for name in MODEL_COMPONENTS)
+
+    return report
+
+
+def resident_set_size():
+    """Resident set size of the process [bytes]
+
+    Read from /proc on Linux; elsewhere, the peak resident set size (from `resource.getrusage`), or None if neither is
+    available (e.g., on Windows)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes on Linux
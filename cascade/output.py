@@ -0,0 +1,226 @@
+"""Write the output of a simulation to a .npz file
+
+`Cascade.save` pickles the whole model, which can only be read with the same versions of CASCADE, Barrier3D, BRIE and
+CHOM. For batch runs, `write_output` stores the output of a simulation as plain arrays in a (compressed) .npz file
+instead, which can be read with `numpy.load` (or `read_output`) by any version of numpy:
+
+    time_index, b3d_break, domain_break, road_break, community_break    state of the simulation
+    barrier3d<i>_<time series>            time series of Barrier3D domain i (e.g., barrier3d0_x_s_TS)
+    barrier3d<i>_DuneDomain               dune domain of Barrier3D domain i (time x alongshore x cross-shore)
+    barrier3d<i>_domain                   interior domain of each year (time x cross-shore x alongshore; see
+                                          `cascade.domain_history`), with the cross-shore width of each year in
+    barrier3d<i>_domain_widths
+    roadways<i>_<time series>             time series of the RoadwayManager of domain i (only for managed domains)
+    nourishments<i>_<time series>         time series of the BeachDuneManager of domain i (only for managed domains)
+    config                                configuration of the simulation (a JSON string), if given
+
+A compact summary of the simulation (see `run_summary`) is written next to the output, to `<name>.summary.json`, both
+by `write_output` and by `Cascade.save`, so that the summaries of a whole ensemble can be read into one table (see
+`cascade.ensemble.scan_summaries`) without loading any of the outputs.
+
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+BARRIER3D_TIME_SERIES = (
+    "x_t_TS",
+    "x_s_TS",
+    "x_b_TS",
+    "h_b_TS",
+    "s_sf_TS",
+    "QowTS",
+    "QsfTS",
+    "ShorelineChangeTS",
+    "InteriorWidth_AvgTS",
+    "Hd_AverageTS",
+    "RSLR",
+)
+
+
+def _numeric(value):
+    """`value` as a numeric array, or None if it is not a (regular) numeric array"""
+    try:
+        array = np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    return array
+
+
+def _manager_time_series(manager):
+    """Time series (attributes ending with `_TS`, and the beach width) of a human management module"""
+    time_series = {}
+    for name, value in sorted(vars(manager).items()):
+        if name.endswith("_TS") or name == "_beach_width":
+            array = _numeric(value)
+            if array is not None:
+                time_series[name.lstrip("_")] = array
+    return time_series
+
+
+def output_arrays(cascade):
+    """Arrays of the output of a Cascade instance (see the module docstring), as a dict"""
+
+    arrays = {
+        "time_index": np.array(cascade.time_index),
+        "b3d_break": np.array(cascade.b3d_break),
+        "domain_break": np.array(cascade.domain_break),
+        "road_break": np.array(cascade.road_break),
+        "community_break": np.array(cascade.community_break),
+    }
+
+    for iB3D, (barrier3d, history) in enumerate(
+        zip(cascade.barrier3d, cascade.domain_history)
+    ):
+        prefix = "barrier3d{}_".format(iB3D)
+        for name in BARRIER3D_TIME_SERIES:
+            array = _numeric(getattr(barrier3d, name))
+            if array is not None:
+                arrays[prefix + name] = array
+        arrays[prefix + "DuneDomain"] = np.asarray(barrier3d.DuneDomain)
+        arrays[prefix + "domain"] = history.array()
+        arrays[prefix + "domain_widths"] = history.widths[: history.end]
+
+    for module_name, managers in [
+        ("roadways", cascade.roadways),
+        ("nourishments", cascade.nourishments),
+    ]:
+        for iB3D, manager in managers.built():
+            for name, array in _manager_time_series(manager).items():
+                arrays["{}{}_{}".format(module_name, iB3D, name)] = array
+
+    return arrays
+
+
+def _year(event, time_index):
+    """Year of an event (e.g., the year a domain drowned), or None if it did not happen"""
+    return int(time_index) - 1 if event else None
+
+
+def run_summary(cascade):
+    """A few scalars that describe the outcome of a simulation, with one value per Barrier3D domain of:
+
+        drowned_year                year the domain drowned (None if it did not)
+        road_abandoned_year         year the road was abandoned (None if it was not, or if there is no road)
+        community_abandoned_year    year the community stopped managing the beach and dunes (None if it did not)
+        overwash_removed            total overwash removed from the road and by the community [m^3]
+        nourishments                number of beach nourishments
+        dunes_rebuilt               number of times the dunes were rebuilt (for the road or by the community)
+        road_relocations            number of road relocations
+        barrier_width               final barrier width, x_b - x_s [m]
+        barrier_height              final barrier height [m]
+
+    :return: dict (JSON serializable)
+    """
+    summary = {
+        "name": cascade._filename,
+        "time_index": int(cascade.time_index),
+        "b3d_break": bool(cascade.b3d_break),
+        "drowned_year": [],
+        "road_abandoned_year": [],
+        "community_abandoned_year": [],
+        "overwash_removed": [],
+        "nourishments": [],
+        "dunes_rebuilt": [],
+        "road_relocations": [],
+        "barrier_width": [],
+        "barrier_height": [],
+    }
+
+    for iB3D, barrier3d in enumerate(cascade.barrier3d):
+        summary["drowned_year"].append(
+            _year(cascade.domain_break[iB3D], barrier3d.time_index)
+        )
+        summary["barrier_width"].append(
+            float((barrier3d.x_b_TS[-1] - barrier3d.x_s_TS[-1]) * 10)
+        )
+        summary["barrier_height"].append(float(barrier3d.h_b_TS[-1] * 10))
+
+        overwash_removed, dunes_rebuilt = 0.0, 0
+        road_abandoned_year, road_relocations = None, 0
+        if cascade.roadways.is_built(iB3D):
+            roadways = cascade.roadways[iB3D]
+            road_abandoned_year = _year(cascade.road_break[iB3D], roadways._time_index)
+            road_relocations = int(np.sum(roadways._road_relocated_TS))
+            overwash_removed += float(np.sum(roadways._road_overwash_volume))
+            dunes_rebuilt += int(np.sum(roadways._dunes_rebuilt_TS))
+
+        community_abandoned_year, nourishments = None, 0
+        if cascade.nourishments.is_built(iB3D):
+            nourishment = cascade.nourishments[iB3D]
+            community_abandoned_year = _year(
+                cascade.community_break[iB3D], nourishment._time_index
+            )
+            nourishments = int(np.sum(nourishment._nourishment_TS))
+            overwash_removed += float(np.sum(nourishment._overwash_volume_removed))
+            dunes_rebuilt += int(np.sum(nourishment._dunes_rebuilt_TS))
+
+        summary["road_abandoned_year"].append(road_abandoned_year)
+        summary["community_abandoned_year"].append(community_abandoned_year)
+        summary["overwash_removed"].append(overwash_removed)
+        summary["nourishments"].append(nourishments)
+        summary["dunes_rebuilt"].append(dunes_rebuilt)
+        summary["road_relocations"].append(road_relocations)
+
+    return summary
+
+
+def summary_path(path):
+    """Summary file of an output file (e.g., output/<name>.npz -> output/<name>.summary.json)"""
+    path = Path(path)
+    return path.with_name(path.stem + ".summary.json")
+
+
+def write_summary(cascade, path):
+    """Write the summary (see `run_summary`) of a Cascade instance to a JSON file (written to a temporary file first,
+    so a partially written file never has the final name)
+
+    :return: path to the summary file
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(run_summary(cascade), f)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def write_output(cascade, path, config=None):
+    """Write the output of a Cascade instance to a compressed .npz file (written to a temporary file first, so a
+    partially written file never has the final name), and its summary (see `write_summary`)
+
+    :param cascade: a Cascade instance
+    :param path: output file (.npz)
+    :param config: configuration of the simulation, stored as a JSON string (optional)
+
+    :return: path to the output file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = output_arrays(cascade)
+    if config is not None:
+        arrays["config"] = np.array(json.dumps(config, default=str))
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    write_summary(cascade, summary_path(path))
+
+    return path
+
+
+def read_output(path):
+    """Read an output file written by `write_output`
+
+    :return: dict of arrays (and the configuration, as a dict, under "config")
+    """
+    with np.load(path) as data:
+        output = {name: data[name] for name in data.files}
+    if "config" in output:
+        output["config"] = json.loads(str(output["config"]))
+    return output
@@ -0,0 +1,291 @@
+"""Select the number of workers and the joblib backend for the Barrier3D updates
+
+With `num_cores="auto"`, CASCADE measures how long each Barrier3D domain takes to update, how long it takes to move a
+domain to and from a worker process (pickling), and the fixed cost of a parallel dispatch, and then picks the backend
+-- in-process ("sequential"), threads ("threading"), or processes ("loky") -- and number of workers that minimize the
+predicted wall time of a model year. Measurements are refreshed periodically, since the cost of serializing a domain
+grows with the length of its history (e.g., DomainTS).
+
+The cost model for a year with storm-affected domains i = 1..n (quiet domains are always updated in-process) is
+
+    sequential:  sum(t_i)
+    threading:   makespan(t_i, n_jobs) / e
+    loky:        makespan(t_i, n_jobs) + sum(s_i) + d
+
+where t_i is the update time of domain i, s_i its serialization (pickle round trip) time, d the measured dispatch
+overhead of the process pool, e the measured efficiency of the thread pool (the GIL often makes this small), and the
+makespan is found with a longest-processing-time-first schedule.
+
+Each decision is emitted as a `parallel_dispatch` event of the simulation (see `cascade.events`), and the measurements
+are summarized by `Cascade.parallel_report`.
+
+"""
+
+import os
+import pickle
+import time
+
+import numpy as np
+
+
+def timed_call(function, *args):
+    """Call a function and return the CPU time of the calling thread along with its output; runs on the worker
+
+    CPU time (rather than wall time) is the work done by the update itself, regardless of how many other threads
+    were competing for the GIL at the same time.
+    """
+    start = time.thread_time()
+    output = function(*args)
+
+    return time.thread_time() - start, output
+
+
+def available_cores():
+    """Number of cores available to this process (respects CPU affinity, e.g. on a cluster node)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on all platforms
+        from joblib import cpu_count
+
+        return cpu_count()
+
+
+def makespan(task_times, n_jobs):
+    """Wall time of a longest-processing-time-first schedule of tasks onto n_jobs workers
+
+    >>> makespan([3.0, 1.0, 1.0, 1.0], 2)
+    3.0
+    >>> makespan([1.0, 1.0, 1.0], 1)
+    3.0
+    """
+    workers = np.zeros(max(int(n_jobs), 1))
+
+    for task in sorted(task_times, reverse=True):
+        workers[np.argmin(workers)] += task
+
+    return float(np.max(workers))
+
+
+class ParallelTuner:
+    def __init__(
+        self,
+        max_workers=None,
+        tuning_years=3,
+        retune_interval=50,
+        smoothing=0.5,
+    ):
+        """Measures the cost of the Barrier3D updates and chooses how to dispatch them
+
+        :param max_workers: upper limit on the number of workers (defaults to the number of CPUs)
+        :param tuning_years: number of years with storm-affected domains used to measure costs (sequential, then
+            threads, then processes) after initialization and after every retune; with fewer than 3, the backends that
+            are not measured are not considered
+        :param retune_interval: number of model years between re-measuring serialization and dispatch costs
+        :param smoothing: weight of the newest measurement in the moving average of domain update times
+        """
+        self._max_workers = max_workers if max_workers is not None else available_cores()
+        self._tuning_years = tuning_years
+        self._retune_interval = retune_interval
+        self._smoothing = smoothing
+
+        self._step_time = {}  # per domain, moving average [s]
+        self._serialization_time = {}  # per domain, pickle round trip [s]
+        self._dispatch_overhead = None  # process pool [s]
+        self._thread_efficiency = None  # [0, 1]
+        self._last_tuned = None  # model year of the last (re-)measurement of serialization
+        self._trials = []  # backends still to be measured
+        self._decisions = []
+
+    @property
+    def decisions(self):
+        """List of dicts, one per dispatched year, with the chosen backend, workers, and predicted and measured times"""
+        return self._decisions
+
+    @property
+    def backend(self):
+        if self._decisions:
+            return self._decisions[-1]["backend"]
+        return "sequential"
+
+    @property
+    def n_jobs(self):
+        if self._decisions:
+            return self._decisions[-1]["n_jobs"]
+        return 1
+
+    def predict(self, domains):
+        """Predicted wall time [s] of each candidate (backend, n_jobs) for updating the given domains"""
+
+        known = [self._step_time[i] for i in domains if i in self._step_time]
+        default_time = np.mean(known) if known else 0.0
+        step_times = [self._step_time.get(i, default_time) for i in domains]
+        serialization = sum(self._serialization_time.get(i, 0.0) for i in domains)
+
+        candidates = {("sequential", 1): sum(step_times)}
+        for n_jobs in range(2, min(self._max_workers, len(domains)) + 1):
+            if self._thread_efficiency is not None:
+                candidates[("threading", n_jobs)] = makespan(
+                    step_times, n_jobs
+                ) / max(self._thread_efficiency, 1e-3)
+            if self._dispatch_overhead is not None:
+                candidates[("loky", n_jobs)] = (
+                    makespan(step_times, n_jobs)
+                    + serialization
+                    + self._dispatch_overhead
+                )
+
+        return candidates
+
+    def _smooth(self, average, measurement):
+        """Exponential moving average; the first measurement initializes the average"""
+        if average is None:
+            return measurement
+        return self._smoothing * measurement + (1 - self._smoothing) * average
+
+    def measure_serialization(self, barrier3d, domains):
+        """Time a pickle round trip of each domain (what a worker process costs beyond the update itself)"""
+
+        for i in domains:
+            start = time.perf_counter()
+            pickle.loads(pickle.dumps(barrier3d[i], protocol=pickle.HIGHEST_PROTOCOL))
+            self._serialization_time[i] = time.perf_counter() - start
+
+    def _choose(self, domains):
+        """Pick a backend; the first years after (re-)tuning are trials used to measure each backend"""
+
+        n_jobs = min(self._max_workers, len(domains))
+
+        if self._trials and n_jobs > 1:
+            backend = self._trials.pop(0)
+            return backend, (1 if backend == "sequential" else n_jobs), None
+
+        candidates = self.predict(domains)
+        (backend, n_jobs), predicted = min(candidates.items(), key=lambda c: c[1])
+
+        return backend, n_jobs, predicted
+
+    def dispatch(self, barrier3d, domains, year):
+        """Choose the backend for updating the given domains (re-measuring costs if due), for a caller that dispatches
+        the updates itself (e.g., `Cascade` with `pipeline_management`) and then reports them with `record`
+
+        :param barrier3d: list of all Barrier3D domains
+        :param domains: indices of the domains to update
+        :param year: model year (time index), used for scheduling re-measurements
+
+        :return: backend, number of workers, and predicted wall time [s] (None for a trial)
+        """
+        if self._last_tuned is None or year - self._last_tuned >= self._retune_interval:
+            self.measure_serialization(barrier3d, domains)
+            self._dispatch_overhead = None
+            self._thread_efficiency = None
+            self._trials = ["sequential", "threading", "loky"][: self._tuning_years]
+            self._last_tuned = year
+        else:
+            self.measure_serialization(
+                barrier3d, [i for i in domains if i not in self._serialization_time]
+            )
+
+        backend, n_jobs, predicted = self._choose(domains)
+
+        if backend == "loky" and predicted is None:
+            from joblib import Parallel, delayed
+
+            # start the (reusable) worker processes and import this package in them first, so the one-time startup is
+            # not counted as dispatch overhead
+            Parallel(n_jobs=n_jobs, backend="loky")(
+                delayed(timed_call)(time.sleep, 0) for _ in range(n_jobs)
+            )
+
+        return backend, n_jobs, predicted
+
+    def map(self, function, barrier3d, domains, year):
+        """Apply `function` (i.e., batchB3D) to each of the given domains using the chosen backend
+
+        :param function: function called on each Barrier3D domain
+        :param barrier3d: list of all Barrier3D domains
+        :param domains: indices of the domains to update
+        :param year: model year (time index), used for scheduling re-measurements
+
+        :return: list of outputs, in the same order as `domains`
+        """
+        if not domains:
+            return []
+
+        from joblib import Parallel, delayed
+
+        backend, n_jobs, predicted = self.dispatch(barrier3d, domains, year)
+
+        start = time.perf_counter()
+        if backend == "sequential":
+            timed_output = [timed_call(function, barrier3d[i]) for i in domains]
+        else:
+            timed_output = Parallel(n_jobs=n_jobs, backend=backend, max_nbytes="10M")(
+                delayed(timed_call)(function, barrier3d[i]) for i in domains
+            )
+        wall_time = time.perf_counter() - start
+
+        step_times, output = zip(*timed_output)
+        self.record(domains, step_times, wall_time, backend, n_jobs, predicted, year)
+
+        return list(output)
+
+    def record(self, domains, step_times, wall_time, backend, n_jobs, predicted, year):
+        """Update the measurements with a dispatch of domain updates (see `dispatch`), and add it to the decisions
+
+        :param domains: indices of the updated domains
+        :param step_times: CPU time of the update of each domain [s] (see `timed_call`)
+        :param wall_time: wall time of the updates of all domains [s]
+        :param backend: backend used (as returned by `dispatch`)
+        :param n_jobs: number of workers used
+        :param predicted: predicted wall time [s] (as returned by `dispatch`)
+        :param year: model year (time index)
+        """
+        for i, step_time in zip(domains, step_times):
+            self._step_time[i] = self._smooth(self._step_time.get(i), step_time)
+
+        # update the backend measurements from the observed wall time
+        schedule = makespan(step_times, n_jobs)
+        if backend == "threading":
+            self._thread_efficiency = self._smooth(
+                self._thread_efficiency, min(schedule / max(wall_time, 1e-9), 1.0)
+            )
+        elif backend == "loky":
+            serialization = sum(self._serialization_time.get(i, 0.0) for i in domains)
+            self._dispatch_overhead = self._smooth(
+                self._dispatch_overhead, max(wall_time - schedule - serialization, 0.0)
+            )
+
+        self._decisions.append(
+            {
+                "year": year,
+                "backend": backend,
+                "n_jobs": n_jobs,
+                "domains": len(domains),
+                "trial": predicted is None,
+                "predicted_time": predicted,
+                "wall_time": wall_time,
+            }
+        )
+
+    def __getstate__(self):
+        # measurements are specific to the machine they were made on; re-tune after unpickling
+        state = self.__dict__.copy()
+        state["_last_tuned"] = None
+        return state
+
+    def report(self):
+        """Summary of the current decision and the measurements it is based on"""
+
+        return {
+            "backend": self.backend,
+            "n_jobs": self.n_jobs,
+            "max_workers": self._max_workers,
+            "step_time": dict(self._step_time),
+            "serialization_time": dict(self._serialization_time),
+            "dispatch_overhead": self._dispatch_overhead,
+            "thread_efficiency": self._thread_efficiency,
+            "decisions": list(self._decisions),
+        }
+
+    def __repr__(self):
+        return "ParallelTuner(backend={!r}, n_jobs={})".format(self.backend, self.n_jobs)
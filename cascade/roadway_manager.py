@@ -27,9 +27,10 @@ by SLR for each time step.
 
 """
 import numpy as np
-from scipy.interpolate import interp2d
 import copy
 
+from .events import DUNE_REBUILT, ROAD_DROWNED, ROAD_RELOCATED
+
 dm3_to_m3 = 1000  # convert from cubic decameters to cubic meters
 
 
@@ -54,7 +55,7 @@ def bulldoze(
     Parameters
     ----------
     time_index: int,
-        Time index for drowning error message
+        Time index (not used; drowning is reported by the RoadwayManager, see `cascade.events`)
     xyz_interior_grid: array
         Interior barrier island topography [z units specified by dz; for Barrier3d, dz=10, decameters MHW]
     yxz_dune_grid:
@@ -149,11 +150,6 @@ def bulldoze(
         bayside_water_cells > percent_water_cells_touching_road
     ):
         roadway_drown = True
-        print(
-            "Roadway width drowned at {time} years, {water}% of road borders water".format(
-                time=time_index - 1, water=percent_water_cells_touching_road * 100
-            )
-        )
     else:
         roadway_drown = False
 
@@ -229,6 +225,8 @@ def rebuild_dunes(
     x = [0, nx - 1]
     y = [np.arange(0, ny, 1)]
     z = np.transpose([dune_start_max, dune_start_min])
+    from scipy.interpolate import interp2d  # imported here to keep `import cascade` fast
+
     f = interp2d(x, y, z)
     new_dune_domain = f(np.arange(0, nx, 1), np.arange(0, ny, 1))
     rebuild_dune_volume = np.sum(new_dune_domain - old_dune_domain)
@@ -312,7 +310,7 @@ def get_road_relocation_elevation(
     Parameters
     ----------
     time_index: int,
-        Time index for drowning error message
+        Time index (not used; drowning is reported by the RoadwayManager, see `cascade.events`)
     xyz_interior_grid: array
         Interior barrier island topography [z units specified by dz; for Barrier3d, dz=10, decameters MHW]
     road_width: int
@@ -350,11 +348,6 @@ def get_road_relocation_elevation(
     # if the roadway elevation would be zero MSL, the roadway can't be constructed or relocated
     if road_ele <= 0:
         roadway_drown = 1
-        print(
-            "Roadway cannot be relocated at {time} years b/c the road would be at or below MSL".format(
-                time=time_index - 1
-            )
-        )
 
     return road_ele, roadway_drown
 
@@ -372,7 +365,7 @@ def road_relocation_checks(
     Parameters
     ----------
     time_index: int
-        Time index for drowning error message
+        Time index (not used; drowning is reported by the RoadwayManager, see `cascade.events`)
     dune_migrated: int
         Number of meters dune migrated in Barrier3D; + if progrades, - if erodes [m]
     road_setback: float
@@ -415,11 +408,6 @@ def road_relocation_checks(
                 > average_barrier_width
             ):
                 relocation_break = 1
-                print(
-                    "Island is too narrow for roadway to be relocated. Roadway eaten up by dunes at {time} years".format(
-                        time=time_index - 1
-                    )  # -1 because B3D advances time step at end of dune_update
-                )
             else:
                 road_setback = road_relocation_setback
 
@@ -477,6 +465,7 @@ class RoadwayManager:
         self._drown_break = 0
         self._relocation_break = 0
         self._time_index = 1
+        self._events = []  # events of the last update, as (kind, message) tuples
         self._absolute_minimum_dune_height = 0.3
         self._percent_water_cells_touching_road = 0.2
 
@@ -545,6 +534,7 @@ class RoadwayManager:
     def update(self, barrier3d, trigger_dune_knockdown):
 
         self._time_index = barrier3d.time_index
+        self._events = []
 
         if self._original_growth_param is None:
             self._original_growth_param = barrier3d.growthparam
@@ -584,6 +574,14 @@ class RoadwayManager:
 
         # if road can't be relocated, no longer manage and exit; dune growth parameters reset to original in CASCADE
         if self._relocation_break == 1:
+            self._events.append(
+                (
+                    ROAD_DROWNED,
+                    "Island is too narrow for roadway to be relocated. Roadway eaten up by dunes at {time} years".format(
+                        time=self._time_index - 1
+                    ),  # -1 because B3D advances time step at end of dune_update
+                )
+            )
 
             # an adaptation solution may be to knock down the dunes so that they are small and can easily be overwashed
             if trigger_dune_knockdown:
@@ -606,6 +604,17 @@ class RoadwayManager:
                 dy=10,
                 dz=10,  # specifies interior is in dam
             )
+            if self._drown_break == 1:
+                self._events.append(
+                    (
+                        ROAD_DROWNED,
+                        "Roadway cannot be relocated at {time} years b/c the road would be at or below MSL".format(
+                            time=self._time_index - 1
+                        ),
+                    )
+                )
+            else:
+                self._events.append((ROAD_RELOCATED, None))
 
             # user can specify that dune rebuilding is off with `None`
             if (
@@ -637,9 +646,12 @@ class RoadwayManager:
         # road cannot be below 0 m MHW (sea level); stop managing!
         if self._road_ele < 0:
             self._drown_break = 1
-            print(
-                "Roadway drowned in place at {time} years due to SLR - road cannot be below 0 m MHW".format(
-                    time=self._time_index - 1
+            self._events.append(
+                (
+                    ROAD_DROWNED,
+                    "Roadway drowned in place at {time} years due to SLR - road cannot be below 0 m MHW".format(
+                        time=self._time_index - 1
+                    ),
                 )
             )
 
@@ -711,6 +723,15 @@ class RoadwayManager:
             percent_water_cells_touching_road=self._percent_water_cells_touching_road,  # fraction cells<drown_threshold
         )
         if self._drown_break == 1:
+            self._events.append(
+                (
+                    ROAD_DROWNED,
+                    "Roadway width drowned at {time} years, {water}% of road borders water".format(
+                        time=self._time_index - 1,
+                        water=self._percent_water_cells_touching_road * 100,
+                    ),
+                )
+            )
 
             # an adaptation solution may be to knock down the dunes so that they are small and can easily be overwashed
             if trigger_dune_knockdown:
@@ -771,6 +792,7 @@ class RoadwayManager:
                 self._rebuild_dune_volume_TS[self._time_index - 1] = (
                     rebuild_dune_volume * dm3_to_m3
                 )
+                self._events.append((DUNE_REBUILT, None))
 
         # update Barrier3D class variables
         barrier3d.DuneDomain[self._time_index - 1, :, :] = new_dune_domain
@@ -810,6 +832,11 @@ class RoadwayManager:
     def road_relocation_setback(self, value):
         self._road_relocation_setback = value
 
+    @property
+    def events(self):
+        """Events of the last update, as (kind, message) tuples (see `cascade.events`)"""
+        return self._events
+
     @property
     def drown_break(self):
         return self._drown_break
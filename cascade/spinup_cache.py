@@ -0,0 +1,248 @@
+"""Cache of spin-up simulations, keyed by a hash of the model configuration
+
+Spin-up runs (e.g., the 10 kyr natural simulations used to create the initial barrier topographies of the pathways
+experiments) are expensive and are frequently repeated with the same configuration. This module hashes everything
+that determines the physics of a simulation -- the Barrier3D parameter file, the storm, elevation, dune (and growth
+parameter) files, the storm series of the storm library member (if any), and the CASCADE parameters -- and stores
+checkpoints (see `cascade.checkpoint`) of the simulation in a cache directory under that hash:
+
+    <cache directory>/<hash>/config.json     the hashed configuration, for reference
+    <cache directory>/<hash>/year-<year>/    checkpoint of the model after <year> model years
+    <cache directory>/<hash>/latest/         periodic checkpoints of the run in progress
+
+`spin_up` returns the model at the requested year, continuing from the closest cached year (or the run in progress)
+instead of starting over when possible. The cache directory can be shared by a team (e.g., on a shared file system).
+
+"""
+import hashlib
+import inspect
+import json
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+from yaml import full_load
+
+from .cascade import Cascade
+from .checkpoint import read_pointer
+from .input_cache import file_digest
+from .parallel_tuner import ParallelTuner
+from .storm_library import StormLibrary
+
+# parameters that do not affect the simulated physics, and are not part of the configuration hash
+EXECUTION_PARAMETERS = (
+    "name",
+    "num_cores",
+    "pipeline_management",
+    "checkpoint_interval",
+    "checkpoint_directory",
+    "sample_memory",
+    "verbose",
+)
+
+# variables in the Barrier3D parameter file that are overridden by CASCADE during initialization (see
+# `brie_coupler.initialize_equal`); these are set by the (hashed) CASCADE parameters
+CASCADE_SET_VARIABLES = (
+    "Shrub_ON",
+    "TMAX",
+    "BarrierLength",
+    "DShoreface",
+    "LShoreface",
+    "ShorefaceToe",
+    "k_sf",
+    "s_sf_eq",
+    "BayDepth",
+    "RSLR_Constant",
+    "RSLR_const",
+    "DuneParamStart",
+    "GrowthParamStart",
+    "rmin",
+    "rmax",
+    "Rat",
+    "storm_file",
+    "dune_file",
+    "elevation_file",
+    "MHW",
+    "beta",
+    "BermEl",
+)
+
+
+def default_cache_directory():
+    """Cache directory set by the CASCADE_CACHE_DIR environment variable [default: ~/.cache/cascade]"""
+    return Path(
+        os.environ.get("CASCADE_CACHE_DIR", Path.home() / ".cache" / "cascade")
+    )
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def cascade_parameters(datadir, **kwds):
+    """All parameters of a Cascade instance (including defaults), as passed to `Cascade.__init__`"""
+
+    arguments = inspect.signature(Cascade.__init__).bind(None, datadir, **kwds)
+    arguments.apply_defaults()
+    parameters = dict(arguments.arguments)
+    parameters.pop("self")
+
+    return parameters
+
+
+def configuration(datadir, **kwds):
+    """The configuration that determines a simulation: CASCADE parameters and digests of the input files
+
+    :param datadir: directory containing the Barrier3D input files
+    :param kwds: keyword arguments of `Cascade`
+
+    :return: dict
+    """
+    parameters = cascade_parameters(datadir, **kwds)
+    datadir = Path(parameters.pop("datadir"))
+    for name in EXECUTION_PARAMETERS:
+        parameters.pop(name)
+
+    with open(datadir / parameters["parameter_file"]) as f:
+        barrier3d_parameters = full_load(f)
+    for name in CASCADE_SET_VARIABLES:
+        barrier3d_parameters.pop(name, None)
+
+    # input files are identified by their contents, not their names
+    input_files = {}
+    for key in ("storm_file", "elevation_file", "dune_file"):
+        for file_name in np.atleast_1d(parameters.pop(key)):
+            input_files[str(file_name)] = file_digest(datadir / str(file_name))
+    for key, value in barrier3d_parameters.items():
+        if isinstance(value, str) and (datadir / value).is_file():
+            input_files[value] = file_digest(datadir / value)
+            barrier3d_parameters[key] = None
+    parameters.pop("parameter_file")
+
+    # ...and a storm library by the storm series of the member, which replaces the storm file (see `Cascade`)
+    storm_library = parameters.pop("storm_library")
+    storm_library_member = parameters.pop("storm_library_member")
+    if storm_library is not None:
+        if not isinstance(storm_library, StormLibrary):
+            storm_library = StormLibrary(storm_library)
+        storm_series = np.ascontiguousarray(storm_library[storm_library_member])
+        input_files["storm_library"] = hashlib.sha256(storm_series).hexdigest()
+
+    return {
+        "cascade": parameters,
+        "barrier3d": barrier3d_parameters,
+        "input_files": input_files,
+    }
+
+
+def configuration_hash(datadir, **kwds):
+    """Hash (sha256) of the configuration of a simulation; see `configuration`"""
+
+    config = configuration(datadir, **kwds)
+    encoded = json.dumps(config, sort_keys=True, default=_to_json).encode("utf-8")
+
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def cached_years(cache_directory, key):
+    """Model years with a cached checkpoint for a configuration hash, including the run in progress
+
+    :return: dict of {year: checkpoint directory}
+    """
+    directory = Path(cache_directory) / key
+    years = {}
+
+    if directory.is_dir():
+        for snapshot in directory.glob("year-*"):
+            if read_pointer(snapshot) is not None:
+                years[int(snapshot.name.split("-")[1])] = snapshot
+
+    latest = read_pointer(directory / "latest")
+    if latest is not None:
+        years.setdefault(latest["time_index"] - 1, directory / "latest")
+
+    return years
+
+
+def spin_up(datadir, year, cache_directory=None, checkpoint_interval=100, **kwds):
+    """Return a Cascade instance after `year` model years, reusing cached simulations with the same configuration
+
+    If the cache holds the model at `year`, it is loaded; otherwise the simulation continues from the latest cached
+    year before `year` (or starts from initialization), writes periodic checkpoints of its progress to the cache (if it
+    is the most advanced run of this configuration), and stores the model at `year` in the cache.
+
+    :param datadir: directory containing the Barrier3D input files
+    :param year: number of model years to spin up (the model is returned at time_index = year + 1)
+    :param cache_directory: cache directory [default: see `default_cache_directory`]
+    :param checkpoint_interval: interval [yrs] of the checkpoints of the run in progress
+    :param kwds: keyword arguments of `Cascade` (`time_step_count` must be larger than `year`)
+
+    :return: cascade
+    """
+    if cache_directory is None:
+        cache_directory = default_cache_directory()
+    cache_directory = Path(cache_directory)
+
+    key = configuration_hash(datadir, **kwds)
+    directory = cache_directory / key
+    directory.mkdir(parents=True, exist_ok=True)
+
+    config_file = directory / "config.json"
+    if not config_file.is_file():
+        with open(config_file, "w") as f:
+            json.dump(configuration(datadir, **kwds), f, indent=2, default=_to_json)
+
+    years = cached_years(cache_directory, key)
+    start_years = [cached_year for cached_year in years if cached_year <= year]
+
+    if start_years:
+        start_year = max(start_years)
+        cascade = Cascade.resume(years[start_year])
+    else:
+        start_year = 0
+        cascade = Cascade(datadir, **kwds)
+
+    if start_year < year:
+        # only the most advanced run of a configuration writes checkpoints of its progress
+        if start_year >= max(years, default=0):
+            cascade._checkpoint_directory = str(directory / "latest")
+            cascade._checkpoint_interval = checkpoint_interval
+        else:
+            cascade._checkpoint_interval = None
+
+        while cascade.time_index - 1 < year and not cascade.b3d_break:
+            cascade.update()
+
+        if not cascade.b3d_break:
+            cascade.checkpoint(directory / "year-{:06d}".format(year))
+
+    _set_execution_parameters(cascade, cascade_parameters(datadir, **kwds))
+
+    return cascade
+
+
+def _set_execution_parameters(cascade, parameters):
+    """Execution settings are not part of the configuration (a cached model has the settings of the run that created
+    it), so set them from the parameters of this call; checkpoints of the returned model are not written to the cache"""
+
+    cascade._filename = parameters["name"]
+    cascade._num_cores = parameters["num_cores"]
+    cascade._parallel_tuner = (
+        ParallelTuner() if parameters["num_cores"] == "auto" else None
+    )
+    cascade._pipeline_management = parameters["pipeline_management"]
+    cascade._checkpoint_interval = parameters["checkpoint_interval"]
+    if parameters["checkpoint_directory"] is None:
+        cascade._checkpoint_directory = os.path.join(
+            os.getcwd(), parameters["name"] + "-checkpoint"
+        )
+    else:
+        cascade._checkpoint_directory = parameters["checkpoint_directory"]
+    cascade._memory_samples = [] if parameters["sample_memory"] else None
+    cascade.events.echo = parameters["verbose"]
+    cascade._checkpoint_run_id = uuid.uuid4().hex
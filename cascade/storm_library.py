@@ -0,0 +1,153 @@
+"""Memory-mapped library of storm time series
+
+Ensembles use many storm time series (e.g., 100 1 kyr series), and each Barrier3D domain of each ensemble member holds
+its own copy of a series. A storm library packs many series into one binary file that is memory-mapped read-only, so
+all members (and domains) on a node share one physical copy in the page cache and opening a member is instant.
+
+A storm library is a directory containing:
+    1) `storms.npy`, the rows of all storm series concatenated (n_rows x 5; year, Rhigh, Rlow, period, duration -- the
+       format of Barrier3D's StormSeries),
+    2) `offsets.npy`, the first row of each series and the total number of rows (n_members + 1),
+    3) `members.json`, the names of the series (e.g., the files they were created from).
+
+Examples
+--------
+>>> import numpy as np, tempfile
+>>> series = [np.array([[1, 0.1, 0.0, 8.0, 2], [1, 0.2, 0.0, 8.0, 3]]), np.array([[2, 0.3, 0.1, 9.0, 4]])]
+>>> library = StormLibrary.write(tempfile.mkdtemp(), series)
+>>> len(library)
+2
+>>> library[1].shape
+(1, 5)
+>>> library.year(0, 1)[:, 1]
+memmap([0.1, 0.2])
+
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+STORM_SERIES_COLUMNS = 5
+
+
+class StormLibrary:
+    def __init__(self, path):
+        """Open a storm library (read-only, memory-mapped)
+
+        :param path: storm library directory
+        """
+        self._path = Path(path)
+        self._storms = np.load(self._path / "storms.npy", mmap_mode="r")
+        self._offsets = np.load(self._path / "offsets.npy")
+
+        members_file = self._path / "members.json"
+        if members_file.is_file():
+            with open(members_file) as f:
+                self._members = json.load(f)
+        else:
+            self._members = [str(member) for member in range(len(self))]
+
+    @classmethod
+    def allocate(cls, path, rows_per_member, members=None):
+        """Create an empty storm library to be filled in place (e.g., by a storm generator)
+
+        :param path: storm library directory (created if it does not exist)
+        :param rows_per_member: number of storm rows of each series
+        :param members: names of the series [default: "0", "1", ...]
+
+        :return: writable memory map of the rows (n_rows x 5) and the offsets of the series
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        offsets = np.zeros(len(rows_per_member) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(rows_per_member)
+        np.save(path / "offsets.npy", offsets)
+
+        if members is None:
+            members = [str(member) for member in range(len(rows_per_member))]
+        with open(path / "members.json", "w") as f:
+            json.dump([str(member) for member in members], f)
+
+        storms = np.lib.format.open_memmap(
+            path / "storms.npy",
+            mode="w+",
+            dtype=np.float64,
+            shape=(int(offsets[-1]), STORM_SERIES_COLUMNS),
+        )
+
+        return storms, offsets
+
+    @classmethod
+    def write(cls, path, storm_series, members=None):
+        """Pack storm series into a storm library
+
+        :param path: storm library directory
+        :param storm_series: list of storm series (arrays of n_rows x 5)
+        :param members: names of the series [default: "0", "1", ...]
+
+        :return: StormLibrary
+        """
+        storm_series = [np.asarray(series, dtype=np.float64) for series in storm_series]
+        storms, offsets = cls.allocate(
+            path, [len(series) for series in storm_series], members=members
+        )
+        for member, series in enumerate(storm_series):
+            storms[offsets[member] : offsets[member + 1]] = series
+        storms.flush()
+        del storms
+
+        return cls(path)
+
+    @classmethod
+    def from_files(cls, path, storm_files):
+        """Pack storm series files (e.g., `StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy`, ...) into a storm library
+
+        :param path: storm library directory
+        :param storm_files: list of paths to storm series (.npy) files
+
+        :return: StormLibrary
+        """
+        return cls.write(
+            path,
+            [np.load(storm_file) for storm_file in storm_files],
+            members=[Path(storm_file).name for storm_file in storm_files],
+        )
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def members(self):
+        return self._members
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def member_index(self, member):
+        """Index of a series, given its index or name"""
+        if isinstance(member, str):
+            return self._members.index(member)
+        return int(member)
+
+    def __getitem__(self, member):
+        """Storm series of a member (index or name), as a read-only view into the memory-mapped library"""
+        member = self.member_index(member)
+        if not 0 <= member < len(self):
+            raise IndexError("storm library has {} members".format(len(self)))
+        return self._storms[self._offsets[member] : self._offsets[member + 1]]
+
+    def year(self, member, year):
+        """Storms of a member in a given year (a view; the rows of a series are ordered by year)"""
+        series = self[member]
+        years = series[:, 0]
+        return series[
+            np.searchsorted(years, year, side="left") : np.searchsorted(
+                years, year, side="right"
+            )
+        ]
+
+    def __repr__(self):
+        return "StormLibrary({!r}, members={})".format(str(self._path), len(self))
@@ -0,0 +1,160 @@
+"""Generate storm time series for ensembles
+
+Storm time series are generated as in Barrier3D's `tools.input_files.yearly_storms` [1]: the number of storms in each
+year is drawn from a normal distribution (rounded, and negative counts set to zero), and each storm is drawn at random
+from a list of synthetic storms created with the multivariate sea storm model of Wahl et al. (2016) [2]. Here, all
+years of all ensemble members are generated at once with array operations, and the series are written directly into a
+(memory-mapped) storm library (see `cascade.storm_library`).
+
+Each member has its own random number stream, spawned from a single seed, so a member's storm series does not depend on
+the number of members generated alongside it (and any member can be regenerated from the seed and its index).
+
+References
+----------
+
+.. [1] Reeves, I. R. B., Moore, L. J., Murray, A. B., Anarde, K. A., & Goldstein, E. B. (2021).
+    Dune dynamics drive discontinuous barrier retreat. Geophysical Research Letters, 48(13), e2021GL092958.
+    https://doi.org/10.1029/2021GL092958
+.. [2] Wahl, T., Plant, N. G., & Long, J. W. (2016). Probabilistic assessment of erosion and flooding risk in the
+    northern Gulf of Mexico. Journal of Geophysical Research: Oceans, 121(5), 3029-3043.
+
+Notes
+---------
+The storm list has one storm per row, with duration [hr] in column 1, total water level (Rhigh) [m NAVD88] in column 2,
+peak period [s] in column 4, and Rlow [m NAVD88] in column 6. As in `yearly_storms`, the first row of the storm list
+is never selected.
+
+"""
+from pathlib import Path
+
+import numpy as np
+
+from .storm_library import StormLibrary
+
+
+def load_storm_list(path):
+    """Load a list of synthetic storms (.csv or .npy)"""
+
+    if Path(path).suffix.lower() == ".npy":
+        return np.load(path, allow_pickle=True)
+    return np.loadtxt(path, delimiter=",", encoding="utf-8-sig")
+
+
+def member_streams(n_members, seed=None):
+    """Independent random number generators for each ensemble member, spawned from a single seed"""
+
+    return [
+        np.random.default_rng(child)
+        for child in np.random.SeedSequence(seed).spawn(n_members)
+    ]
+
+
+def yearly_storm_counts(
+    streams, model_years, mean_yearly_storms=8.3, SD_yearly_storms=5.9, StormStart=2
+):
+    """Number of storms in each year (from StormStart to model_years) of each member
+
+    :return: array of counts (n_members x (model_years - StormStart))
+    """
+    n_years = max(model_years - StormStart, 0)
+    counts = np.round(
+        [rng.normal(mean_yearly_storms, SD_yearly_storms, size=n_years) for rng in streams]
+    ).reshape(len(streams), n_years)
+
+    return np.maximum(counts, 0).astype(np.int64)
+
+
+def storm_events(storm_list, storm_index, MHW=0.46):
+    """Rows of a storm series (Rhigh, Rlow, period, duration) for the given storms of the storm list
+
+    :param storm_list: list of synthetic storms (see Notes)
+    :param storm_index: indices of the selected storms
+    :param MHW: elevation of mean high water [m NAVD88]
+
+    :return: array (n_storms x 4); water levels in dam relative to MHW, duration in hours (half of the storm)
+    """
+    selected = storm_list[storm_index]
+    events = np.empty((len(storm_index), 4))
+    events[:, 0] = selected[:, 2] / 10 - MHW / 10  # Rhigh (TWL)
+    events[:, 1] = selected[:, 6] / 10 - MHW / 10  # Rlow
+    events[:, 2] = selected[:, 4]  # Tp
+    events[:, 3] = np.round(selected[:, 1] / 2)  # TWL only for half of the storm
+
+    return events
+
+
+def generate_storm_library(
+    path,
+    storm_list,
+    n_members,
+    model_years=1000,
+    mean_yearly_storms=8.3,
+    SD_yearly_storms=5.9,
+    MHW=0.46,
+    StormStart=2,
+    seed=None,
+    members_per_block=256,
+):
+    """Generate storm series for an ensemble and write them into a storm library
+
+    :param path: storm library directory
+    :param storm_list: list of synthetic storms (array, or path to a .csv or .npy file)
+    :param n_members: number of storm series
+    :param model_years: length of each storm series [yrs]
+    :param mean_yearly_storms: mean number of storms per year
+    :param SD_yearly_storms: standard deviation of the number of storms per year
+    :param MHW: elevation of mean high water [m NAVD88]
+    :param StormStart: first year with storms (earlier years are padded with zeros, as Barrier3D expects)
+    :param seed: seed of the random number streams of the members
+    :param members_per_block: number of members whose storms are selected at once (limits memory use)
+
+    :return: StormLibrary
+    """
+    if not isinstance(storm_list, np.ndarray):
+        storm_list = load_storm_list(storm_list)
+
+    streams = member_streams(n_members, seed=seed)
+    counts = yearly_storm_counts(
+        streams,
+        model_years,
+        mean_yearly_storms=mean_yearly_storms,
+        SD_yearly_storms=SD_yearly_storms,
+        StormStart=StormStart,
+    )
+    years = np.arange(StormStart, max(model_years, StormStart))
+
+    storms, offsets = StormLibrary.allocate(
+        path,
+        StormStart + counts.sum(axis=1),
+        members=["member-{:05d}".format(member) for member in range(n_members)],
+    )
+
+    for first in range(0, n_members, members_per_block):
+        block = range(first, min(first + members_per_block, n_members))
+
+        # storms are selected from each member's own stream, in order of the years
+        storm_index = np.concatenate(
+            [
+                streams[member].integers(1, len(storm_list), size=counts[member].sum())
+                for member in block
+            ]
+        )
+        events = storm_events(storm_list, storm_index, MHW=MHW)
+        event_years = np.repeat(np.tile(years, len(block)), counts[block].ravel())
+
+        # rows of the block: zero padding until StormStart, then the storms of each member
+        rows = storms[offsets[block.start] : offsets[block.stop]]
+        is_storm = np.ones(len(rows), dtype=bool)
+        padding = (offsets[block.start : block.stop] - offsets[block.start])[
+            :, None
+        ] + np.arange(StormStart)
+        is_storm[padding.ravel()] = False
+
+        rows[~is_storm] = 0.0
+        rows[is_storm, 0] = event_years
+        rows[is_storm, 1:] = events
+
+    storms.flush()
+    del storms
+
+    return StormLibrary(path)
@@ -0,0 +1,339 @@
+"""Live progress of running simulations
+
+A `Telemetry` subscribes to the events of a Cascade instance (see `cascade.events`) and sends a record of each model
+year, as a line of JSON, to a channel:
+
+    run                 name of the simulation
+    year                model year
+    time                time the year was completed [s since the epoch]
+    wall                wall time of the year [s]: "physics" (Barrier3D, BRIE), "management" (the human dynamics
+                        modules), and "total" (including checkpoints)
+    active, drowned     number of Barrier3D domains that are still updated, and that have drowned
+    b3d_break           the simulation has stopped (the barrier drowned)
+    shoreline           mean shoreline position of the active domains [m]
+    barrier_width       mean barrier width (x_b - x_s) of the active domains [m]
+    barrier_height      mean barrier height of the active domains [m]
+
+The channel is given by a target:
+
+    udp://host:port     UDP datagrams, e.g. to a monitor on the login node of a cluster
+    unix:///path        datagrams to a Unix domain socket
+    a named pipe        (a path that exists and is a FIFO, see `os.mkfifo`)
+    a directory         the append-only file `<directory>/<run>.telemetry.jsonl`
+    any other path      an append-only file
+
+Sending never blocks the time loop: datagrams and writes to a pipe are non-blocking, and a record that cannot be sent
+(e.g., no monitor is listening, or the pipe is full) is dropped and counted (`dropped`). Files are appended to a line at
+a time, so they can be followed while the simulation runs.
+
+    >>> telemetry = Telemetry("udp://localhost:9999").attach(cascade)  # doctest: +SKIP
+    >>> while cascade.time_index < cascade.time_step_count and not cascade.b3d_break:  # doctest: +SKIP
+    ...     cascade.update()
+
+`Aggregator` collects the latest record of each of many runs, from the telemetry files in a set of directories and from
+a socket (`cascade monitor` in the command line).
+
+"""
+import json
+import os
+import socket
+import stat
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+from .events import (
+    POST_MANAGEMENT,
+    POST_PHYSICS,
+    POST_UPDATE,
+    PRE_MANAGEMENT,
+    PRE_PHYSICS,
+)
+
+TELEMETRY_SUFFIX = ".telemetry.jsonl"
+
+
+def _mean(values):
+    return float(np.mean(values)) if len(values) else None
+
+
+def year_record(cascade):
+    """Record (a dict, see the module docstring) of the state of a Cascade instance, without the wall times"""
+    active = [cascade.barrier3d[iB3D] for iB3D in cascade.active_domains]
+    return {
+        "run": cascade._filename,
+        "year": int(cascade.time_index - 1),
+        "time": time.time(),
+        "active": len(active),
+        "drowned": int(sum(cascade.domain_break)),
+        "b3d_break": bool(cascade.b3d_break),
+        "shoreline": _mean([barrier3d.x_s_TS[-1] * 10 for barrier3d in active]),
+        "barrier_width": _mean(
+            [(barrier3d.x_b_TS[-1] - barrier3d.x_s_TS[-1]) * 10 for barrier3d in active]
+        ),
+        "barrier_height": _mean([barrier3d.h_b_TS[-1] * 10 for barrier3d in active]),
+    }
+
+
+class _FileChannel:
+    def __init__(self, path):
+        self._file = open(path, "a", buffering=1)  # line buffered
+
+    def send(self, line):
+        self._file.write(line)
+        return True
+
+    def close(self):
+        self._file.close()
+
+
+class _PipeChannel:
+    def __init__(self, path):
+        self._path = path
+        self._fd = None
+
+    def send(self, line):
+        try:
+            if self._fd is None:  # (re)open once a reader is connected
+                self._fd = os.open(self._path, os.O_WRONLY | os.O_NONBLOCK)
+            os.write(self._fd, line.encode())
+        except OSError:  # no reader (ENXIO), the reader left (EPIPE), or the pipe is full (EAGAIN)
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class _DatagramChannel:
+    def __init__(self, family, address):
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._address = address
+
+    def send(self, line):
+        try:
+            self._socket.sendto(line.encode(), self._address)
+        except OSError:  # nobody is listening, or the send buffer is full
+            return False
+        return True
+
+    def close(self):
+        self._socket.close()
+
+
+def parse_target(target):
+    """Family and address of a socket target ("udp://host:port" or "unix:///path"), or None for a path"""
+    url = urlparse(str(target))
+    if url.scheme == "udp":
+        return socket.AF_INET, (url.hostname or "localhost", url.port)
+    if url.scheme == "unix":
+        return socket.AF_UNIX, url.path
+    return None
+
+
+def open_channel(target, run):
+    """Channel to send the records of the simulation `run` to (see the module docstring)"""
+    address = parse_target(target)
+    if address is not None:
+        return _DatagramChannel(*address)
+
+    path = Path(target)
+    if path.is_dir():
+        return _FileChannel(path / (run + TELEMETRY_SUFFIX))
+    if path.exists() and stat.S_ISFIFO(path.stat().st_mode):
+        return _PipeChannel(path)
+    return _FileChannel(path)
+
+
+class Telemetry:
+    def __init__(self, target):
+        """Send a record of each model year of a simulation to a channel (see the module docstring)
+
+        :param target: socket URL ("udp://host:port" or "unix:///path"), named pipe, directory or file
+        """
+        self._target = target
+        self._channel = None
+        self._cascade = None
+        self._start = {}
+        self._wall = {}
+        self._sent = 0
+        self._dropped = 0
+
+    @property
+    def sent(self):
+        return self._sent
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    def attach(self, cascade):
+        """Subscribe to the events of a Cascade instance (e.g., again after it is resumed from a checkpoint)
+
+        :return: self
+        """
+        if self._channel is None:
+            self._channel = open_channel(self._target, cascade._filename)
+        self._cascade = cascade
+        cascade.events.subscribe(
+            self._on_event,
+            PRE_PHYSICS,
+            POST_PHYSICS,
+            PRE_MANAGEMENT,
+            POST_MANAGEMENT,
+            POST_UPDATE,
+        )
+        return self
+
+    def detach(self):
+        """Stop sending records, and close the channel"""
+        if self._cascade is not None:
+            self._cascade.events.unsubscribe(self._on_event)
+            self._cascade = None
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
+
+    def _on_event(self, event):
+        now = time.perf_counter()
+        if event.kind == PRE_PHYSICS:
+            self._start = {"total": now, "physics": now}
+            self._wall = {"physics": 0.0, "management": 0.0}
+        elif event.kind == POST_PHYSICS:
+            # once per year, or for each domain if the management is pipelined
+            self._wall["physics"] = now - self._start.get("physics", now)
+        elif event.kind == PRE_MANAGEMENT:
+            self._start["management"] = now
+        elif event.kind == POST_MANAGEMENT:
+            self._wall["management"] += now - self._start.pop("management", now)
+        elif event.kind == POST_UPDATE:
+            self._wall["total"] = now - self._start.get("total", now)
+            self.send(dict(year_record(self._cascade), wall=self._wall))
+            self._start = {}
+
+    def send(self, record):
+        """Send a record; it is dropped (and counted) if the channel cannot take it without blocking
+
+        :return: True if the record was sent
+        """
+        if self._channel.send(json.dumps(record) + "\n"):
+            self._sent += 1
+            return True
+        self._dropped += 1
+        return False
+
+
+def read_records(path, offset=0):
+    """Complete records of a telemetry file from `offset` (a line that is still being written is left for later)
+
+    :return: list of records, offset of the first unread byte
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records, offset + end
+
+
+class Aggregator:
+    def __init__(self, directories=(), listen=None):
+        """Latest record of each of many runs
+
+        :param directories: directories with telemetry files (`<run>.telemetry.jsonl`, e.g. written by the runs of an
+            ensemble to a shared directory); files that appear later are picked up too
+        :param listen: socket URL to receive records on ("udp://host:port" or "unix:///path")
+        """
+        self._directories = [Path(directory) for directory in directories]
+        self._offsets = {}
+        self._socket = None
+        self._latest = {}
+
+        if listen is not None:
+            address = parse_target(listen)
+            if address is None:
+                raise ValueError("{}: not a socket URL".format(listen))
+            self._socket = socket.socket(address[0], socket.SOCK_DGRAM)
+            self._socket.bind(address[1])
+            self._socket.setblocking(False)
+
+    @property
+    def latest(self):
+        """Latest record of each run, by the name of the run"""
+        return self._latest
+
+    def _update(self, record):
+        run = record.get("run")
+        if run is not None and record.get("year", -1) >= self._latest.get(
+            run, {}
+        ).get("year", -1):
+            self._latest[run] = record
+
+    def poll(self):
+        """Read the records that arrived since the last poll, without waiting for more
+
+        :return: dict of the latest record of each run (see `latest`)
+        """
+        for directory in self._directories:
+            for path in directory.glob("*" + TELEMETRY_SUFFIX):
+                records, self._offsets[path] = read_records(
+                    path, self._offsets.get(path, 0)
+                )
+                for record in records:
+                    self._update(record)
+
+        while self._socket is not None:
+            try:
+                data = self._socket.recv(65536)
+            except BlockingIOError:
+                break
+            for line in data.splitlines():
+                try:
+                    self._update(json.loads(line))
+                except ValueError:
+                    continue
+
+        return self._latest
+
+    def table(self):
+        """One line of text for each run, in the order of their names"""
+        lines = [
+            "{:<32} {:>6} {:>7} {:>7} {:>9} {:>10} {:>10}".format(
+                "run", "year", "active", "drowned", "s/year", "shoreline", "width"
+            )
+        ]
+        for run in sorted(self._latest):
+            record = self._latest[run]
+            lines.append(
+                "{:<32} {:>6} {:>7} {:>7} {:>9.2f} {:>10} {:>10}".format(
+                    run[:32],
+                    record["year"],
+                    record["active"],
+                    record["drowned"],
+                    record.get("wall", {}).get("total", float("nan")),
+                    _format(record.get("shoreline")),
+                    _format(record.get("barrier_width")),
+                )
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+def _format(value):
+    return "-" if value is None else "{:.1f}".format(value)
@@ -0,0 +1,408 @@
+"""Elevation animations of CASCADE simulations
+
+An animation of the barrier, dune and beach elevation (see `plotters.plot_ElevAnimation_CASCADE`) is made in three
+separate steps:
+    1) frame composition: the beach, dune and interior domains of each Barrier3D domain are stacked into a single
+       elevation domain per frame; all frames are built at once, as an array of frames x cross-shore x alongshore
+       (`animation_cube`), from the domain histories, so viewers can slice the cube directly,
+    2) rendering: each frame is drawn with matplotlib into an in-memory RGB image (`render_frame`); frames are
+       independent, so they are rendered in parallel over a pool of processes (`render_frames`),
+    3) encoding: the images are written straight to a GIF or MP4 file (`write_animation`).
+
+No frame images are written to disk (unless requested), and the working directory is never changed.
+
+"""
+from pathlib import Path
+
+import numpy as np
+
+
+def animation_extent(cascade, TMAX_MGMT, ny=1, beach_management_ny=(False,)):
+    """Cross-shore size of the animation domain and the initial shoreline position [dam]
+
+    :return: AniDomainWidth, OriginY
+    """
+    barrier3d = cascade.barrier3d
+
+    # set up the domain; here we just use the first grid, but that could break in future runs
+    if np.any(beach_management_ny):
+        indices = [i for i in range(ny) if beach_management_ny[i] == 1]
+        iB3D = indices[0]
+        MaxBeachWidth = (
+            np.max(cascade.nourishments[iB3D].beach_width[0 : TMAX_MGMT[iB3D]]) / 10
+        )  # dam
+    else:
+        MaxBeachWidth = cascade._initial_beach_width[0]
+    OriginY = int(barrier3d[0].x_s_TS[0])
+    AniDomainWidth = int(
+        np.amax(barrier3d[0].InteriorWidth_AvgTS)
+        + MaxBeachWidth
+        + np.abs(barrier3d[0]._ShorelineChange)
+        + OriginY
+        + 35
+    )
+
+    return AniDomainWidth, OriginY
+
+
+def _pad_stack(domains, dtype=np.float64):
+    """Stack 2-D arrays of different widths (first axis) into a NaN-padded 3-D array
+
+    :return: stacked arrays, width of each array
+    """
+    widths = np.array([len(domain) for domain in domains], dtype=np.int64)
+    length = np.shape(domains[0])[1] if len(domains) else 0
+    stacked = np.full(
+        (len(domains), widths.max(initial=0), length), np.nan, dtype=dtype
+    )
+    for i, domain in enumerate(domains):
+        stacked[i, : widths[i]] = domain
+    return stacked, widths
+
+
+def stack_profiles(
+    rows, origin, beach_width, beach_slope, dunes, interior, interior_width
+):
+    """Cross-shore stack of beach, dunes, and interior of one Barrier3D domain, for many frames at once
+
+    The beach is a sloping surface up to the berm (we only show beach width decreasing in increments of 10 m and
+    don't illustrate a berm): its elevation in cell i (from the shoreline) is `beach_slope * (i + 1)`.
+
+    :param rows: cross-shore size of the frames [dam]
+    :param origin: cross-shore position of the shoreline in each frame (cell index)
+    :param beach_width: (cellular) beach width in each frame [dam]
+    :param beach_slope: elevation increment of the beach per cell in each frame [m MHW]
+    :param dunes: dune elevation of each frame (frames x dune width x alongshore) [m MHW]
+    :param interior: interior elevation of each frame (frames x cross-shore x alongshore; may be NaN-padded) [m MHW]
+    :param interior_width: cross-shore width of the interior in each frame [dam]
+
+    :return: elevation (frames x rows x alongshore) [m MHW], -1 offshore, behind the barrier, and below sea level
+    """
+    n_frames, dune_width, length = dunes.shape
+    cell = np.arange(rows)[np.newaxis, :] - np.asarray(origin)[:, np.newaxis]
+    frame = np.broadcast_to(np.arange(n_frames)[:, np.newaxis], cell.shape)
+    domain = np.full(
+        (n_frames, rows, length), -1, dtype=np.result_type(dunes, interior)
+    )
+
+    beach_width = np.asarray(beach_width)[:, np.newaxis]
+    beach = (cell >= 0) & (cell < beach_width)
+    domain[beach] = (
+        (np.asarray(beach_slope)[:, np.newaxis] * (cell + 1)) * 10
+    )[beach][:, np.newaxis]
+
+    cell = cell - beach_width
+    dune = (cell >= 0) & (cell < dune_width)
+    domain[dune] = dunes[frame[dune], cell[dune]]
+
+    cell = cell - dune_width
+    barrier = (cell >= 0) & (cell < np.asarray(interior_width)[:, np.newaxis])
+    domain[barrier] = interior[frame[barrier], cell[barrier]]
+
+    domain[domain < 0] = -1
+
+    return domain
+
+
+def _beach_slope(barrier3d, cellular_beach_width):
+    return barrier3d.SL + (barrier3d.BermEl - barrier3d.SL) / (
+        cellular_beach_width + 1
+    )
+
+
+def _annual_frames(cube, index, cascade, TMAX_MGMT, TMAX_SIM, ny, beach_management_ny):
+    """Fill the frames at the end of each year (cube[index[t]]), which incorporate human modifications to the
+    shoreface, beach, dune, & interior"""
+
+    barrier3d = cascade.barrier3d
+    BarrierLength = barrier3d[0].BarrierLength
+    rows = cube.shape[1]
+
+    # after management ends, the beach width is held at the width of the first unmanaged year
+    t_beach = np.minimum(np.arange(TMAX_SIM), np.max(TMAX_MGMT) + 1)
+
+    for iB3D in range(ny):
+        b3d = barrier3d[iB3D]
+        history = cascade.domain_history[iB3D]
+        x_s = np.asarray(b3d.x_s_TS[0 : TMAX_SIM + 1])
+
+        if beach_management_ny[iB3D]:
+            beach_width = np.asarray(cascade.nourishments[iB3D].beach_width) / 10
+            # the beach width is NaN if the barrier height drowns
+            beach_width = np.where(
+                np.isnan(beach_width[t_beach]),
+                beach_width[t_beach - 1],
+                beach_width[t_beach],
+            )
+        else:
+            # both roadways and natural scenario
+            beach_width = cascade._initial_beach_width[iB3D] / 10
+
+        # the beach is drawn from the shoreline of year t, with the (cellular) width of year t_beach
+        origin = np.floor(x_s[:TMAX_SIM]).astype(np.int64)
+        cellular_beach_width = (
+            np.floor(x_s[t_beach] + beach_width) - np.floor(x_s[t_beach])
+        ).astype(np.int64)  # not actual bw
+
+        columns = slice(iB3D * BarrierLength, (iB3D + 1) * BarrierLength)
+        for start in range(0, TMAX_SIM, history.block_years):
+            stop = min(start + history.block_years, TMAX_SIM)
+            dunes = (
+                np.swapaxes(b3d.DuneDomain[start:stop], 1, 2) + b3d.BermEl
+            ) * 10
+            cube[index[start:stop], :, columns] = stack_profiles(
+                rows,
+                origin[start:stop],
+                cellular_beach_width[start:stop],
+                _beach_slope(b3d, cellular_beach_width[start:stop]),
+                dunes,
+                history.array(start, stop) * 10,
+                history.widths[start:stop],
+            )
+
+
+def _post_storm_frames(
+    cube,
+    index,
+    cascade,
+    TMAX_MGMT,
+    TMAX_SIM,
+    ny,
+    beach_management_ny,
+    roadway_management_ny,
+):
+    """Fill the frames after the storms of years 1, 2, ..., before human modifications (cube[index[t - 1]])
+
+    Post-storm variables in the BeachDuneManager are: interior, dune height, x_s, s_sf, beach width
+    """
+    barrier3d = cascade.barrier3d
+    BarrierLength = barrier3d[0].BarrierLength
+    rows = cube.shape[1]
+    years = np.arange(1, len(index) + 1)
+
+    for iB3D in range(ny):
+        b3d = barrier3d[iB3D]
+        history = cascade.domain_history[iB3D]
+        origin = np.empty(len(years), dtype=np.int64)
+        cellular_beach_width = np.empty(len(years), dtype=np.int64)
+        dunes, interior = [], []
+
+        for i, t in enumerate(years):
+            if beach_management_ny[iB3D] and (t < TMAX_MGMT[iB3D] + 1):
+                # the nourishment scenario
+                nourishment = cascade.nourishments[iB3D]
+                shoreline = nourishment._post_storm_x_s[t]
+                beach_width = nourishment._post_storm_beach_width[t] / 10
+                interior.append(nourishment._post_storm_interior[t])
+                dunes.append(nourishment._post_storm_dunes[t])
+            elif roadway_management_ny[iB3D] and (t < TMAX_MGMT[iB3D] + 1):
+                # the roadways scenario
+                shoreline = b3d.x_s_TS[t]
+                beach_width = cascade._initial_beach_width[iB3D] / 10
+                interior.append(cascade.roadways[iB3D]._post_storm_interior[t])
+                dunes.append(cascade.roadways[iB3D]._post_storm_dunes[t])
+            else:
+                # the natural scenario
+                shoreline = b3d.x_s_TS[t]
+                beach_width = cascade._initial_beach_width[iB3D] / 10
+                interior.append(history[t])
+                dunes.append(b3d.DuneDomain[t, :, :])
+
+            origin[i] = np.floor(shoreline)
+            cellular_beach_width[i] = np.floor(shoreline + beach_width) - np.floor(
+                shoreline
+            )  # not actual bw
+
+        dunes = (np.swapaxes(np.asarray(dunes), 1, 2) + b3d.BermEl) * 10
+        interior, interior_width = _pad_stack(interior, dtype=history.dtype)
+        cube[index, :, iB3D * BarrierLength : (iB3D + 1) * BarrierLength] = (
+            stack_profiles(
+                rows,
+                origin,
+                cellular_beach_width,
+                _beach_slope(b3d, cellular_beach_width),
+                dunes,
+                interior * 10,
+                interior_width,
+            )
+        )
+
+
+def animation_cube(
+    cascade,
+    TMAX_MGMT,
+    TMAX_SIM,
+    ny=1,
+    beach_management_ny=(False,),
+    roadway_management_ny=(False,),
+    dtype=np.float64,
+):
+    """Elevation of all frames of the animation, as a single array (frames x cross-shore x alongshore)
+
+    Start with t=0, then (for management simulations) the post-storm dune, interior, shoreface, etc. before
+    management, treating this as t=0.5 (i.e., this is really the final configuration from storms at t=1,2,3,4,5,...
+    but before human modifications), then t=1, and so on. The annual frames are built from the domain history of each
+    Barrier3D domain (see `cascade.domain_history`), a block of years at a time.
+
+    NOTE THAT THE BEACH REPRESENTATION IS BASED ON A MODEL SPECIFIED BEACH WIDTH. We set the beach width for the
+    remaining time steps after the community has been abandoned to the last managed beach width in order to not have a
+    huge jump in the back-barrier position in Barrier3D. OTHERWISE, it is meaningless to the dynamics Barrier3D.
+
+    :param dtype: precision of the cube (e.g., np.float32 to halve the memory of long simulations)
+
+    :return: time of each frame [yrs], elevation of each frame [m MHW]
+    """
+    AniDomainWidth, _ = animation_extent(cascade, TMAX_MGMT, ny, beach_management_ny)
+    BarrierLength = cascade.barrier3d[0].BarrierLength
+
+    n_post_storm = 0
+    if np.any(beach_management_ny) or np.any(roadway_management_ny):
+        tmax_management = np.array(TMAX_MGMT)
+        tmax_management = tmax_management[tmax_management < TMAX_SIM - 1]
+        if tmax_management.size > 0:
+            n_post_storm = int(np.max(tmax_management))
+        else:
+            n_post_storm = int(min(np.max(TMAX_MGMT), TMAX_SIM - 1))
+
+    # frames of year t, and of year t + 0.5 for t < n_post_storm
+    annual_index = np.arange(TMAX_SIM) + np.minimum(np.arange(TMAX_SIM), n_post_storm)
+    post_storm_index = annual_index[:n_post_storm] + 1
+    times = np.empty(TMAX_SIM + n_post_storm)
+    times[annual_index] = np.arange(TMAX_SIM)
+    times[post_storm_index] = np.arange(n_post_storm) + 0.5
+
+    cube = np.empty((len(times), AniDomainWidth + 1, BarrierLength * ny), dtype=dtype)
+    _annual_frames(
+        cube, annual_index, cascade, TMAX_MGMT, TMAX_SIM, ny, beach_management_ny
+    )
+    if n_post_storm:
+        _post_storm_frames(
+            cube,
+            post_storm_index,
+            cascade,
+            TMAX_MGMT,
+            TMAX_SIM,
+            ny,
+            beach_management_ny,
+            roadway_management_ny,
+        )
+
+    return times, cube
+
+
+def compose_frames(
+    cascade,
+    TMAX_MGMT,
+    TMAX_SIM,
+    ny=1,
+    beach_management_ny=(False,),
+    roadway_management_ny=(False,),
+):
+    """Elevation domains of the frames of the animation, in order (views into `animation_cube`)
+
+    :return: list of (time [yrs], elevation domain) tuples
+    """
+    times, cube = animation_cube(
+        cascade, TMAX_MGMT, TMAX_SIM, ny, beach_management_ny, roadway_management_ny
+    )
+    return [
+        (int(time) if time % 1 == 0 else float(time), domain)
+        for time, domain in zip(times, cube)
+    ]
+
+
+def render_frame(
+    domain,
+    time,
+    y_lim=(150, 250),
+    z_lim=3.5,
+    fig_size=None,
+    km_on=True,
+    origin_y=0,
+    file_name=None,
+):
+    """Draw an elevation domain into an RGB image (an array of rows x columns x 3), without pyplot
+
+    :param domain: elevation domain [m MHW]
+    :param time: time of the frame [yrs]
+    :param y_lim: y limits [low, high] of plot [dam]
+    :param z_lim: z limit of plot [m MHW]
+    :param fig_size: size of plot, e.g., (6, 2.5) [default: (7, 7)]
+    :param km_on: label the axes in km (otherwise dam)
+    :param origin_y: initial shoreline position, to place the time label if `y_lim` is None [dam]
+    :param file_name: also save the frame to this file (e.g., an .eps file)
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import AutoMinorLocator
+
+    with matplotlib.rc_context({"font.size": 11}):
+        fig = Figure(figsize=fig_size if fig_size is not None else (7, 7))
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        cax = ax.pcolormesh(domain, cmap="terrain", vmin=-1.1, vmax=z_lim)
+        cbar = fig.colorbar(cax)
+        cbar.set_label("elevation (m MHW)", rotation=270)
+        ax.set_xlabel("alongshore distance (dam)")
+        ax.set_ylabel("cross-shore distance (dam)")
+        timestr = "Time = " + str(time) + " yrs"
+        if km_on:
+            locs = ax.get_yticks()
+            ax.set_yticks(locs, locs / 100)
+            locs = ax.get_xticks()
+            ax.set_xticks(locs[0:-1], locs[0:-1] / 100)
+            ax.set_xlabel("alongshore distance (km)")
+            ax.set_ylabel("cross-shore distance (km)")
+            ax.yaxis.set_minor_locator(AutoMinorLocator())
+        if y_lim is not None:
+            ax.set_ylim(y_lim)
+            ax.text(3, y_lim[0] + 3, timestr, color="w")
+        else:
+            ax.set_ylim(bottom=origin_y - 35)
+            ax.text(1, origin_y - 33, timestr)
+        fig.tight_layout()
+
+        canvas.draw()
+        image = np.array(canvas.buffer_rgba())[..., :3]
+        if file_name is not None:
+            fig.savefig(file_name)
+
+    return image
+
+
+def render_frames(frames, n_jobs=1, frame_directory=None, frame_format="png", **kwds):
+    """Render frames into RGB images, in parallel
+
+    :param frames: list of (time, elevation domain) tuples (see `compose_frames`)
+    :param n_jobs: number of processes (see joblib.Parallel; -1 for all CPUs)
+    :param frame_directory: if given, also save each frame to "elev_<time>.<frame_format>" in this directory
+    :param frame_format: format of the saved frames (e.g., "png", "eps")
+    :param kwds: keyword arguments of `render_frame`
+
+    :return: list of images
+    """
+    from joblib import Parallel, delayed
+
+    def file_name(time):
+        if frame_directory is None:
+            return None
+        label = str(int(time)) + ("pt5" if time % 1 else "")
+        return str(Path(frame_directory) / "elev_{}.{}".format(label, frame_format))
+
+    return Parallel(n_jobs=n_jobs)(
+        delayed(render_frame)(domain, time, file_name=file_name(time), **kwds)
+        for time, domain in frames
+    )
+
+
+def write_animation(images, file_name, fps=10):
+    """Encode images into an animation (.gif, or .mp4 with the imageio-ffmpeg plugin)
+
+    :return: path to the animation
+    """
+    import imageio
+
+    imageio.mimsave(str(file_name), images, fps=fps)
+
+    return Path(file_name)
@@ -10,12 +10,15 @@ import matplotlib.pyplot as plt
 import matplotlib as mpl
 from matplotlib import cm
 import numpy as np
-import pandas as pd
 import os
-import imageio
 import math
-from scipy import signal
 from matplotlib.ticker import AutoMinorLocator
+from .statistics import (
+    combine_post_storm_human_time_series,
+    human_dynamics_statistics,
+    shoreline_periodicity,
+    stack_time_series,
+)
 
 # # ###############################################################################
 # # modified from barrier3d
@@ -198,107 +201,10 @@ def calc_ShorelinePeriodicity(x_s_TS):
     Punc (boolean for punctuated retreat)
     ]
 
-    Calculate shoreline change periodicity
+    Calculate shoreline change periodicity (see `statistics.shoreline_periodicity` to analyze many time series at once)
 
     """
-    # Shoreline Change & Change Rate Over Time
-    scts = [(x - x_s_TS[0]) * 10 for x in x_s_TS]
-
-    # Filter
-    win = 31
-    poly = 3
-    der1 = signal.savgol_filter(scts, win, poly, deriv=1)
-
-    HitDown = []  # Slow-downs
-    HitUp = []  # Speed-ups
-
-    window1 = 3  # Maximum allowed length for gaps in slow periods
-    window2 = 30  # Minimum length required for slow periods, including gaps
-    buffer = 3
-    thresh1 = 0.5  # Max slope for slow periods (if shoreline change rate is below this, immobile, otherwise transgressive)
-    thresh2 = 1
-
-    # Find slow periods
-    der_under = np.where(der1 < thresh1)[0]
-
-    if len(der_under) > 0:
-
-        gaps = np.diff(der_under) > window1
-        peak_start = np.insert(der_under[1:][gaps], 0, der_under[0])
-        peak_stop = np.append(der_under[:-1][gaps], der_under[-1])
-
-        for n in range(len(peak_stop)):
-            if peak_stop[n] - peak_start[n] > window2:
-                if len(HitDown) == 0:
-                    if peak_start[n] > buffer:
-                        HitDown.append(peak_start[n])
-                    if peak_stop[n] < len(scts) - buffer:
-                        HitUp.append(peak_stop[n])
-                else:
-                    gap_length = peak_start[n] - HitUp[-1]
-                    gap_slope = (scts[peak_start[n]] - scts[HitUp[-1]]) / gap_length
-                    if gap_length < window2 and gap_slope < thresh2:
-                        if peak_stop[n] < len(scts) - buffer:
-                            HitUp[-1] = peak_stop[n]
-                        else:
-                            del HitUp[-1]
-                    else:
-                        if peak_start[n] > buffer:
-                            HitDown.append(peak_start[n])
-                        if peak_stop[n] < len(scts) - buffer:
-                            HitUp.append(peak_stop[n])
-
-    # CALCULATE STATS
-    Jumps = len(HitDown)
-    Slows = len(HitUp)
-    SlowDur = []
-    FastDur = []
-
-    if Jumps > 0 and Slows > 0:
-        DownFirst = HitDown[0] < HitUp[0]
-    elif Jumps == 0 and Slows > 1:
-        DownFirst = True
-    else:
-        DownFirst = False
-
-    if Jumps >= 2 or Slows >= 2:
-        if Jumps >= 2 and Slows >= 2:
-            Periodicity = (np.mean(np.diff(HitDown)) + np.mean(np.diff(HitUp))) / 2
-        elif Jumps >= Slows:
-            Periodicity = np.mean(np.diff(HitDown))
-        else:
-            Periodicity = np.mean(np.diff(HitUp))
-        if DownFirst:
-            for n in range(Slows):
-                SlowDur.append(HitUp[n] - HitDown[n])
-            for n in range(Jumps - 1):
-                FastDur.append(HitDown[n + 1] - HitUp[n])
-        else:
-            for n in range(Slows - 1):
-                SlowDur.append(HitUp[n + 1] - HitDown[n])
-            for n in range(Jumps):
-                FastDur.append(HitDown[n] - HitUp[n])
-    else:
-        Periodicity = 0
-        if Jumps == 1 and Slows == 1:
-            if DownFirst:
-                SlowDur.append(HitUp[0] - HitDown[0])
-            else:
-                FastDur.append(HitDown[0] - HitUp[0])
-
-    AvgFastDur = np.mean(FastDur)
-    if np.isnan(AvgFastDur):
-        AvgFastDur = 0
-    AvgSlowDur = np.mean(SlowDur)
-    if np.isnan(AvgSlowDur):
-        AvgSlowDur = 0
-
-    if len(SlowDur) >= 2 and len(FastDur) >= 2:
-        Punc = 1
-    else:
-        Punc = 0
-
-    return [Periodicity, AvgFastDur, AvgSlowDur, Punc]
+    return list(shoreline_periodicity(x_s_TS).item())
 
 def plot_dune_domain(b3d, TMAX):
     """
@@ -358,6 +264,8 @@ def plot_ShorelineChangeRate(b3d):
             rate.append(scts[k] - scts[k - 1])
         ave_rate.append(rate)
 
+    import pandas as pd
+
     df = pd.DataFrame(data=ave_rate)
     ave = df.mean(axis=0)
 
@@ -392,14 +300,14 @@ def plot_punctuated_difference(CASCADE_b3d, b3d_only, ny):
     var_sc_rate = []
     mean_sc_rate = []
 
+    periodicity = shoreline_periodicity(
+        stack_time_series([CASCADE_b3d[iB3D]._x_s_TS for iB3D in range(ny)])
+    )
     for iB3D in range(ny):
-        tmpPeriod, tmpAvgFastDur, tmpAvgSlowDur, tmpPunc = calc_ShorelinePeriodicity(
-            CASCADE_b3d[iB3D]._x_s_TS
-        )
-        Punc.append(tmpPunc)
-        Period.append(tmpPeriod)
-        AvgFastDur.append(tmpAvgFastDur)
-        AvgSlowDur.append(tmpAvgSlowDur)
+        Punc.append(periodicity["Punc"][iB3D])
+        Period.append(periodicity["Periodicity"][iB3D])
+        AvgFastDur.append(periodicity["AvgFastDur"][iB3D])
+        AvgSlowDur.append(periodicity["AvgSlowDur"][iB3D])
         ShorelinePosition.append(CASCADE_b3d[iB3D]._x_s_TS)
 
         # shoreline change rate
@@ -423,14 +331,14 @@ def plot_punctuated_difference(CASCADE_b3d, b3d_only, ny):
     var_sc_rate_b3d = []
     mean_sc_rate_b3d = []
 
+    periodicity = shoreline_periodicity(
+        stack_time_series([b3d_only[iB3D]._x_s_TS for iB3D in range(ny)])
+    )
     for iB3D in range(ny):
-        tmpPeriod, tmpAvgFastDur, tmpAvgSlowDur, tmpPunc = calc_ShorelinePeriodicity(
-            b3d_only[iB3D]._x_s_TS
-        )
-        Punc_b3D.append(tmpPunc)
-        Period_b3D.append(tmpPeriod)
-        AvgFastDur_b3D.append(tmpAvgFastDur)
-        AvgSlowDur_b3D.append(tmpAvgSlowDur)
+        Punc_b3D.append(periodicity["Punc"][iB3D])
+        Period_b3D.append(periodicity["Periodicity"][iB3D])
+        AvgFastDur_b3D.append(periodicity["AvgFastDur"][iB3D])
+        AvgSlowDur_b3D.append(periodicity["AvgSlowDur"][iB3D])
         ShorelinePosition_b3D.append(b3d_only[iB3D]._x_s_TS)
 
         # shoreline change rate
@@ -614,7 +522,11 @@ def plot_ElevAnimation_CASCADE(
         z_lim=3.5,
         fig_size=None,
         fig_eps=False,
-        km_on=True
+        km_on=True,
+        n_jobs=1,
+        save_frames=False,
+        animation_file="elev.gif",
+        fps=10,
 ):
     """
     :param cascade: a cascade model object
@@ -628,8 +540,16 @@ def plot_ElevAnimation_CASCADE(
     :param y_lim: y limits [low, high] of plot [dam]
     :param z_lim: z limit of plot [m MHW]
     :param fig_size: size of plot, e.g., (6, 2.5)
-    :param fig_eps: output files in eps format -- default is png [best for gif]
-    :return: gif
+    :param fig_eps: also save each frame as an eps file
+    :param km_on: label the axes in km (otherwise dam)
+    :param n_jobs: number of processes used to render the frames (-1 for all CPUs)
+    :param save_frames: also save each frame as a png file
+    :param animation_file: name of the animation, a .gif (or .mp4, with the imageio-ffmpeg plugin)
+    :param fps: frames per second of the animation
+    :return: path to the animation
+
+    The animation (and any saved frames) is written to <directory>/Output/<name>/SimFrames/. Frames are composed,
+    rendered in memory, and encoded as separate steps (see `cascade.tools.animate`).
 
     Animation Frames of Barrier and Dune Elevation (#4 in Barrier3D_Functions, modified here for CASCADE)
 
@@ -638,331 +558,41 @@ def plot_ElevAnimation_CASCADE(
     huge jump in the back-barrier position in Barrier3D. OTHERWISE, it is meaningless to the dynamics Barrier3D.
 
     """
-    barrier3d = cascade.barrier3d
-
-    # set up the domain; here we just use the first grid, but that could break in future runs
-    BarrierLength = barrier3d[0].BarrierLength
-    if np.any(beach_management_ny):
-        indices = [i for i in range(ny) if beach_management_ny[i] == 1]
-        iB3D = indices[0]
-        MaxBeachWidth = (
-                np.max(cascade.nourishments[iB3D].beach_width[0: TMAX_MGMT[iB3D]]) / 10
-        )  # dam
-    else:
-        MaxBeachWidth = cascade._initial_beach_width[0]
-    OriginY = int(barrier3d[0].x_s_TS[0])
-    AniDomainWidth = int(
-        np.amax(barrier3d[0].InteriorWidth_AvgTS)
-        + MaxBeachWidth
-        + np.abs(barrier3d[0]._ShorelineChange)
-        + OriginY
-        + 35
+    from .animate import (
+        animation_extent,
+        compose_frames,
+        render_frames,
+        write_animation,
     )
 
-    os.chdir(directory)
-    newpath = "Output/" + name + "/SimFrames/"
+    newpath = os.path.join(directory, "Output", name, "SimFrames")
     if not os.path.exists(newpath):
         os.makedirs(newpath)
-    os.chdir(newpath)
-
-    maxMGMT = np.max(TMAX_MGMT)
-
-    if np.any(beach_management_ny) or np.any(roadway_management_ny):
-        for t in range(maxMGMT + 1):
-
-            # start with plotting t=0, then plot post-storm dune, interior, shoreface, etc. before management, treating this
-            # as t=0.5 (i.e., this is really the final configuration from storms at t=1,2,3,4,5,... but before human
-            # modifications); for the default dune inputs, we should be able to see natural dune growth at
-            # t=0.5 before rebuild and storms (i.e., t=0.5 and t=1 should not be the same)
-            if 0 < t <= TMAX_SIM:
-
-                # post-storm variables in the BeachDuneManager are: interior, dune height, x_s, s_sf, beach width
-                AnimateDomain = np.ones([AniDomainWidth + 1, BarrierLength * ny]) * -1
-
-                for iB3D in range(ny):
-
-                    # the nourishment scenario
-                    if beach_management_ny[iB3D] and (t < TMAX_MGMT[iB3D] + 1):
-                        actual_shoreline_post_storm = np.hstack(
-                            [
-                                0,
-                                cascade.nourishments[iB3D]._post_storm_x_s[
-                                1: TMAX_MGMT[iB3D] + 1
-                                ],
-                            ]
-                        )
-                        beach_width = (
-                                cascade.nourishments[iB3D]._post_storm_beach_width[t] / 10
-                        )
-                        Domain = cascade.nourishments[iB3D]._post_storm_interior[t] * 10
-                        Dunes = (
-                                        cascade.nourishments[iB3D]._post_storm_dunes[t]
-                                        + barrier3d[iB3D].BermEl
-                                ) * 10
-
-                    elif roadway_management_ny[iB3D] and (t < TMAX_MGMT[iB3D] + 1):
-                        # the roadways scenario
-                        actual_shoreline_post_storm = barrier3d[iB3D].x_s_TS[
-                                                      0: TMAX_MGMT[iB3D] + 1
-                                                      ]
-                        beach_width = cascade._initial_beach_width[iB3D] / 10
-                        Domain = cascade.roadways[iB3D]._post_storm_interior[t] * 10
-                        Dunes = (
-                                        cascade.roadways[iB3D]._post_storm_dunes[t]
-                                        + barrier3d[iB3D].BermEl
-                                ) * 10
-
-                    else:
-                        # the natural scenario
-                        actual_shoreline_post_storm = barrier3d[iB3D].x_s_TS[0:TMAX_SIM]
-                        beach_width = cascade._initial_beach_width[iB3D] / 10
-                        Domain = barrier3d[iB3D].DomainTS[t] * 10
-                        Dunes = (
-                                        barrier3d[iB3D].DuneDomain[t, :, :] + barrier3d[iB3D].BermEl
-                                ) * 10
-
-                    # Build beach elevation domain, we only show beach width decreasing in increments of 10 m and we don't
-                    # illustrate a berm, just a sloping beach up to the elevation of the berm
-                    cellular_dune_toe_post_storm = np.floor(
-                        actual_shoreline_post_storm[t] + beach_width
-                    )
-                    cellular_shoreline_post_storm = np.floor(
-                        actual_shoreline_post_storm[t]
-                    )
-                    cellular_beach_width = int(
-                        cellular_dune_toe_post_storm - cellular_shoreline_post_storm
-                    )  # not actual bw
-
-                    BeachDomain = np.zeros(
-                        [
-                            cellular_beach_width,
-                            BarrierLength,
-                        ]
-                    )
-                    if cellular_beach_width == 0:
-                        pass
-                    else:
-                        add = (barrier3d[iB3D].BermEl - barrier3d[iB3D].SL) / (
-                                cellular_beach_width + 1
-                        )
-                        for i in range(0, cellular_beach_width):
-                            BeachDomain[i, :] = (barrier3d[iB3D].SL + add) * (i + 1)
-
-                    # Make animation frame domain
-                    Dunes = np.rot90(Dunes)
-                    Dunes = np.flipud(Dunes)
-                    Beach = BeachDomain * 10
-                    Domain = np.vstack([Beach, Dunes, Domain])
-                    Domain[Domain < 0] = -1
-                    widthTS = len(Domain)
-                    OriginTstart = int(cellular_shoreline_post_storm)
-                    OriginTstop = OriginTstart + widthTS
-                    xOrigin = iB3D * BarrierLength
-                    AnimateDomain[
-                    OriginTstart:OriginTstop, xOrigin: xOrigin + BarrierLength
-                    ] = Domain
-
-                # Plot and save
-                if fig_size is not None:
-                    elevFig1 = plt.figure(figsize=fig_size)
-                else:
-                    elevFig1 = plt.figure(figsize=(7, 7))
-                ax = elevFig1.add_subplot(111)
-                cax = ax.pcolormesh(
-                    AnimateDomain,
-                    cmap="terrain",
-                    vmin=-1.1,
-                    vmax=z_lim,
-                    # edgecolors="w",  # for debugging
-                    # linewidth=0.01,
-                )
-                cbar = elevFig1.colorbar(cax)
-                cbar.set_label("elevation (m MHW)", rotation=270)
-                plt.xlabel("alongshore distance (dam)")
-                plt.ylabel("cross-shore distance (dam)")
-                timestr = (
-                        "Time = " + str(t - 0.5) + " yrs"
-                )  # we are letting the post-storm output represent 0.5 years
-                if km_on:
-                    locs, _ = plt.yticks()
-                    plt.yticks(locs, locs / 100)
-                    locs, _ = plt.xticks()
-                    plt.xticks(locs[0:-1], locs[0:-1] / 100)
-                    plt.xlabel("alongshore distance (km)")
-                    plt.ylabel("cross-shore distance (km)")
-                    ax.yaxis.set_minor_locator(AutoMinorLocator())
-                if y_lim is not None:
-                    plt.ylim(y_lim)
-                    plt.text(3, y_lim[0] + 3, timestr, color="w")
-                else:
-                    plt.ylim(bottom=OriginY - 35)
-                    plt.text(1, OriginY - 33, timestr)
-                plt.tight_layout()
-                plt.rcParams.update({"font.size": 11})
-                # elevFig1.tight_layout()
-                if fig_eps:
-                    name = "elev_" + str(t - 1) + "pt5.eps"
-                    elevFig1.savefig(name, format="eps")
-                else:
-                    name = "elev_" + str(t - 1) + "pt5"
-                    elevFig1.savefig(name)  # dpi=200
-                plt.close(elevFig1)
-
-    for t in range(TMAX_SIM):
-
-        # ok, now the annual time step, which incorporates human modifications to the shoreface, beach, dune, & interior
-        AnimateDomain = np.ones([AniDomainWidth + 1, BarrierLength * ny]) * -1
-
-        for iB3D in range(ny):
-
-            actual_shoreline_post_humans = barrier3d[iB3D].x_s_TS[0: TMAX_SIM + 1]
-
-            if beach_management_ny[iB3D]:
-                beach_width = cascade.nourishments[iB3D].beach_width[t] / 10
-            else:
-                # both roadways and natural scenario
-                beach_width = cascade._initial_beach_width[iB3D] / 10
-
-            if beach_management_ny[iB3D] and np.isnan(beach_width):
-                beach_width = (
-                        cascade.nourishments[iB3D].beach_width[t - 1] / 10
-                )  # this can happen if the barrier height drowns
-
-            cellular_dune_toe_post_humans = np.floor(
-                actual_shoreline_post_humans[t] + beach_width
-            )
-
-            cellular_shoreline_post_humans = np.floor(actual_shoreline_post_humans[t])
-            cellular_beach_width = int(
-                cellular_dune_toe_post_humans - cellular_shoreline_post_humans
-            )  # not actual bw
-
-            if t == maxMGMT + 1:
-                cellular_beach_width_final = (
-                    cellular_beach_width  # save this for plotting moving forward
-                )
-            if t > maxMGMT + 1:
-                cellular_beach_width = cellular_beach_width_final
-
-            BeachDomain = np.zeros(
-                [
-                    cellular_beach_width,
-                    BarrierLength,
-                ]
-            )
-
-            if cellular_beach_width == 0:
-                pass
-            else:
-                add = (barrier3d[iB3D].BermEl - barrier3d[iB3D].SL) / (
-                        cellular_beach_width + 1
-                )
-                for i in range(0, cellular_beach_width):
-                    BeachDomain[i, :] = (barrier3d[iB3D].SL + add) * (i + 1)
-
-            # Make animation frame domain
-            Domain = barrier3d[iB3D].DomainTS[t] * 10
-            Dunes = (barrier3d[iB3D].DuneDomain[t, :, :] + barrier3d[iB3D].BermEl) * 10
-            Dunes = np.rot90(Dunes)
-            Dunes = np.flipud(Dunes)
-            Beach = BeachDomain * 10
-            Domain = np.vstack([Beach, Dunes, Domain])
-            Domain[Domain < 0] = -1
-            widthTS = len(Domain)
-            OriginTstart = int(cellular_shoreline_post_humans)
-            OriginTstop = OriginTstart + widthTS
-            xOrigin = iB3D * BarrierLength
-            AnimateDomain[
-            OriginTstart:OriginTstop, xOrigin: xOrigin + BarrierLength
-            ] = Domain
-
-        # Plot and save
-        if fig_size is not None:
-            elevFig2 = plt.figure(figsize=fig_size)
-        else:
-            elevFig2 = plt.figure(figsize=(7, 7))
-        ax = elevFig2.add_subplot(111)
-        cax = ax.pcolormesh(
-            AnimateDomain,
-            cmap="terrain",
-            vmin=-1.1,
-            vmax=z_lim,
-            # edgecolors="w",  # for debugging
-            # linewidth=0.01,
-        )
-        cbar = elevFig2.colorbar(cax)
-        cbar.set_label("elevation (m MHW)", rotation=270)
-        plt.xlabel("alongshore distance (dam)")
-        plt.ylabel("cross-shore distance (dam)")
-        timestr = "Time = " + str(t) + " yrs"
-        if km_on:
-            locs, _ = plt.yticks()
-            plt.yticks(locs, locs / 100)
-            locs, _ = plt.xticks()
-            plt.xticks(locs[0:-1], locs[0:-1] / 100)
-            plt.xlabel("alongshore distance (km)")
-            plt.ylabel("cross-shore distance (km)")
-            ax.yaxis.set_minor_locator(AutoMinorLocator())
-        if y_lim is not None:
-            plt.ylim(y_lim)
-            plt.text(3, y_lim[0] + 3, timestr, color="w")
-        else:
-            plt.ylim(bottom=OriginY - 35)
-            plt.text(1, OriginY - 33, timestr)
-        plt.tight_layout()
-        plt.rcParams.update({"font.size": 11})
-        # elevFig2.tight_layout()
-        if fig_eps:
-            name = "elev_" + str(t) + ".eps"
-            elevFig2.savefig(name, format="eps")
-        else:
-            name = "elev_" + str(t)
-            elevFig2.savefig(name)  # dpi=200
-        plt.close(elevFig2)
 
-    frames = []
+    _, OriginY = animation_extent(cascade, TMAX_MGMT, ny, beach_management_ny)
+    frames = compose_frames(
+        cascade,
+        TMAX_MGMT,
+        TMAX_SIM,
+        ny=ny,
+        beach_management_ny=beach_management_ny,
+        roadway_management_ny=roadway_management_ny,
+    )
 
-    for filenum in range(TMAX_SIM):
-        if fig_eps:
-            filename = "elev_" + str(filenum) + ".eps"
-        else:
-            filename = "elev_" + str(filenum) + ".png"
-        frames.append(imageio.imread(filename))
-
-        # management simulations
-        if np.any(beach_management_ny) or np.any(roadway_management_ny):
-            tmax_management = np.array(TMAX_MGMT)
-            max_pt5_year = np.max(tmax_management[tmax_management < TMAX_SIM - 1])
-            if filenum < max_pt5_year:
-                if fig_eps:
-                    filename = "elev_" + str(filenum) + "pt5" ".eps"
-                else:
-                    filename = "elev_" + str(filenum) + "pt5" ".png"
-                frames.append(imageio.imread(filename))
-
-    imageio.mimsave("elev.gif", frames, "GIF-FI")
+    render_options = dict(
+        y_lim=y_lim, z_lim=z_lim, fig_size=fig_size, km_on=km_on, origin_y=OriginY
+    )
+    if fig_eps or save_frames:
+        render_options.update(
+            frame_directory=newpath, frame_format="eps" if fig_eps else "png"
+        )
+    images = render_frames(frames, n_jobs=n_jobs, **render_options)
+
+    animation = write_animation(images, os.path.join(newpath, animation_file), fps=fps)
     print()
     print("[ * GIF successfully generated * ]")
 
-def combine_post_storm_human_time_series(
-    tmax_sim, post_storm_statistic, human_modified_statistic
-):
-    """
-    :param tmax_sim: max simulation time
-    :param post_storm_statistic: whatever post-storm (0.5 yr time step) statistic you want to combine
-    :param human_modified_statistic: whatever post-human response (1 yr time step) statistic you want to combine
-    :return: the combined [0, 0.5, 1, 1.5 ...] yr statistics
-
-    Combines the immediate post storm, and human recovery effort, time series into a single array
-
-    """
-    time = np.arange(0, tmax_sim - 0.5, 0.5)
-    combined_statistic = [None] * (len(time))
-    combined_statistic[::2] = human_modified_statistic
-    combined_statistic[1::2] = post_storm_statistic[1:]
-    combined_statistic = np.array(combined_statistic)
-
-    return combined_statistic
+    return animation
 
 def plot_nonlinear_stats_RoadwayManager(
     CASCADE_b3d,
@@ -1000,117 +630,31 @@ def plot_nonlinear_stats_RoadwayManager(
 
     # if the post-storm variables are not supplied (essentially a 0.5 year time step), then only the human-modified
     # statistics are plotted (the 1 year time step)
+    statistics = human_dynamics_statistics(
+        CASCADE_b3d[ib3d],
+        tmax_roadways,
+        tmax_sim,
+        post_storm_dunes=post_storm_dunes,
+        post_storm_ave_interior_height=post_storm_ave_interior_height,
+    )
+    BarrierWidth = statistics["BarrierWidth"]  # m
+    DuneCrestMean = statistics["DuneCrestMean"]  # m MHW
+    DuneCrestMin = statistics["DuneCrestMin"]
+    DuneCrestMax = statistics["DuneCrestMax"]
+    BarrierHeight = statistics["BarrierHeight"]  # m
+    bw_rate = statistics["bw_rate"]  # m/yr
+    bh_rate = statistics["bh_rate"]
+    shoreline_position = statistics["shoreline_position"]  # m
+    sc_rate = statistics["sc_rate"]  # m/yr
+    overwash = statistics["overwash"]  # m^3/m
+    shoreface_slope = statistics["shoreface_slope"]
+    equilibrium_slope = CASCADE_b3d[ib3d]._s_sf_eq
 
-    # variables that need to be combined and plotted: dune height, barrier height/interior
-    empty_nans = np.empty(tmax_sim - tmax_roadways)
-    empty_nans[:] = np.nan
-
-    # dune height (using both dune domain columns) --------------------------------------------------
-
-    # Maximum height of each row in DuneDomain
-    DuneDomainCrest = CASCADE_b3d[ib3d].DuneDomain[0:tmax_sim, :, :].max(axis=2)
-    DuneRestart = CASCADE_b3d[ib3d].DuneRestart
-    DuneDomainCrest[DuneDomainCrest < DuneRestart] = DuneRestart
-    DuneCrestMean = (
-        np.mean(DuneDomainCrest, axis=1) + CASCADE_b3d[ib3d].BermEl
-    ) * 10  # m MHW
-    DuneCrestMin = (
-        np.min(DuneDomainCrest, axis=1) + CASCADE_b3d[ib3d].BermEl
-    ) * 10  # m MHW
-    DuneCrestMax = (
-        np.max(DuneDomainCrest, axis=1) + CASCADE_b3d[ib3d].BermEl
-    ) * 10  # m MHW
-
-    # these are the dune dynamics saved prior to human modifications (essentially a 0.5 year time step)
     if post_storm_dunes is not None:
-
-        post_storm_DuneCrestMin = [None]
-        post_storm_DuneCrestMax = [None]
-
-        # same calculation as Hd_AverageTS, but here average post-storm dune-height for each time step
-        for t in range(1, tmax_roadways):
-            if (
-                np.size(post_storm_dunes[t], 1) == 1
-            ):  # if the dune domain is only one row, don't take the max
-                DuneDomainCrest = post_storm_dunes[t]
-            else:
-                DuneDomainCrest = post_storm_dunes[t].max(
-                    axis=1
-                )  # Maximum height of each row in DuneDomain
-            DuneDomainCrest[
-                DuneDomainCrest < CASCADE_b3d[ib3d].DuneRestart
-            ] = CASCADE_b3d[ib3d].DuneRestart
-            post_storm_DuneCrestMax.append(
-                (np.max(DuneDomainCrest) + CASCADE_b3d[ib3d].BermEl) * 10
-            )  # relative to MHW
-            post_storm_DuneCrestMin.append(
-                (np.min(DuneDomainCrest) + CASCADE_b3d[ib3d].BermEl) * 10
-            )  # relative to MHW
-
-        # post_DuneCrestMean = np.concatenate((post_DuneCrestMean, empty_nans))
-        post_storm_DuneCrestMax = np.concatenate((post_storm_DuneCrestMax, empty_nans))
-        post_storm_DuneCrestMin = np.concatenate((post_storm_DuneCrestMin, empty_nans))
-
-        combined_DuneCrestMin = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_DuneCrestMin, DuneCrestMin
-        )
-        combined_DuneCrestMax = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_DuneCrestMax, DuneCrestMax
-        )
-
-    # barrier width --------------------------------------------------
-    # note that here, and everywhere in the drowning paper, barrier width refers to the average interior width, and
-    # not x_b - x_s, which incorporates changes in beach width and the dune line in the nourishment module
-    BarrierWidth = (
-        np.array(CASCADE_b3d[ib3d].InteriorWidth_AvgTS[0:tmax_sim])
-    ) * 10  # m
-
-    # change in barrier width
-    bwts = [(x - BarrierWidth[0]) for x in BarrierWidth[0:tmax_sim]]
-    rate = [0]
-    for k in range(1, len(bwts)):
-        rate.append(bwts[k] - bwts[k - 1])
-    bw_rate = rate  # note, np.diff doesn't start with zero rate of change, so we do this calc  # m/yr
-
-    # barrier height --------------------------------------------------
-    BarrierHeight = (np.array(CASCADE_b3d[ib3d].h_b_TS[0:tmax_sim])) * 10  # m
-
-    # before human modifications
+        combined_DuneCrestMin = statistics["combined_DuneCrestMin"]
+        combined_DuneCrestMax = statistics["combined_DuneCrestMax"]
     if post_storm_ave_interior_height is not None:
-
-        post_storm_ave_interior_height[0] = np.nan
-        post_storm_BarrierHeight = (
-            np.array(post_storm_ave_interior_height[0:tmax_roadways])
-        ) * 10  # m
-
-        post_storm_BarrierHeight = np.concatenate(
-            (post_storm_BarrierHeight, empty_nans)
-        )
-        combined_BarrierHeight = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_BarrierHeight, BarrierHeight
-        )  # m
-
-    # change in barrier height
-    bhts = [(x - BarrierHeight[0]) for x in BarrierHeight[0:tmax_sim]]
-    rate = [0]
-    for k in range(1, len(bhts)):
-        rate.append(bhts[k] - bhts[k - 1])
-    bh_rate = rate  # note, np.diff doesn't start with zero rate of change, so we do this calc  # m/yr
-
-    # shoreline position and change rate --------------------------------------------------
-    shoreline_position = np.array(CASCADE_b3d[ib3d].x_s_TS[0:tmax_sim]) * 10  # m
-    scts = [(x - shoreline_position[0]) for x in shoreline_position]
-    rate = [0]
-    for k in range(1, len(scts)):
-        rate.append(scts[k] - scts[k - 1])
-    sc_rate = rate  # m/yr
-
-    # overwash flux --------------------------------------------------
-    overwash = np.array(CASCADE_b3d[ib3d].QowTS[0:tmax_sim])  # m^3/m
-
-    # shoreface slope -----------------------------------------
-    shoreface_slope = CASCADE_b3d[ib3d].s_sf_TS[0:tmax_sim]
-    equilibrium_slope = CASCADE_b3d[ib3d]._s_sf_eq
+        combined_BarrierHeight = statistics["combined_BarrierHeight"]  # m
 
     # individual time series ------------------------------------
     plt.figure(figsize=(10, 8))
@@ -1272,181 +816,42 @@ def plot_nonlinear_stats_BeachDuneManager(
 
     # if the post-storm variables are not supplied (essentially a 0.5 year time step), then only the human-modified
     # statistics are plotted (the 1-year time step)
-
-    # variables that need to be combined and plotted: dune height, barrier width, barrier height, x_s, s_sf,
-    # beach width, Qow
-    empty_nans = np.empty(tmax_sim - tmax_management)
-    empty_nans[:] = np.nan
-
-    # dune height (using both dune domain columns) --------------------------------------------------
-
-    # Maximum height of each row in DuneDomain
-    DuneDomainCrest = CASCADE_b3d[ib3d].DuneDomain[0:tmax_sim, :, :].max(axis=2)
-    DuneRestart = CASCADE_b3d[ib3d].DuneRestart
-    DuneDomainCrest[DuneDomainCrest < DuneRestart] = DuneRestart
-    DuneCrestMean = (
-        np.mean(DuneDomainCrest, axis=1) + CASCADE_b3d[ib3d].BermEl
-    ) * 10  # m MHW
-    DuneCrestMin = (
-        np.min(DuneDomainCrest, axis=1) + CASCADE_b3d[ib3d].BermEl
-    ) * 10  # m MHW
-    DuneCrestMax = (
-        np.max(DuneDomainCrest, axis=1) + CASCADE_b3d[ib3d].BermEl
-    ) * 10  # m MHW
-
-    # these are the dune dynamics saved prior to human modifications (essentially a 0.5 year time step)
-    if post_storm_dunes is not None:
-
-        post_storm_DuneCrestMin = [None]
-        post_storm_DuneCrestMax = [None]
-
-        # same calculation as Hd_AverageTS
-        for t in range(1, tmax_management):
-            if (
-                np.size(post_storm_dunes[t], 1) == 1
-            ):  # if the dune domain is only one row, don't take the max
-                DuneDomainCrest = post_storm_dunes[t]
-            else:
-                DuneDomainCrest = post_storm_dunes[t].max(
-                    axis=1
-                )  # Maximum height of each row in DuneDomain
-            DuneDomainCrest[
-                DuneDomainCrest < CASCADE_b3d[ib3d].DuneRestart
-            ] = CASCADE_b3d[ib3d].DuneRestart
-            post_storm_DuneCrestMax.append(
-                (np.max(DuneDomainCrest) + CASCADE_b3d[ib3d].BermEl) * 10
-            )  # relative to MHW
-            post_storm_DuneCrestMin.append(
-                (np.min(DuneDomainCrest) + CASCADE_b3d[ib3d].BermEl) * 10
-            )  # relative to MHW
-
-        # now, append NaNs to the rest of the 0.5 year time step arrays
-        post_storm_DuneCrestMax = np.concatenate((post_storm_DuneCrestMax, empty_nans))
-        post_storm_DuneCrestMin = np.concatenate((post_storm_DuneCrestMin, empty_nans))
-
-        combined_DuneCrestMin = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_DuneCrestMin, DuneCrestMin
-        )
-        combined_DuneCrestMax = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_DuneCrestMax, DuneCrestMax
-        )
-
-    # barrier width --------------------------------------------------
-    # note that here, and everywhere in the drowning paper, barrier width refers to the average interior width, and
-    # not x_b - x_s, which incorporates changes in beach width and the dune line
-    BarrierWidth = (
-        np.array(CASCADE_b3d[ib3d].InteriorWidth_AvgTS[0:tmax_sim])
-    ) * 10  # m
-
-    # barrier width prior to human modifications (essentially a 0.5 year time step)
-    if post_storm_ave_interior_width is not None:
-
-        post_storm_ave_interior_width[0] = np.nan
-        post_storm_BarrierWidth = (
-            np.array(post_storm_ave_interior_width[0:tmax_management])
-        ) * 10
-
-        post_storm_BarrierWidth = np.concatenate((post_storm_BarrierWidth, empty_nans))
-        combined_BarrierWidth = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_BarrierWidth, BarrierWidth
-        )  # m
-
-    # change in barrier width --------------------------------------------------
-    bwts = [(x - BarrierWidth[0]) for x in BarrierWidth[0:tmax_sim]]
-    rate = [0]
-    for k in range(1, len(bwts)):
-        rate.append(bwts[k] - bwts[k - 1])
-    bw_rate = rate  # note, np.diff doesn't start with zero rate of change, so we do this calc  # m/yr
-
-    # barrier height --------------------------------------------------
-    BarrierHeight = (np.array(CASCADE_b3d[ib3d].h_b_TS[0:tmax_sim])) * 10  # m
-
-    # before human modifications
-    if post_storm_ave_interior_height is not None:
-
-        post_storm_ave_interior_height[0] = np.nan
-        post_storm_BarrierHeight = (
-            np.array(post_storm_ave_interior_height[0:tmax_management])
-        ) * 10  # m
-
-        post_storm_BarrierHeight = np.concatenate(
-            (post_storm_BarrierHeight, empty_nans)
-        )
-        combined_BarrierHeight = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_BarrierHeight, BarrierHeight
-        )  # m
-
-    # change in barrier height --------------------------------------------------
-    bhts = [(x - BarrierHeight[0]) for x in BarrierHeight[0:tmax_sim]]
-    rate = [0]
-    for k in range(1, len(bhts)):
-        rate.append(bhts[k] - bhts[k - 1])
-    bh_rate = rate  # note, np.diff doesn't start with zero rate of change, so we do this calc  # m/yr
-
-    # shoreline position and change rate --------------------------------------------------
-    shoreline_position = np.array(CASCADE_b3d[ib3d].x_s_TS[0:tmax_sim]) * 10  # m
-    scts = [(x - shoreline_position[0]) for x in shoreline_position]
-    rate = [0]
-    for k in range(1, len(scts)):
-        rate.append(scts[k] - scts[k - 1])
-    sc_rate = rate  # m/yr
-
-    # before human modifications
-    if post_storm_x_s is not None:
-
-        post_storm_shoreline_position = np.array(post_storm_x_s[0:tmax_management])
-        post_storm_shoreline_position[0] = np.nan
-        post_storm_shoreline_position = post_storm_shoreline_position * 10  # m
-        post_storm_shoreline_position = np.concatenate(
-            (post_storm_shoreline_position, empty_nans)
-        )
-        combined_shoreline_position = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_shoreline_position, shoreline_position
-        )  # m
-
-    # overwash flux --------------------------------------------------
-    net_overwash = np.array(CASCADE_b3d[ib3d].QowTS[0:tmax_sim])  # m^3/m
-
-    # before human modifications
-    if post_storm_Qow is not None:
-
-        post_storm_Qow[0] = np.nan
-        post_storm_overwash = np.array(
-            post_storm_Qow[0:tmax_management]
-        )  # this is the total overwash before removal
-        post_storm_overwash = np.concatenate((post_storm_overwash, empty_nans))
-        combined_overwash = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_overwash, net_overwash
-        )
-
-    # shoreface slope -----------------------------------------
-    shoreface_slope = CASCADE_b3d[ib3d].s_sf_TS[0:tmax_sim]
+    statistics = human_dynamics_statistics(
+        CASCADE_b3d[ib3d],
+        tmax_management,
+        tmax_sim,
+        beach_width=nourishments[ib3d].beach_width,
+        post_storm_dunes=post_storm_dunes,
+        post_storm_x_s=post_storm_x_s,
+        post_storm_s_sf=post_storm_s_sf,
+        post_storm_ave_interior_width=post_storm_ave_interior_width,
+        post_storm_ave_interior_height=post_storm_ave_interior_height,
+        post_storm_beach_width=post_storm_beach_width,
+        post_storm_Qow=post_storm_Qow,
+    )
+    BarrierWidth = statistics["BarrierWidth"]  # m
+    DuneCrestMean = statistics["DuneCrestMean"]  # m MHW
+    DuneCrestMin = statistics["DuneCrestMin"]
+    DuneCrestMax = statistics["DuneCrestMax"]
+    BarrierHeight = statistics["BarrierHeight"]  # m
+    bw_rate = statistics["bw_rate"]  # m/yr
+    bh_rate = statistics["bh_rate"]
+    shoreline_position = statistics["shoreline_position"]  # m
+    sc_rate = statistics["sc_rate"]  # m/yr
+    net_overwash = statistics["overwash"]  # m^3/m
+    overwash = net_overwash
+    shoreface_slope = statistics["shoreface_slope"]
     equilibrium_slope = CASCADE_b3d[ib3d]._s_sf_eq
+    beach_width = statistics["beach_width"]  # m
 
-    # before human modifications
-    if post_storm_s_sf is not None:
-
-        post_storm_s_sf[0] = np.nan
-        post_storm_shoreface_slope = post_storm_s_sf[0:tmax_management]
-        post_storm_shoreface_slope = np.concatenate(
-            (post_storm_shoreface_slope, empty_nans)
-        )
-        combined_shoreface_slope = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_shoreface_slope, shoreface_slope
-        )
-
-    # beach width -----------------------------------------
-    beach_width = nourishments[ib3d].beach_width[0:tmax_sim]  # m
-
-    # before human modifications
-    if post_storm_beach_width is not None:
-
-        post_storm_beach_width[0] = np.nan
-        post_storm_beach_width = post_storm_beach_width[0:tmax_management]
-        post_storm_beach_width = np.concatenate((post_storm_beach_width, empty_nans))
-        combined_beach_width = combine_post_storm_human_time_series(
-            tmax_sim, post_storm_beach_width, beach_width
-        )
+    combined_DuneCrestMin = statistics.get("combined_DuneCrestMin")
+    combined_DuneCrestMax = statistics.get("combined_DuneCrestMax")
+    combined_BarrierWidth = statistics.get("combined_BarrierWidth")  # m
+    combined_BarrierHeight = statistics.get("combined_BarrierHeight")  # m
+    combined_shoreline_position = statistics.get("combined_shoreline_position")  # m
+    combined_shoreface_slope = statistics.get("combined_shoreface_slope")
+    combined_beach_width = statistics.get("combined_beach_width")
+    combined_overwash = statistics.get("combined_overwash")
 
     # individual time series ------------------------------------
     plt.figure(figsize=(10, 8))
@@ -1540,7 +945,7 @@ def plot_nonlinear_stats_BeachDuneManager(
         plt.plot(full_time[mask], combined_dune_toe[mask], "--m")
         plt.legend(["shoreline", "dune toe"])
         # plt.legend(["includes post-storm", "mgmt only"])
-    dune_toe = np.array(shoreline_position) + np.array(beach_width)
+    dune_toe = statistics["dune_toe"]
     plt.plot(shoreline_position, "k")
     plt.plot(dune_toe, "--k")
     plt.ylabel("Cross-shore position (m)")
@@ -1559,7 +964,7 @@ def plot_nonlinear_stats_BeachDuneManager(
 
     # barrier height
     plt.subplot(2, 2, 1)
-    if post_storm_BarrierHeight is not None:
+    if post_storm_ave_interior_height is not None:
         mask = np.isfinite(combined_BarrierHeight)
         plt.plot(full_time[mask], combined_BarrierHeight[mask], "m")
         # plt.legend(["includes post-storm", "mgmt only"])
@@ -1569,7 +974,7 @@ def plot_nonlinear_stats_BeachDuneManager(
 
     # barrier width
     plt.subplot(2, 2, 2)
-    if post_storm_BarrierWidth is not None:
+    if post_storm_ave_interior_width is not None:
         mask = np.isfinite(combined_BarrierWidth)
         plt.plot(full_time[mask], combined_BarrierWidth[mask], "m")
         # plt.legend(["includes post-storm", "mgmt only"])
@@ -1592,10 +997,10 @@ def plot_nonlinear_stats_BeachDuneManager(
         DuneCrestMin = combined_DuneCrestMin
         DuneCrestMax = combined_DuneCrestMax
 
-    if post_storm_BarrierHeight is not None:
+    if post_storm_ave_interior_height is not None:
         BarrierHeight = combined_BarrierHeight
 
-    if post_storm_BarrierWidth is not None:
+    if post_storm_ave_interior_width is not None:
         BarrierWidth = combined_BarrierWidth
 
     # if post_storm_x_s is not None:
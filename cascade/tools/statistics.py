@@ -0,0 +1,403 @@
+"""Statistics of CASCADE simulations, without plotting
+
+The functions of this module only need numpy (and scipy), so they can be used to analyze large numbers of simulations
+(e.g., the members of an ensemble) without importing matplotlib; the plotting functions of `cascade.tools.plotters`
+use them for their calculations.
+
+"""
+import numpy as np
+
+PERIODICITY_DTYPE = np.dtype(
+    [
+        ("Periodicity", np.float64),  # period of punctuated retreat [yrs]
+        ("AvgFastDur", np.float64),  # average duration of fast periods [yrs]
+        ("AvgSlowDur", np.float64),  # average duration of slow periods [yrs]
+        ("Punc", np.int64),  # 1 for punctuated retreat
+    ]
+)
+
+
+def stack_time_series(series):
+    """Stack time series of different lengths (e.g., of the members of an ensemble) into a 2-D array (series x time),
+    padded with NaN at the end"""
+    lengths = [len(values) for values in series]
+    stacked = np.full((len(series), max(lengths, default=0)), np.nan)
+    for i, values in enumerate(series):
+        stacked[i, : lengths[i]] = values
+    return stacked
+
+
+def _valid_length(series):
+    """Number of leading finite values of each series (later values are padding, e.g., after a barrier drowned)"""
+    finite = np.isfinite(series)
+    return np.where(finite.all(axis=1), series.shape[1], np.argmin(finite, axis=1))
+
+
+def shoreline_change_rate(x_s_TS, win=31, poly=3):
+    """Smoothed shoreline change rate (first derivative of a Savitzky-Golay filter) of many shoreline time series
+
+    :param x_s_TS: shoreline positions (series x time; NaN-padded at the end for shorter series) [dam]
+    :param win: window length of the filter [yrs]
+    :param poly: order of the filter polynomial
+
+    :return: shoreline change (series x time) [m], smoothed change rate (series x time; NaN beyond the end of each
+        series, and for series shorter than `win`) [m/yr]
+    """
+    from scipy import signal
+
+    x_s_TS = np.atleast_2d(np.asarray(x_s_TS, dtype=np.float64))
+    scts = (x_s_TS - x_s_TS[:, :1]) * 10
+    der1 = np.full(scts.shape, np.nan)
+
+    # filter the series of each length at once
+    lengths = _valid_length(x_s_TS)
+    for length in np.unique(lengths):
+        if length < win:
+            continue
+        rows = lengths == length
+        der1[rows, :length] = signal.savgol_filter(
+            scts[rows, :length], win, poly, deriv=1, axis=1
+        )
+
+    return scts, der1
+
+
+def _slow_periods(der1, window1, window2, thresh1):
+    """Runs of low shoreline change rate in all series: runs (of rates below `thresh1`) separated by gaps of at most
+    `window1` years are joined, and runs longer than `window2` years are kept
+
+    :return: series, first year, and last year of each run (ordered by series and year)
+    """
+    with np.errstate(invalid="ignore"):
+        series, year = np.nonzero(der1 < thresh1)
+
+    new_run = np.ones(len(year), dtype=bool)
+    new_run[1:] = (np.diff(series) != 0) | (np.diff(year) > window1)
+    start = np.flatnonzero(new_run)
+    stop = np.append(start[1:], len(year))[: len(start)] - 1
+
+    long = (year[stop] - year[start]) > window2
+    return series[start][long], year[start][long], year[stop][long]
+
+
+def _summarize(HitDown, HitUp):
+    """Periodicity, AvgFastDur, AvgSlowDur, and Punc from the years of slow-downs and speed-ups of a series"""
+    Jumps = len(HitDown)
+    Slows = len(HitUp)
+    HitDown = np.asarray(HitDown, dtype=np.int64)
+    HitUp = np.asarray(HitUp, dtype=np.int64)
+    SlowDur = np.empty(0, dtype=np.int64)
+    FastDur = np.empty(0, dtype=np.int64)
+
+    if Jumps > 0 and Slows > 0:
+        DownFirst = HitDown[0] < HitUp[0]
+    elif Jumps == 0 and Slows > 1:
+        DownFirst = True
+    else:
+        DownFirst = False
+
+    if Jumps >= 2 or Slows >= 2:
+        if Jumps >= 2 and Slows >= 2:
+            Periodicity = (np.mean(np.diff(HitDown)) + np.mean(np.diff(HitUp))) / 2
+        elif Jumps >= Slows:
+            Periodicity = np.mean(np.diff(HitDown))
+        else:
+            Periodicity = np.mean(np.diff(HitUp))
+        if DownFirst:
+            SlowDur = HitUp[:Slows] - HitDown[:Slows]
+            FastDur = HitDown[1:Jumps] - HitUp[: Jumps - 1]
+        else:
+            SlowDur = HitUp[1:Slows] - HitDown[: Slows - 1]
+            FastDur = HitDown[:Jumps] - HitUp[:Jumps]
+    else:
+        Periodicity = 0
+        if Jumps == 1 and Slows == 1:
+            if DownFirst:
+                SlowDur = HitUp[:1] - HitDown[:1]
+            else:
+                FastDur = HitDown[:1] - HitUp[:1]
+
+    AvgFastDur = np.mean(FastDur) if len(FastDur) else 0
+    AvgSlowDur = np.mean(SlowDur) if len(SlowDur) else 0
+    Punc = 1 if len(SlowDur) >= 2 and len(FastDur) >= 2 else 0
+
+    return Periodicity, AvgFastDur, AvgSlowDur, Punc
+
+
+def shoreline_periodicity(x_s_TS):
+    """
+    :param x_s_TS: shoreline time series of one (1-D) or many (2-D, series x time) B3D models; shorter series (e.g.,
+        of drowned barriers) are padded with NaN at the end [dam]
+    :return: structured array (see PERIODICITY_DTYPE) with, for each series,
+    Periodicity (period of punctuated retreat),
+    AvgFastDur (average duration of fast periods),
+    AvgSlowDur (average duration of slow periods),
+    Punc (1 for punctuated retreat)
+
+    Calculate shoreline change periodicity: slow periods are found in all series at once, from the smoothed shoreline
+    change rate (see `shoreline_change_rate`); slow periods separated by short, slow gaps are then joined series by
+    series.
+
+    """
+    x_s_TS = np.asarray(x_s_TS, dtype=np.float64)
+    scts, der1 = shoreline_change_rate(np.atleast_2d(x_s_TS), win=31, poly=3)
+    lengths = _valid_length(np.atleast_2d(x_s_TS))
+
+    window1 = 3  # Maximum allowed length for gaps in slow periods
+    window2 = 30  # Minimum length required for slow periods, including gaps
+    buffer = 3
+    thresh1 = 0.5  # Max slope for slow periods (if shoreline change rate is below this, immobile, otherwise transgressive)
+    thresh2 = 1
+
+    # Find slow periods
+    series, peak_start, peak_stop = _slow_periods(der1, window1, window2, thresh1)
+    first = np.searchsorted(series, np.arange(len(scts) + 1))
+
+    periodicity = np.zeros(len(scts), dtype=PERIODICITY_DTYPE)
+    for i in range(len(scts)):
+        HitDown = []  # Slow-downs
+        HitUp = []  # Speed-ups
+        end = lengths[i] - buffer
+
+        for n in range(first[i], first[i + 1]):
+            if len(HitDown) > 0:
+                gap_length = peak_start[n] - HitUp[-1]
+                gap_slope = (scts[i, peak_start[n]] - scts[i, HitUp[-1]]) / gap_length
+                if gap_length < window2 and gap_slope < thresh2:
+                    if peak_stop[n] < end:
+                        HitUp[-1] = peak_stop[n]
+                    else:
+                        del HitUp[-1]
+                    continue
+            if peak_start[n] > buffer:
+                HitDown.append(peak_start[n])
+            if peak_stop[n] < end:
+                HitUp.append(peak_stop[n])
+
+        periodicity[i] = _summarize(HitDown, HitUp)
+
+    if x_s_TS.ndim == 1:
+        return periodicity[0]
+    return periodicity
+
+
+def _stack_years(series, tmax_sim):
+    """Years [0, tmax_sim) of the time series (or histories, e.g., DuneDomain) of many models, as a single array
+    (models x time x ...), padded with NaN for models with fewer years"""
+    series = [np.asarray(values, dtype=np.float64)[0:tmax_sim] for values in series]
+    stacked = np.full((len(series), tmax_sim) + series[0].shape[1:], np.nan)
+    for i, values in enumerate(series):
+        stacked[i, : len(values)] = values
+    return stacked
+
+
+def change_rate(series):
+    """Change of a time series (or of many, along the last axis) from one year to the next, starting with a zero
+    rate of change (unlike np.diff)"""
+    series = np.asarray(series, dtype=np.float64)
+    change = series - series[..., :1]
+    return np.concatenate([np.zeros_like(change[..., :1]), np.diff(change)], axis=-1)
+
+
+def dune_crest_statistics(dune_domain, dune_restart, berm_el):
+    """Mean, minimum, and maximum dune crest elevation
+
+    :param dune_domain: dune heights (... x alongshore x dune width) [dam above the berm], e.g., a DuneDomain (time x
+        alongshore x dune width), or a stack of them (models x time x alongshore x dune width)
+    :param dune_restart: minimum dune height [dam] (a scalar, or one per model)
+    :param berm_el: berm elevation [dam MHW] (a scalar, or one per model)
+
+    :return: DuneCrestMean, DuneCrestMin, DuneCrestMax (...) [m MHW]
+    """
+    dune_domain = np.asarray(dune_domain)
+    extra_dims = dune_domain.ndim - 2  # the dimensions of the crests, after the first (model) dimension
+    dune_restart = np.reshape(dune_restart, np.shape(dune_restart) + (1,) * extra_dims)
+    berm_el = np.reshape(berm_el, np.shape(berm_el) + (1,) * (extra_dims - 1))
+
+    # Maximum height of each row in DuneDomain (using both dune domain columns)
+    DuneDomainCrest = np.maximum(dune_domain.max(axis=-1), dune_restart)
+    DuneCrestMean = (np.mean(DuneDomainCrest, axis=-1) + berm_el) * 10  # m MHW
+    DuneCrestMin = (np.min(DuneDomainCrest, axis=-1) + berm_el) * 10  # m MHW
+    DuneCrestMax = (np.max(DuneDomainCrest, axis=-1) + berm_el) * 10  # m MHW
+
+    return DuneCrestMean, DuneCrestMin, DuneCrestMax
+
+
+def combine_post_storm_human_time_series(
+    tmax_sim, post_storm_statistic, human_modified_statistic
+):
+    """
+    :param tmax_sim: max simulation time
+    :param post_storm_statistic: whatever post-storm (0.5 yr time step) statistic you want to combine
+    :param human_modified_statistic: whatever post-human response (1 yr time step) statistic you want to combine
+    :return: the combined [0, 0.5, 1, 1.5 ...] yr statistics
+
+    Combines the immediate post storm, and human recovery effort, time series into a single array (time series of
+    many models can be combined at once, along the last axis)
+
+    """
+    post_storm_statistic = np.asarray(post_storm_statistic, dtype=np.float64)
+    human_modified_statistic = np.asarray(human_modified_statistic, dtype=np.float64)
+    combined_statistic = np.empty(
+        human_modified_statistic.shape[:-1] + (2 * tmax_sim - 1,)
+    )
+    combined_statistic[..., ::2] = human_modified_statistic
+    combined_statistic[..., 1::2] = post_storm_statistic[..., 1:]
+
+    return combined_statistic
+
+
+def post_storm_time_series(post_storm_statistic, tmax_management, tmax_sim):
+    """Post-storm statistic of the managed years [1, tmax_management) of a human dynamics module (NaN for year 0 and
+    after management ends), for `combine_post_storm_human_time_series`"""
+    time_series = np.full(tmax_sim, np.nan)
+    time_series[1:tmax_management] = np.asarray(
+        post_storm_statistic[1:tmax_management], dtype=np.float64
+    )
+    return time_series
+
+
+def barrier_statistics(barrier3d, tmax_sim):
+    """
+    :param barrier3d: a B3D object, or a list of B3D objects (e.g., all domains of a CASCADE run, or the same domain of
+        all members of an ensemble)
+    :param tmax_sim: time step where simulation ends
+    :return: dict of annual time series (arrays of time, or of models x time; NaN-padded for models that end
+    earlier):
+    BarrierWidth (average interior width) [m], BarrierHeight [m], DuneCrestMean, DuneCrestMin, DuneCrestMax
+    [m MHW], bw_rate, bh_rate, sc_rate (change rates) [m/yr], shoreline_position [m], shoreface_slope, and
+    overwash (flux) [m^3/m]
+
+    Statistics of the barrier and dunes (of the 1 year time step), calculated for all years (and models) at once
+
+    """
+    models = barrier3d if isinstance(barrier3d, (list, tuple)) else [barrier3d]
+
+    DuneCrestMean, DuneCrestMin, DuneCrestMax = dune_crest_statistics(
+        _stack_years([b3d.DuneDomain for b3d in models], tmax_sim),
+        [b3d.DuneRestart for b3d in models],
+        [b3d.BermEl for b3d in models],
+    )
+
+    # note that here, and everywhere in the drowning paper, barrier width refers to the average interior width, and
+    # not x_b - x_s, which incorporates changes in beach width and the dune line in the nourishment module
+    BarrierWidth = _stack_years([b3d.InteriorWidth_AvgTS for b3d in models], tmax_sim) * 10
+    BarrierHeight = _stack_years([b3d.h_b_TS for b3d in models], tmax_sim) * 10
+    shoreline_position = _stack_years([b3d.x_s_TS for b3d in models], tmax_sim) * 10
+
+    statistics = {
+        "BarrierWidth": BarrierWidth,
+        "DuneCrestMean": DuneCrestMean,
+        "BarrierHeight": BarrierHeight,
+        "bh_rate": change_rate(BarrierHeight),
+        "bw_rate": change_rate(BarrierWidth),
+        "sc_rate": change_rate(shoreline_position),
+        "DuneCrestMin": DuneCrestMin,
+        "DuneCrestMax": DuneCrestMax,
+        "shoreline_position": shoreline_position,
+        "shoreface_slope": _stack_years([b3d.s_sf_TS for b3d in models], tmax_sim),
+        "overwash": _stack_years([b3d.QowTS for b3d in models], tmax_sim),
+    }
+
+    if models is not barrier3d:
+        statistics = {name: values[0] for name, values in statistics.items()}
+    return statistics
+
+
+def human_dynamics_statistics(
+    barrier3d,
+    tmax_management,
+    tmax_sim,
+    beach_width=None,
+    post_storm_dunes=None,
+    post_storm_x_s=None,
+    post_storm_s_sf=None,
+    post_storm_ave_interior_width=None,
+    post_storm_ave_interior_height=None,
+    post_storm_beach_width=None,
+    post_storm_Qow=None,
+):
+    """
+    :param barrier3d: a B3D object
+    :param tmax_management: time step when management ends
+    :param tmax_sim: time step where simulation ends
+    :param beach_width: beach width time series from BeachDuneManager [m]
+    :param post_storm_dunes: post-storm dune heights from the human dynamics module -- before human mods
+    :param post_storm_x_s: post-storm shoreline positions from BeachDuneManager
+    :param post_storm_s_sf: post-storm shoreface slope ...
+    :param post_storm_ave_interior_width: post-storm average interior width ...
+    :param post_storm_ave_interior_height: post-storm average interior height from the human dynamics module
+    :param post_storm_beach_width: post-storm beach width ...
+    :param post_storm_Qow: post-storm overwash flux ...
+    :return: dict of the statistics of `barrier_statistics`, plus beach_width and dune_toe [m] (if the beach width is
+    given), and, for each post-storm variable given, the combined time series (see
+    `combine_post_storm_human_time_series`) as combined_DuneCrestMin, combined_DuneCrestMax, combined_BarrierWidth,
+    combined_BarrierHeight, combined_shoreline_position, combined_shoreface_slope, combined_beach_width,
+    combined_overwash
+
+    Statistics from the human dynamics modules; combines time series of human modified variables such that
+    the 0.5 year time step represents post-storm morphology and pre-human modifications. The input time series are not
+    modified.
+
+    """
+    statistics = barrier_statistics(barrier3d, tmax_sim)
+
+    if beach_width is not None:
+        statistics["beach_width"] = np.asarray(beach_width[0:tmax_sim], dtype=np.float64)
+        statistics["dune_toe"] = statistics["shoreline_position"] + statistics["beach_width"]
+
+    def combine(name, post_storm_statistic, scale=1):
+        statistics["combined_" + name] = combine_post_storm_human_time_series(
+            tmax_sim,
+            post_storm_time_series(post_storm_statistic, tmax_management, tmax_sim) * scale,
+            statistics[name],
+        )
+
+    # these are the dune dynamics saved prior to human modifications (essentially a 0.5 year time step)
+    if post_storm_dunes is not None:
+        _, post_storm_DuneCrestMin, post_storm_DuneCrestMax = dune_crest_statistics(
+            np.asarray(post_storm_dunes[1:tmax_management], dtype=np.float64).reshape(
+                -1, *np.shape(post_storm_dunes[1])
+            ),
+            barrier3d.DuneRestart,
+            barrier3d.BermEl,
+        )
+        combine("DuneCrestMin", np.concatenate([[np.nan], post_storm_DuneCrestMin]))
+        combine("DuneCrestMax", np.concatenate([[np.nan], post_storm_DuneCrestMax]))
+
+    for name, post_storm_statistic, scale in [
+        ("BarrierWidth", post_storm_ave_interior_width, 10),
+        ("BarrierHeight", post_storm_ave_interior_height, 10),
+        ("shoreline_position", post_storm_x_s, 10),
+        ("shoreface_slope", post_storm_s_sf, 1),
+        ("beach_width", post_storm_beach_width, 1),
+        ("overwash", post_storm_Qow, 1),
+    ]:
+        if post_storm_statistic is not None and name in statistics:
+            combine(name, post_storm_statistic, scale)
+
+    return statistics
+
+
+def manager_statistics(barrier3d, manager, tmax_management, tmax_sim):
+    """Statistics (see `human_dynamics_statistics`) of a Barrier3D domain and its RoadwayManager or BeachDuneManager,
+    e.g., manager_statistics(cascade.barrier3d[iB3D], cascade.nourishments[iB3D], tmax_management, tmax_sim)"""
+
+    return human_dynamics_statistics(
+        barrier3d,
+        tmax_management,
+        tmax_sim,
+        **{
+            name: getattr(manager, "_" + name, None)
+            for name in [
+                "beach_width",
+                "post_storm_dunes",
+                "post_storm_x_s",
+                "post_storm_s_sf",
+                "post_storm_ave_interior_width",
+                "post_storm_ave_interior_height",
+                "post_storm_beach_width",
+                "post_storm_Qow",
+            ]
+        },
+    )
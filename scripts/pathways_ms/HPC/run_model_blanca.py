@@ -3,10 +3,13 @@
 
 # remember if I move to a different computer to $ pip install -e . in the brie, CHOM, and B3D directories
 
+import os
+
 import numpy as np
 import time
 
 from cascade.cascade import Cascade  # the new class
+from cascade.telemetry import Telemetry
 
 
 def RUN_4_CASCADE_noAST_Rave_SLR_pt004_NoHumans(
@@ -56,15 +59,19 @@ def RUN_4_CASCADE_noAST_Rave_SLR_pt004_NoHumans(
     # --------- LOOP ---------
     Time = time.time()
 
+    # report each year to Run_Output/<name>.telemetry.jsonl; follow all the runs with `cascade monitor Run_Output`
+    save_directory = "Run_Output/"
+    os.makedirs(save_directory, exist_ok=True)
+    telemetry = Telemetry(save_directory).attach(cascade)
+
     for time_step in range(nt - 1):
-        # Print time step to screen (NOTE: time_index in each model is time_step+1)
-        print("\r", "Time Step: ", time_step, end="")
         cascade.update()
         if cascade.b3d_break:
             break
 
+    telemetry.detach()
+
     # --------- SAVE ---------
-    save_directory = "Run_Output/"
     cascade.save(save_directory)
 
     return cascade
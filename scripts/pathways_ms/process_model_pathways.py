@@ -14,7 +14,9 @@ Copyright (C) 2022 Katherine Anarde
 
 import numpy as np
 import os
+from pathlib import Path
 
+from cascade import ensemble
 from cascade.tools import plotters as cascade_plt
 from scripts.pathways_ms import plotters_pathways as pathways_plt
 
@@ -504,6 +506,22 @@ def PLOT_9_Nonlinear_Dynamics_CASCADE_AST(
 # # ###############################################################################
 
 
+def _ensemble_statistics(summary, folder_prefix, individual_fid, n_jobs=-1, **kwds):
+
+    folder_path = Path(
+        "/Users/KatherineAnardeWheels/Research/BARis/UNC/CNH/CASCADE_save_dir/Run_Output/"
+        + folder_prefix
+    )
+
+    if individual_fid is not None:
+        runs = [folder_path / (individual_fid + ".npz")]
+    else:
+        runs = [folder_path / (folder_prefix + str(filenum) + ".npz") for filenum in range(100)]
+
+    # the summary of each run is cached next to the run file (see cascade.ensemble)
+    return ensemble.aggregate(runs, summary, n_jobs=n_jobs, **kwds)
+
+
 def get_roadway_statistics(
     folder_prefix,
     natural_barrier_elev=None,
@@ -514,94 +532,28 @@ def get_roadway_statistics(
 ):
 
     # folder_prefix = "Roadway_100sims_1m_lowGR_lowEle"
-    folder_path = (
-        "/Users/KatherineAnardeWheels/Research/BARis/UNC/CNH/CASCADE_save_dir/Run_Output/"
-        + folder_prefix
+    summaries = _ensemble_statistics(
+        ensemble.roadway_summary,
+        folder_prefix,
+        individual_fid,
+        iB3D=iB3D,
+        tmax=tmax,
+        natural_barrier_width=natural_barrier_width,
+        natural_barrier_elev=natural_barrier_elev,
     )
-    os.chdir(folder_path)
-
-    year_abandoned = []
-    sim_max = []  # total length of simulation
-    road_bulldozed = []  # overwash removal -- number of times?
-    overwash_removed = []  # total m^3 of overwash
-    dune_rebuilt = []  # rebuild dune -- total number
-    road_relocated = []  # road relocation -- total number
+
+    year_abandoned = list(summaries["year_abandoned"])
+    sim_max = list(summaries["sim_max"])  # total length of simulation
+    road_bulldozed = list(summaries["road_bulldozed"])  # overwash removal -- number of times?
+    overwash_removed = list(summaries["overwash_removed"])  # total m^3 of overwash
+    dune_rebuilt = list(summaries["dune_rebuilt"])  # rebuild dune -- total number
+    road_relocated = list(summaries["road_relocated"])  # road relocation -- total number
     diff_barrier_width = []  # diff between natural barrier height and width at end
     diff_barrier_elev = []
-
-    if individual_fid is not None:
-        output = np.load(individual_fid + ".npz", allow_pickle=True)
-        cascade = output["cascade"]
-        cascade = cascade[0]
-        b3d = cascade.barrier3d[iB3D]
-
-        tmax_sim = b3d.time_index - 1
-        sim_max.append(tmax_sim)
-
-        # if user specified a window for statistics, then just set tmax to that window
-        if tmax is not None:
-            tmax_sim = tmax
-
-        final_barrier_width = (
-            np.array(b3d.x_b_TS[tmax_sim - 1]) - np.array(b3d.x_s_TS[tmax_sim - 1])
-        ) * 10  # m
-        final_domain = np.array(b3d.DomainTS[tmax_sim - 1]) * 10
-        final_barrier_elev = final_domain[final_domain > 0].mean()  # m MHW
-        if natural_barrier_width is not None:
-            diff_barrier_width.append(natural_barrier_width - final_barrier_width)
-        if natural_barrier_elev is not None:
-            diff_barrier_elev.append(natural_barrier_elev - final_barrier_elev)
-
-        year_abandoned.append(cascade.roadways[iB3D]._time_index - 1)
-        road_bulldozed.append(
-            sum(cascade.roadways[iB3D]._road_overwash_volume[0:tmax_sim] > 0)
-        )  # only counts true elements
-        overwash_removed.append(
-            sum(cascade.roadways[iB3D]._road_overwash_volume[0:tmax_sim])
-        )  # m^3
-        dune_rebuilt.append(
-            int(sum(cascade.roadways[iB3D]._dunes_rebuilt_TS[0:tmax_sim]))
-        )
-        road_relocated.append(
-            int(sum(cascade.roadways[iB3D]._road_relocated_TS[0:tmax_sim]))
-        )
-
-    else:
-        for filenum in range(100):
-            output = np.load(folder_prefix + str(filenum) + ".npz", allow_pickle=True)
-            cascade = output["cascade"]
-            cascade = cascade[0]
-            b3d = cascade.barrier3d[iB3D]
-
-            tmax_sim = b3d.time_index - 1
-            sim_max.append(tmax_sim)
-
-            # if user specified a window for statistics, then just set tmax to that window
-            if tmax is not None:
-                tmax_sim = tmax
-
-            final_barrier_width = (
-                np.array(b3d.x_b_TS[tmax_sim - 1]) - np.array(b3d.x_s_TS[tmax_sim - 1])
-            ) * 10  # m
-            final_domain = np.array(b3d.DomainTS[tmax_sim - 1]) * 10
-            final_barrier_elev = final_domain[final_domain > 0].mean()  # m MHW
-            if natural_barrier_width is not None:
-                diff_barrier_width.append(natural_barrier_width - final_barrier_width)
-            if natural_barrier_elev is not None:
-                diff_barrier_elev.append(natural_barrier_elev - final_barrier_elev)
-            year_abandoned.append(cascade.roadways[iB3D]._time_index - 1)
-            road_bulldozed.append(
-                sum(cascade.roadways[iB3D]._road_overwash_volume[0:tmax_sim] > 0)
-            )  # only counts true elements
-            overwash_removed.append(
-                sum(cascade.roadways[iB3D]._road_overwash_volume[0:tmax_sim])
-            )  # m^3
-            dune_rebuilt.append(
-                int(sum(cascade.roadways[iB3D]._dunes_rebuilt_TS[0:tmax_sim]))
-            )
-            road_relocated.append(
-                int(sum(cascade.roadways[iB3D]._road_relocated_TS[0:tmax_sim]))
-            )
+    if natural_barrier_width is not None:
+        diff_barrier_width = list(summaries["diff_barrier_width"])
+    if natural_barrier_elev is not None:
+        diff_barrier_elev = list(summaries["diff_barrier_elev"])
 
     return (
         year_abandoned,
@@ -624,86 +576,27 @@ def get_nourishment_statistics(
     iB3D=0,
 ):
 
-    folder_path = (
-        "/Users/KatherineAnardeWheels/Research/BARis/UNC/CNH/CASCADE_save_dir/Run_Output/"
-        + folder_prefix
+    summaries = _ensemble_statistics(
+        ensemble.nourishment_summary,
+        folder_prefix,
+        individual_fid,
+        iB3D=iB3D,
+        tmax=tmax,
+        natural_barrier_width=natural_barrier_width,
+        natural_barrier_elev=natural_barrier_elev,
     )
-    os.chdir(folder_path)
 
-    year_abandoned = []
-    sim_max = []  # total length of simulation
-    dune_rebuilt = []  # rebuild dune -- total number
-    overwash_filtered_removed = []  # m^3
-    beach_nourished = []  # beach nourishments -- total number
+    year_abandoned = list(summaries["year_abandoned"])
+    sim_max = list(summaries["sim_max"])  # total length of simulation
+    dune_rebuilt = list(summaries["dune_rebuilt"])  # rebuild dune -- total number
+    overwash_filtered_removed = list(summaries["overwash_filtered_removed"])  # m^3
+    beach_nourished = list(summaries["beach_nourished"])  # beach nourishments -- total number
     diff_barrier_width = []  # diff between natural barrier height and width at end
     diff_barrier_elev = []
-
-    if individual_fid is not None:
-        output = np.load(individual_fid + ".npz", allow_pickle=True)
-        cascade = output["cascade"]
-        cascade = cascade[0]
-        b3d = cascade.barrier3d[iB3D]
-
-        tmax_sim = b3d.time_index - 1
-        sim_max.append(tmax_sim)
-
-        # if user specified a window for statistics, then just set tmax to that window
-        if tmax is not None:
-            tmax_sim = tmax
-
-        final_barrier_width = (
-            np.array(b3d.x_b_TS[tmax_sim - 1]) - np.array(b3d.x_s_TS[tmax_sim - 1])
-        ) * 10  # m
-        final_domain = np.array(b3d.DomainTS[tmax_sim - 1]) * 10
-        final_barrier_elev = final_domain[final_domain > 0].mean()  # m MHW
-        if natural_barrier_width is not None:
-            diff_barrier_width.append(natural_barrier_width - final_barrier_width)
-        if natural_barrier_elev is not None:
-            diff_barrier_elev.append(natural_barrier_elev - final_barrier_elev)
-        year_abandoned.append(cascade.nourishments[iB3D]._time_index - 1)
-        overwash_filtered_removed.append(
-            sum(cascade.nourishments[iB3D]._overwash_volume_removed[0:tmax_sim])
-        )  # m^3
-        dune_rebuilt.append(
-            int(sum(cascade.nourishments[iB3D]._dunes_rebuilt_TS[0:tmax_sim]))
-        )
-        beach_nourished.append(
-            int(sum(cascade.nourishments[iB3D]._nourishment_TS[0:tmax_sim]))
-        )
-
-    else:
-        for filenum in range(100):
-            output = np.load(folder_prefix + str(filenum) + ".npz", allow_pickle=True)
-            cascade = output["cascade"]
-            cascade = cascade[0]
-            b3d = cascade.barrier3d[iB3D]
-
-            tmax_sim = b3d.time_index - 1
-            sim_max.append(tmax_sim)
-
-            # if user specified a window for statistics, then just set tmax to that window
-            if tmax is not None:
-                tmax_sim = tmax
-
-            final_barrier_width = (
-                np.array(b3d.x_b_TS[tmax_sim - 1]) - np.array(b3d.x_s_TS[tmax_sim - 1])
-            ) * 10  # m
-            final_domain = np.array(b3d.DomainTS[tmax_sim - 1]) * 10
-            final_barrier_elev = final_domain[final_domain > 0].mean()  # m MHW
-            if natural_barrier_width is not None:
-                diff_barrier_width.append(natural_barrier_width - final_barrier_width)
-            if natural_barrier_elev is not None:
-                diff_barrier_elev.append(natural_barrier_elev - final_barrier_elev)
-            year_abandoned.append(cascade.nourishments[iB3D]._time_index - 1)
-            overwash_filtered_removed.append(
-                sum(cascade.nourishments[iB3D]._overwash_volume_removed[0:tmax_sim])
-            )  # m^3
-            dune_rebuilt.append(
-                int(sum(cascade.nourishments[iB3D]._dunes_rebuilt_TS[0:tmax_sim]))
-            )
-            beach_nourished.append(
-                int(sum(cascade.nourishments[iB3D]._nourishment_TS[0:tmax_sim]))
-            )
+    if natural_barrier_width is not None:
+        diff_barrier_width = list(summaries["diff_barrier_width"])
+    if natural_barrier_elev is not None:
+        diff_barrier_elev = list(summaries["diff_barrier_elev"])
 
     return (
         year_abandoned,
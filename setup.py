@@ -34,4 +34,5 @@ setup(
     packages=find_packages(),
     python_requires=">=3.6,<3.9",  # because of copulas
     include_package_data=True,
+    entry_points={"console_scripts": ["cascade=cascade.cli:cascade"]},
 )
@@ -0,0 +1,229 @@
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+from click.testing import CliRunner
+from yaml import dump
+
+from cascade.cascade import Cascade
+from cascade.cli import cascade, ensemble_members, load_config
+from cascade.ensemble import scan_summaries
+from cascade.output import read_output
+from cascade.telemetry import Aggregator, Telemetry, open_channel
+
+DATA_DIR = Path(__file__).parent / "cascade_test_versions_inputs"
+
+PARAMETERS = dict(
+    name="test_cli",
+    storm_file="StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
+    elevation_file="b3d_pt75_3284yrs_low-elevations.csv",
+    dune_file="pathways-dunes.npy",
+    parameter_file="barrier3d-default-parameters.yaml",
+    alongshore_section_count=1,
+    time_step_count=4,
+    min_dune_growth_rate=0.55,
+    max_dune_growth_rate=0.95,
+    alongshore_transport_module=False,
+    beach_nourishment_module=False,
+)
+
+
+def write_yaml(path, contents):
+    with open(path, "w") as f:
+        dump(contents, f)
+    return str(path)
+
+
+def copy_inputs(tmp_path):
+    """Copy of the inputs (the binary versions of text inputs are written next to them, see `input_cache`)"""
+    return str(shutil.copytree(DATA_DIR, tmp_path / "inputs"))
+
+
+def test_ensemble_members(tmp_path):
+    config = write_yaml(
+        tmp_path / "config.yaml", {"datadir": str(DATA_DIR), "parameters": PARAMETERS}
+    )
+    sweep = write_yaml(
+        tmp_path / "sweep.yaml",
+        {
+            "base": "config.yaml",
+            "parameters": {"time_step_count": 3},
+            "sweep": {"min_dune_growth_rate": [0.25, 0.35, 0.45]},
+            "members": [{"sea_level_rise_rate": 0.004}, {"sea_level_rise_rate": 0.008}],
+        },
+    )
+
+    config = load_config(sweep)
+    assert config["datadir"] == str(DATA_DIR)
+
+    members = ensemble_members(config)
+    assert len(members) == 6
+    assert members[4]["name"] == "test_cli-4"
+    assert members[4]["min_dune_growth_rate"] == 0.35
+    assert members[4]["sea_level_rise_rate"] == 0.008
+    assert all(member["time_step_count"] == 3 for member in members)
+
+    result = CliRunner().invoke(cascade, ["ensemble", sweep, "--list"])
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == 6
+
+
+def test_run(tmp_path):
+    config = write_yaml(
+        tmp_path / "config.yaml",
+        {
+            "datadir": copy_inputs(tmp_path),
+            "output": "output",
+            "parameters": PARAMETERS,
+        },
+    )
+
+    result = CliRunner().invoke(cascade, ["run", config])
+    assert result.exit_code == 0, result.output
+
+    output = read_output(tmp_path / "output" / "test_cli.npz")
+    assert output["time_index"] == PARAMETERS["time_step_count"]
+    assert len(output["barrier3d0_x_s_TS"]) == PARAMETERS["time_step_count"]
+    assert output["barrier3d0_domain"].shape[0] == PARAMETERS["time_step_count"]
+    assert output["config"]["parameters"]["name"] == "test_cli"
+
+    summaries = scan_summaries(tmp_path / "output")
+    assert summaries.index.tolist() == ["test_cli"]
+    assert summaries.loc["test_cli", "time_index"] == PARAMETERS["time_step_count"]
+    assert np.isnan(summaries.loc["test_cli", "drowned_year_0"])
+    assert summaries.loc["test_cli", "barrier_width_0"] == (
+        (output["barrier3d0_x_b_TS"][-1] - output["barrier3d0_x_s_TS"][-1]) * 10
+    )
+
+
+def test_run_drowned(tmp_path, monkeypatch):
+    """
+    check that a run stops, and writes its output, when BRIE drowns (which does not set b3d_break)
+    """
+    update = Cascade.update
+    years = []
+
+    def drown_after_year_2(model):
+        years.append(model.time_index)
+        assert len(years) <= PARAMETERS["time_step_count"], "the run does not stop"
+        update(model)
+        if model.time_index == 3:
+            model.brie._drown = True
+
+    monkeypatch.setattr(Cascade, "update", drown_after_year_2)
+    config = write_yaml(
+        tmp_path / "config.yaml",
+        {
+            "datadir": copy_inputs(tmp_path),
+            "output": "output",
+            "parameters": PARAMETERS,
+        },
+    )
+
+    result = CliRunner().invoke(cascade, ["run", config])
+    assert result.exit_code == 0, result.output
+
+    assert years == [1, 2]
+    output = read_output(tmp_path / "output" / "test_cli.npz")
+    assert output["time_index"] == 3
+    assert output["b3d_break"] == 0
+
+
+def test_ensemble_shared_inputs(tmp_path):
+    """
+    check that the members of an ensemble can share the input files: the Barrier3D parameter file is not rewritten
+    """
+    datadir = Path(copy_inputs(tmp_path))
+    parameter_file = datadir / PARAMETERS["parameter_file"]
+    parameters = parameter_file.read_bytes()
+    sweep = write_yaml(
+        tmp_path / "sweep.yaml",
+        {
+            "datadir": str(datadir),
+            "output": "output",
+            "parameters": dict(PARAMETERS, time_step_count=3),
+            "sweep": {"min_dune_growth_rate": [0.25, 0.45]},
+        },
+    )
+
+    for member in ("0", "1"):
+        result = CliRunner().invoke(cascade, ["ensemble", sweep, "--member", member])
+        assert result.exit_code == 0, result.output
+        assert parameter_file.read_bytes() == parameters
+
+    for member in ("test_cli-0", "test_cli-1"):
+        assert read_output(tmp_path / "output" / (member + ".npz"))["time_index"] == 3
+
+
+def test_telemetry(tmp_path):
+    config = write_yaml(
+        tmp_path / "config.yaml",
+        {
+            "datadir": copy_inputs(tmp_path),
+            "output": "output",
+            "parameters": PARAMETERS,
+        },
+    )
+    telemetry = tmp_path / "telemetry"
+    telemetry.mkdir()
+
+    result = CliRunner().invoke(
+        cascade, ["run", config, "--telemetry", str(telemetry)]
+    )
+    assert result.exit_code == 0, result.output
+
+    latest = Aggregator([telemetry]).poll()
+    assert list(latest) == ["test_cli"]
+    assert latest["test_cli"]["year"] == PARAMETERS["time_step_count"] - 1
+    assert latest["test_cli"]["active"] == 1
+    assert latest["test_cli"]["wall"]["total"] >= latest["test_cli"]["wall"]["physics"]
+
+    result = CliRunner().invoke(cascade, ["monitor", str(telemetry), "--once"])
+    assert result.exit_code == 0, result.output
+    assert "test_cli" in result.output.splitlines()[1]
+
+
+def test_telemetry_detached_on_error(tmp_path, monkeypatch):
+    """
+    check that the telemetry of a run is detached (and its channel closed) when the simulation fails
+    """
+    detached = []
+    detach = Telemetry.detach
+
+    def record_detach(telemetry):
+        detached.append(telemetry._channel is not None)
+        detach(telemetry)
+
+    def fail(model):
+        raise RuntimeError("update failed")
+
+    monkeypatch.setattr(Telemetry, "detach", record_detach)
+    monkeypatch.setattr(Cascade, "update", fail)
+    config = write_yaml(
+        tmp_path / "config.yaml",
+        {
+            "datadir": copy_inputs(tmp_path),
+            "output": "output",
+            "parameters": PARAMETERS,
+        },
+    )
+    telemetry = tmp_path / "telemetry"
+    telemetry.mkdir()
+
+    result = CliRunner().invoke(
+        cascade, ["run", config, "--telemetry", str(telemetry)]
+    )
+    assert isinstance(result.exception, RuntimeError)
+    assert detached == [True]
+
+
+def test_telemetry_does_not_block(tmp_path):
+    pipe = tmp_path / "telemetry.fifo"
+    os.mkfifo(pipe)
+
+    # nobody reads the pipe, or listens on the socket
+    for target in (pipe, "unix://{}".format(tmp_path / "telemetry.sock")):
+        channel = open_channel(target, "test_cli")
+        assert not any(channel.send('{"year": 0}\n') for _ in range(100))
+        channel.close()
@@ -1,18 +1,26 @@
 import numpy as np
 from numpy.testing import assert_array_almost_equal
 from pathlib import Path
+import os
+import shutil
+import pytest
+from cascade.brie_coupler import storm_free_year
 from cascade.cascade import Cascade
+from cascade.events import PARALLEL_DISPATCH
+from cascade.parallel_tuner import ParallelTuner
+from cascade.storm_library import StormLibrary
+from cascade.spinup_cache import cached_years, configuration_hash, spin_up
+from cascade.tools.animate import animation_cube
 from barrier3d import Barrier3dBmi
+from barrier3d.load_input import load_elevation
 
 BMI_DATA_DIR = Path(__file__).parent / "cascade_test_versions_inputs"
 # datadir = "../Cascade/tests/cascade_test_versions_inputs/"
 NT = 30
 
 
-def run_cascade_no_human_dynamics():
-    cascade = Cascade(
-        str(BMI_DATA_DIR) + "/",
-        # datadir,
+def initialize_cascade_no_human_dynamics(**kwds):
+    parameters = dict(
         name="test_coupled_dune_migration",
         storm_file="StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
         elevation_file="b3d_pt75_3284yrs_low-elevations.csv",
@@ -35,6 +43,17 @@ def run_cascade_no_human_dynamics():
         beach_nourishment_module=False,
         community_economics_module=False,  # no community dynamics
     )
+    parameters.update(kwds)
+
+    return Cascade(
+        str(BMI_DATA_DIR) + "/",
+        # datadir,
+        **parameters,
+    )
+
+
+def run_cascade_no_human_dynamics():
+    cascade = initialize_cascade_no_human_dynamics()
 
     for time_step in range(NT - 1):
         cascade.update()
@@ -107,6 +126,44 @@ def test_barrier3d_versions():
     assert np.all(barrier3d._model._QowTS == CASCADE_OUTPUT._barrier3d[0]._QowTS)
 
 
+def test_parameter_file_unchanged(tmp_path):
+    """
+    check that the Barrier3D parameter file is only read during initialization, so simulations can share it
+    """
+    datadir = shutil.copytree(BMI_DATA_DIR, tmp_path / "inputs")
+    parameter_file = datadir / "barrier3d-default-parameters.yaml"
+    parameters = parameter_file.read_bytes()
+
+    cascade = Cascade(
+        str(datadir) + "/",
+        name="test_parameter_file",
+        storm_file="StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
+        elevation_file="b3d_pt75_3284yrs_low-elevations.csv",
+        dune_file="pathways-dunes.npy",
+        parameter_file=parameter_file.name,
+        alongshore_section_count=2,
+        time_step_count=5,
+        min_dune_growth_rate=[0.45, 0.55],
+        max_dune_growth_rate=0.95,
+        roadway_management_module=False,
+        beach_nourishment_module=False,
+    )
+
+    assert parameter_file.read_bytes() == parameters
+    assert [b3d.TMAX for b3d in cascade.barrier3d] == [5, 5]
+    assert [b3d.rmin for b3d in cascade.barrier3d] == [0.45, 0.55]
+
+
+def test_initialize_missing_input():
+    """
+    check that a failed initialization leaves the working directory unchanged
+    """
+    cwd = os.getcwd()
+    with pytest.raises(ValueError):
+        initialize_cascade_no_human_dynamics(elevation_file="missing-elevations.npy")
+    assert os.getcwd() == cwd
+
+
 def test_shoreline_dune_migration():
     """
     As a check on the dynamics in Barrier3D, here we want to see if the dunes migrate correctly for natural simulations,
@@ -167,3 +224,463 @@ def test_shoreline_variable_exchange_ast():
     )  # this isn't always zero; rounding error
 
     assert_array_almost_equal([dt, ds, db, dh], np.zeros([4, 6, 3]))
+
+
+def test_checkpoint_resume(tmp_path):
+    """
+    check that a simulation continued from a checkpoint is identical to the uninterrupted simulation
+    """
+    cascade = initialize_cascade_no_human_dynamics(
+        checkpoint_interval=4, checkpoint_directory=str(tmp_path)
+    )
+    for time_step in range(10):
+        cascade.update()
+
+    # continue from the last checkpoint, written after 8 time steps
+    cascade = Cascade.resume(tmp_path)
+    assert cascade.time_index == 9
+
+    for time_step in range(NT - 1 - 8):
+        cascade.update()
+
+    assert np.all(
+        cascade._barrier3d[0]._DuneDomain == CASCADE_OUTPUT._barrier3d[0]._DuneDomain
+    )
+    assert np.all(cascade._barrier3d[0]._x_s_TS == CASCADE_OUTPUT._barrier3d[0]._x_s_TS)
+    for t in range(NT):
+        assert np.all(
+            np.array(cascade._barrier3d[0].DomainTS[t])
+            == np.array(CASCADE_OUTPUT._barrier3d[0].DomainTS[t])
+        )
+
+
+def test_fork():
+    """
+    check that a clone of the model continues exactly as the original, while sharing the history of finalized years
+    """
+    trunk = initialize_cascade_no_human_dynamics()
+    for time_step in range(10):
+        trunk.update()
+
+    branch = trunk.fork(name="test_fork")
+    assert branch.barrier3d[0].DomainTS[5] is trunk.barrier3d[0].DomainTS[5]
+    assert branch.barrier3d[0].DuneDomain is not trunk.barrier3d[0].DuneDomain
+
+    for time_step in range(NT - 1 - 10):
+        branch.update()
+
+    assert np.all(
+        branch._barrier3d[0]._DuneDomain == CASCADE_OUTPUT._barrier3d[0]._DuneDomain
+    )
+    assert np.all(branch._barrier3d[0]._x_s_TS == CASCADE_OUTPUT._barrier3d[0]._x_s_TS)
+    assert trunk.time_index == 11
+
+
+def test_lazy_managers():
+    """
+    check that a natural simulation does not construct the human management modules, and that a manager constructed
+    later is the same as one constructed with the model
+    """
+    assert CASCADE_OUTPUT.roadways.built() == []
+    assert CASCADE_OUTPUT.nourishments.built() == []
+
+    nourishment = CASCADE_OUTPUT.nourishments[0]
+    assert CASCADE_OUTPUT.nourishments.is_built(0)
+    assert nourishment.beach_width[0] == CASCADE_OUTPUT._initial_beach_width[0]
+    assert np.all(nourishment.overwash_volume_removed == 0)
+
+
+def test_single_precision_storage():
+    """
+    check the accuracy of the single-precision history against the double-precision simulation: the model itself is
+    unchanged, and the stored elevations differ by less than 1e-6 dam
+    """
+    cascade = initialize_cascade_no_human_dynamics(storage_dtype="float32")
+    for time_step in range(NT - 1):
+        cascade.update()
+
+    assert np.all(cascade._barrier3d[0]._x_s_TS == CASCADE_OUTPUT._barrier3d[0]._x_s_TS)
+    assert np.all(
+        cascade._barrier3d[0]._DuneDomain == CASCADE_OUTPUT._barrier3d[0]._DuneDomain
+    )
+    for t in range(NT - 1):
+        assert cascade._barrier3d[0].DomainTS[t].dtype == np.float32
+        np.testing.assert_allclose(
+            cascade._barrier3d[0].DomainTS[t],
+            CASCADE_OUTPUT._barrier3d[0].DomainTS[t],
+            rtol=0,
+            atol=1e-6,
+        )
+
+
+def test_domain_history(tmp_path):
+    """
+    check that the preallocated domain history mirrors DomainTS, and shares memory with it for finalized years
+    """
+    barrier3d = CASCADE_OUTPUT.barrier3d[0]
+    history = CASCADE_OUTPUT.domain_history[0]
+    assert history.end == NT
+
+    domains = history.array()
+    for t in range(NT):
+        width = history.widths[t]
+        assert width == np.shape(barrier3d.DomainTS[t])[0]
+        assert np.all(domains[t, :width] == barrier3d.DomainTS[t])
+        assert np.all(np.isnan(domains[t, width:]))
+    assert np.shares_memory(barrier3d.DomainTS[5], domains)
+
+    history.save(tmp_path / "history.npz")
+    with np.load(tmp_path / "history.npz") as saved:
+        assert np.array_equal(saved["domain"], domains, equal_nan=True)
+
+
+def test_memory_report():
+    """
+    check that the memory report counts each array once (views into the domain history with the history), and that
+    the resident set size is sampled after each time step
+    """
+    report = CASCADE_OUTPUT.memory_report()
+    history = CASCADE_OUTPUT.domain_history[0]
+    assert report["DomainTS"][0] >= sum(
+        block.nbytes for block in history._blocks if block is not None
+    )
+    assert report["DuneDomain"][0] >= CASCADE_OUTPUT.barrier3d[0].DuneDomain.nbytes
+    assert report["chom"] == 0
+    assert report["total"] == sum(
+        sum(value) if isinstance(value, list) else value
+        for name, value in report.items()
+        if name != "total"
+    )
+
+    cascade = initialize_cascade_no_human_dynamics(sample_memory=True)
+    for time_step in range(2):
+        cascade.update()
+    assert [year for year, _ in cascade.memory_samples] == [1, 2]
+    assert all(rss > 0 for _, rss in cascade.memory_samples)
+    assert CASCADE_OUTPUT.memory_samples is None
+
+
+def test_brie_drowned(tmp_path):
+    """
+    check that once BRIE has drowned, an update does not simulate, record, sample, checkpoint or announce another year
+    """
+    cascade = initialize_cascade_no_human_dynamics(
+        sample_memory=True, checkpoint_interval=1, checkpoint_directory=str(tmp_path)
+    )
+    for time_step in range(2):
+        cascade.update()
+    checkpoints = sorted(tmp_path.iterdir())
+    end = cascade.domain_history[0].end
+
+    cascade.brie._drown = True
+    events = []
+    cascade.events.subscribe(events.append)
+    cascade.update()
+
+    assert not cascade.b3d_break
+    assert cascade.time_index == 3
+    assert cascade.domain_history[0].end == end
+    assert [year for year, _ in cascade.memory_samples] == [1, 2]
+    assert sorted(tmp_path.iterdir()) == checkpoints
+    assert events == []
+
+
+def test_animation_cube():
+    """
+    check that the animation cube stacks the beach, dunes, and interior of each year behind the shoreline
+    """
+    times, cube = animation_cube(CASCADE_OUTPUT, [0], NT)
+    assert np.array_equal(times, np.arange(NT))
+
+    barrier3d = CASCADE_OUTPUT.barrier3d[0]
+    beach_width = CASCADE_OUTPUT._initial_beach_width[0] / 10
+    for t in [0, NT // 2, NT - 1]:
+        shoreline = int(np.floor(barrier3d.x_s_TS[t]))
+        cellular_beach_width = int(
+            np.floor(barrier3d.x_s_TS[t] + beach_width) - shoreline
+        )
+        dunes = (barrier3d.DuneDomain[t].T + barrier3d.BermEl) * 10
+        interior = barrier3d.DomainTS[t] * 10
+        start = shoreline + cellular_beach_width
+        stop = start + len(dunes) + len(interior)
+
+        assert np.all(cube[t, :shoreline] == -1)
+        assert np.all(cube[t, shoreline:start] > 0)
+        expected = np.vstack([dunes, interior])
+        expected[expected < 0] = -1
+        assert np.array_equal(cube[t, start:stop], expected)
+        assert np.all(cube[t, stop:] == -1)
+
+
+def test_spin_up_cache(tmp_path):
+    """
+    check that a spin-up is reused from the cache for the same configuration, and matches the uninterrupted simulation
+    """
+    parameters = dict(
+        storm_file="StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
+        elevation_file="b3d_pt75_3284yrs_low-elevations.csv",
+        dune_file="pathways-dunes.npy",
+        parameter_file="barrier3d-default-parameters.yaml",
+        alongshore_section_count=1,
+        time_step_count=NT,
+        min_dune_growth_rate=0.55,
+        max_dune_growth_rate=0.95,
+        alongshore_transport_module=False,
+        beach_nourishment_module=False,
+    )
+    datadir = str(BMI_DATA_DIR) + "/"
+
+    cascade = spin_up(datadir, 5, cache_directory=tmp_path, **parameters)
+    key = configuration_hash(datadir, **parameters)
+    assert 5 in cached_years(tmp_path, key)
+
+    # continue from the cached year 5, using different execution settings
+    cascade = spin_up(datadir, 10, cache_directory=tmp_path, num_cores=2, **parameters)
+    assert configuration_hash(datadir, num_cores=2, **parameters) == key
+    assert cascade.time_index == 11
+    assert np.all(
+        np.array(cascade.barrier3d[0].x_s_TS)
+        == np.array(CASCADE_OUTPUT.barrier3d[0].x_s_TS[:11])
+    )
+
+
+def test_storm_library(tmp_path):
+    """
+    check that a member of a storm library runs the same as its storm file, and that the spin-up cache identifies a
+    storm library by the storms of the member rather than by its path
+    """
+    datadir = shutil.copytree(BMI_DATA_DIR, tmp_path / "inputs")
+    storms = np.load(datadir / "StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy")
+    np.save(datadir / "calm-storms.npy", storms[storms[:, 0] % 2 == 0])
+    library = StormLibrary.from_files(
+        tmp_path / "library",
+        [
+            datadir / "StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
+            datadir / "calm-storms.npy",
+        ],
+    )
+
+    parameters = dict(
+        elevation_file="b3d_pt75_3284yrs_low-elevations.csv",
+        dune_file="pathways-dunes.npy",
+        parameter_file="barrier3d-default-parameters.yaml",
+        alongshore_section_count=1,
+        time_step_count=8,
+        min_dune_growth_rate=0.55,
+        max_dune_growth_rate=0.95,
+        alongshore_transport_module=False,
+        beach_nourishment_module=False,
+    )
+    datadir = str(datadir) + "/"
+    models = [
+        Cascade(datadir, storm_file="calm-storms.npy", **parameters),
+        Cascade(
+            datadir,
+            storm_file="StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
+            storm_library=library,
+            storm_library_member="calm-storms.npy",
+            **parameters,
+        ),
+    ]
+    for model in models:
+        for time_step in range(7):
+            model.update()
+
+    expected, cascade = models[0].barrier3d[0], models[1].barrier3d[0]
+    assert np.array_equal(cascade.StormSeries, expected.StormSeries)
+    assert np.array_equal(cascade.x_s_TS, expected.x_s_TS)
+    assert np.array_equal(cascade.DuneDomain, expected.DuneDomain)
+    for t in range(expected.time_index):
+        assert np.array_equal(cascade.DomainTS[t], expected.DomainTS[t])
+
+    parameters["storm_file"] = "StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy"
+    keys = [
+        configuration_hash(
+            datadir,
+            storm_library=str(library.path),
+            storm_library_member=member,
+            **parameters,
+        )
+        for member in (0, 1, "calm-storms.npy")
+    ]
+    assert keys[0] != keys[1] and keys[1] == keys[2]
+
+    # same path, different storms
+    StormLibrary.write(library.path, [storms[::-1], storms])
+    assert (
+        configuration_hash(
+            datadir,
+            storm_library=str(library.path),
+            storm_library_member=0,
+            **parameters,
+        )
+        != keys[0]
+    )
+
+
+def test_storm_library_pipelined(tmp_path):
+    """
+    check that the storm series of all domains stay views into the (memory-mapped) storm library when the domains are
+    updated by worker processes, which return copies of the domains
+    """
+    library = StormLibrary.from_files(
+        tmp_path / "library",
+        [BMI_DATA_DIR / "StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy"],
+    )
+    cascade = initialize_cascade_no_human_dynamics(
+        alongshore_section_count=2,
+        time_step_count=6,
+        num_cores=2,
+        pipeline_management=True,
+        storm_library=library,
+    )
+    for time_step in range(5):
+        cascade.update()
+
+    storms_file = str((library.path / "storms.npy").resolve())
+    for b3d in cascade.barrier3d:
+        assert isinstance(b3d.StormSeries, np.memmap)
+        assert not b3d.StormSeries.flags.owndata
+        assert str(Path(b3d.StormSeries.filename).resolve()) == storms_file
+        assert np.array_equal(b3d.StormSeries, library[0])
+
+
+def test_storm_free_year(monkeypatch):
+    """
+    check that a domain without storms in a year, which is updated in-process instead of in the parallel pool, ends up
+    the same as when it is updated in the pool
+    """
+    models = []
+    for fast_path in (True, False):
+        if not fast_path:  # send every domain to the pool
+            monkeypatch.setattr(
+                "cascade.cascade.storm_free_year", lambda barrier3d: False
+            )
+        model = initialize_cascade_no_human_dynamics(
+            alongshore_section_count=3, time_step_count=5, num_cores=3
+        )
+
+        # no storms for the first domain in year 3
+        storms = model.barrier3d[0].StormSeries
+        model.barrier3d[0].StormSeries = storms[storms[:, 0] != 3]
+
+        for time_step in range(3):
+            if time_step == 2:
+                assert storm_free_year(model.barrier3d[0])
+                assert not storm_free_year(model.barrier3d[1])
+            model.update()
+        models.append(model)
+
+    fast, full = models
+    for iB3D in range(3):
+        assert np.all(
+            np.array(fast.barrier3d[iB3D].x_s_TS)
+            == np.array(full.barrier3d[iB3D].x_s_TS)
+        )
+        for t in range(4):
+            assert np.all(
+                np.array(fast.barrier3d[iB3D].DomainTS[t])
+                == np.array(full.barrier3d[iB3D].DomainTS[t])
+            )
+
+
+def test_parallel_auto():
+    """
+    check that num_cores="auto" gives the same result as the sequential update, whichever backends the tuner tries,
+    and that each of its decisions is emitted
+    """
+    sequential = initialize_cascade_no_human_dynamics(
+        alongshore_section_count=3, time_step_count=6
+    )
+    auto = initialize_cascade_no_human_dynamics(
+        alongshore_section_count=3, time_step_count=6, num_cores="auto", verbose=False
+    )
+    auto._parallel_tuner = ParallelTuner(max_workers=3)  # try all backends
+    dispatches = []
+    auto.events.subscribe(dispatches.append, PARALLEL_DISPATCH)
+
+    for time_step in range(5):
+        sequential.update()
+        auto.update()
+
+    # year 1 is free of storms, so nothing is dispatched
+    assert [event.year for event in dispatches] == [2, 3, 4, 5]
+    assert [event.data["backend"] for event in dispatches[:3]] == [
+        "sequential",
+        "threading",
+        "loky",
+    ]
+    assert dispatches[0].message is not None
+
+    for iB3D in range(3):
+        assert np.all(
+            np.array(auto.barrier3d[iB3D].x_s_TS)
+            == np.array(sequential.barrier3d[iB3D].x_s_TS)
+        )
+        for t in range(6):
+            assert np.all(
+                np.array(auto.barrier3d[iB3D].DomainTS[t])
+                == np.array(sequential.barrier3d[iB3D].DomainTS[t])
+            )
+
+
+def test_freeze_drowned_domains(tmp_path):
+    """
+    check that a drowned domain is frozen while the other domain continues exactly as in a run in which nothing
+    drowns, and that the history of the frozen domain is padded
+    """
+    elevation = load_elevation(
+        str(BMI_DATA_DIR / "b3d_pt75_3284yrs_low-elevations.csv"), fmt="csv"
+    )
+    # a barrier that is barely above sea level, and drowns in year 2
+    np.save(tmp_path / "drowning.npy", elevation - elevation[0].max() + 0.0005)
+    elevation_files = [
+        "b3d_pt75_3284yrs_low-elevations.csv",
+        str(tmp_path / "drowning.npy"),
+    ]
+
+    frozen = initialize_cascade_no_human_dynamics(
+        alongshore_section_count=2,
+        time_step_count=8,
+        elevation_file=elevation_files,
+        freeze_drowned_domains=True,
+    )
+    reference = initialize_cascade_no_human_dynamics(
+        alongshore_section_count=2, time_step_count=8
+    )
+
+    for time_step in range(6):
+        frozen.update()
+        reference.update()
+        if time_step == 1:
+            drowned = frozen.barrier3d[1]
+            x_s_TS = list(drowned.x_s_TS)
+            DuneDomain = drowned.DuneDomain.copy()
+
+    assert frozen.domain_break == [0, 1]
+    assert frozen.active_domains == [0]
+    assert not frozen.b3d_break
+    assert frozen.time_index == 7
+
+    # the drowned domain is not updated after year 2...
+    assert frozen.barrier3d[1] is drowned
+    assert drowned.time_index == 2
+    assert list(drowned.x_s_TS) == x_s_TS
+    assert np.all(drowned.DuneDomain == DuneDomain)
+
+    # ...but its history covers all years
+    history = frozen.domain_history[1]
+    assert history.end == frozen.time_index
+    for t in range(2, frozen.time_index):
+        assert np.all(history[t] == drowned.DomainTS[1])
+
+    # the other domain continues as if nothing drowned
+    assert np.all(
+        np.array(frozen.barrier3d[0].x_s_TS) == np.array(reference.barrier3d[0].x_s_TS)
+    )
+    assert np.all(frozen.barrier3d[0].DuneDomain == reference.barrier3d[0].DuneDomain)
+    for t in range(frozen.time_index):
+        assert np.all(
+            np.array(frozen.barrier3d[0].DomainTS[t])
+            == np.array(reference.barrier3d[0].DomainTS[t])
+        )
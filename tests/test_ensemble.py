@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cascade.ensemble import (
+    aggregate,
+    roadway_summary,
+    run_files,
+    sidecar_path,
+    summary_key,
+)
+
+
+def save_run(path, year_abandoned, relocations):
+    """save a stand-in for a roadway management run, as `Cascade.save` does"""
+    barrier3d = SimpleNamespace(
+        time_index=21,
+        x_b_TS=list(np.linspace(50, 60, 20)),
+        x_s_TS=list(np.linspace(20, 25, 20)),
+        DomainTS=[np.full((30, 5), 0.1)] * 20,
+    )
+    roadways = SimpleNamespace(
+        _time_index=year_abandoned + 1,
+        _road_overwash_volume=np.array([0, 5, 0, 10] + [0] * 16, dtype=float),
+        _dunes_rebuilt_TS=np.ones(20),
+        _road_relocated_TS=np.array([1] * relocations + [0] * (20 - relocations)),
+    )
+    cascade = SimpleNamespace(barrier3d=[barrier3d], roadways=[roadways])
+    np.savez(path, cascade=[cascade])
+
+
+def test_aggregate(tmp_path):
+    """
+    check the summaries of an ensemble, and that the summaries are cached until a run file changes
+    """
+    for filenum in [0, 1, 10, 2]:
+        save_run(tmp_path / "roadways{}.npz".format(filenum), 10 + filenum, filenum)
+    assert [path.stem for path in run_files(tmp_path)] == [
+        "roadways0",
+        "roadways1",
+        "roadways2",
+        "roadways10",
+    ]
+
+    summaries = aggregate(tmp_path, roadway_summary, natural_barrier_width=400)
+    assert list(summaries.index) == [
+        "roadways0",
+        "roadways1",
+        "roadways2",
+        "roadways10",
+    ]
+    assert list(summaries["year_abandoned"]) == [10, 11, 12, 20]
+    assert list(summaries["road_relocated"]) == [0, 1, 2, 10]
+    assert np.all(summaries["road_bulldozed"] == 2)
+    assert np.all(summaries["overwash_removed"] == 15)
+    assert np.allclose(summaries["diff_barrier_width"], 400 - 350)
+    assert np.all(np.isnan(summaries["diff_barrier_elev"]))
+
+    key = summary_key(roadway_summary, natural_barrier_width=400)
+    assert sidecar_path(tmp_path / "roadways2.npz", key).is_file()
+
+    def no_loading(path):
+        raise AssertionError("loaded {}".format(path))
+
+    cached = aggregate(
+        tmp_path, roadway_summary, loader=no_loading, natural_barrier_width=400
+    )
+    assert cached.equals(summaries)
+
+    save_run(tmp_path / "roadways2.npz", 50, 2)
+    with pytest.raises(AssertionError, match="roadways2"):
+        aggregate(
+            tmp_path, roadway_summary, loader=no_loading, natural_barrier_width=400
+        )
+    summaries = aggregate(
+        tmp_path, roadway_summary, natural_barrier_width=400, n_jobs=2
+    )
+    assert summaries.loc["roadways2", "year_abandoned"] == 50
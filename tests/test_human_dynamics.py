@@ -5,9 +5,18 @@ from pathlib import Path
 from cascade.roadway_manager import bulldoze, rebuild_dunes, set_growth_parameters
 from cascade.beach_dune_manager import shoreface_nourishment, filter_overwash
 from cascade import Cascade
+from cascade.parallel_tuner import ParallelTuner
+from cascade.events import (
+    DUNE_REBUILT,
+    PRE_PHYSICS,
+    PRE_MANAGEMENT,
+    ROAD_DROWNED,
+    ROAD_RELOCATED,
+)
 
 BMI_DATA_DIR = Path(__file__).parent / "cascade_test_human_inputs"
 NT = 180
+ROADWAY_EVENTS = []  # events of the roadway run
 # datadir = "../Cascade/tests/cascade_test_human_inputs/"
 
 
@@ -42,7 +51,9 @@ def run_cascade_roadway_dynamics():
         road_setback=20,  # m
         dune_design_elevation=3.2,  # m MHW, rebuild to 2 m dune above the roadway
         dune_minimum_elevation=1.7,  # m MHW, allow dune to erode down to 0.5 m above the roadway, v1 = 2.7 m
+        verbose=False,
     )
+    cascade.events.subscribe(ROADWAY_EVENTS.append)
 
     for time_step in range(NT - 1):
         cascade.update()
@@ -423,3 +434,106 @@ def test_shoreline_road_relocation():
 
     assert np.all(road_relocated_based_on_setback == road_relocated)
     assert np.all(dunes_migrated[road_relocated] == True)
+
+
+def test_roadway_events():
+    """
+    check that the events of the roadway run match its time series: relocations, dune rebuilds, and the year the road
+    drowned (and that a step event is sent for each year, and each manager update)
+    """
+    iB3D = 0
+    roadways = CASCADE_ROADWAY_OUTPUT.roadways[iB3D]
+
+    def years(kind):
+        return [event.year for event in ROADWAY_EVENTS if event.kind == kind]
+
+    assert years(ROAD_RELOCATED) == list(np.flatnonzero(roadways._road_relocated_TS))
+    assert years(DUNE_REBUILT) == list(np.flatnonzero(roadways._dunes_rebuilt_TS))
+    assert years(ROAD_DROWNED) == [roadways._time_index - 1]
+    assert len(years(PRE_PHYSICS)) == CASCADE_ROADWAY_OUTPUT.time_index - 1
+    assert len(years(PRE_MANAGEMENT)) == roadways._time_index - 1
+
+    drowned = [event for event in ROADWAY_EVENTS if event.kind == ROAD_DROWNED][0]
+    assert drowned.domain == iB3D
+    assert "drowned at {} years".format(drowned.year) in drowned.message
+
+
+def run_cascade_managed_domains(max_workers=None, **kwds):
+    # a roadway domain and two nourished domains, managed each year after their physics
+    cascade = Cascade(
+        str(BMI_DATA_DIR) + "/",
+        name="test_pipelined_management",
+        storm_file="StormSeries_1kyrs_VCR_Berm1pt9m_Slope0pt04_01.npy",
+        elevation_file="b3d_pt45_8750yrs_low-elevations.csv",
+        dune_file="pathways-dunes.npy",
+        parameter_file="nourishment-parameters.yaml",
+        sea_level_rise_rate=0.007,
+        background_erosion=-1.0,  # m/yr
+        alongshore_section_count=3,
+        time_step_count=10,
+        roadway_management_module=[True, False, False],
+        alongshore_transport_module=False,
+        beach_nourishment_module=[False, True, True],
+        community_economics_module=False,
+        road_ele=1.2,
+        road_width=20,
+        road_setback=20,
+        dune_design_elevation=3.2,
+        dune_minimum_elevation=1.7,
+        nourishment_interval=2,  # yrs
+        nourishment_volume=100,
+        **kwds,
+    )
+    if max_workers is not None:
+        # let the parallel tuner try all backends, whatever the number of cores of this machine
+        cascade._parallel_tuner = ParallelTuner(max_workers=max_workers)
+
+    for time_step in range(8):
+        cascade.update()
+
+    return cascade
+
+
+def test_pipelined_management():
+    """
+    check that chaining the management of each domain onto its physics update reproduces the roadway and nourishment
+    time series of managing all domains after the physics, with a fixed number of worker processes and when the
+    parallel tuner chooses the backend
+    """
+    expected = run_cascade_managed_domains(num_cores=2)
+
+    for num_cores, max_workers in ((2, None), ("auto", 3)):
+        cascade = run_cascade_managed_domains(
+            max_workers, num_cores=num_cores, pipeline_management=True
+        )
+        assert cascade.time_index == expected.time_index
+        if num_cores == "auto":
+            decisions = cascade.parallel_report["decisions"]
+            backends = [decision["backend"] for decision in decisions]
+            assert backends[:3] == ["sequential", "threading", "loky"]
+
+        for b3d, expected_b3d in zip(cascade.barrier3d, expected.barrier3d):
+            assert np.array_equal(b3d.x_s_TS, expected_b3d.x_s_TS)
+            assert np.array_equal(b3d.DuneDomain, expected_b3d.DuneDomain)
+            for t in range(b3d.time_index):
+                assert np.array_equal(b3d.DomainTS[t], expected_b3d.DomainTS[t])
+
+        roadway, expected_roadway = cascade.roadways[0], expected.roadways[0]
+        assert np.array_equal(
+            roadway._road_setback_TS, expected_roadway._road_setback_TS
+        )
+        assert np.array_equal(
+            roadway._dunes_rebuilt_TS, expected_roadway._dunes_rebuilt_TS
+        )
+        for iB3D in (1, 2):
+            nourishment = cascade.nourishments[iB3D]
+            expected_nourishment = expected.nourishments[iB3D]
+            assert np.array_equal(
+                nourishment._nourishment_volume_TS,
+                expected_nourishment._nourishment_volume_TS,
+            )
+            assert np.array_equal(
+                nourishment.beach_width,
+                expected_nourishment.beach_width,
+                equal_nan=True,
+            )
@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# optional couplers and heavy dependencies, imported only when the corresponding module is used
+LAZY_MODULES = ("brie", "barrier3d", "chom", "joblib", "scipy", "matplotlib", "pandas")
+
+# generous budget for the time spent in the modules of this package during the import (`-X importtime` self times,
+# i.e., excluding dependencies such as numpy), to catch expensive work at import time
+IMPORT_TIME_BUDGET = 0.2  # [s]
+
+IMPORT_SCRIPT = """
+import json, sys
+import {}
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def import_cascade(module):
+    """Import a module of this package in a new interpreter
+
+    :return: modules in `sys.modules` after the import, and the time spent in the modules of this package [s]
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT.format(module)],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    # lines of "import time: <self [us]> | <cumulative [us]> | <module>"
+    self_time = 0
+    for line in process.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3:
+            continue
+        name = fields[2].strip()
+        if name == "cascade" or name.startswith("cascade."):
+            self_time += int(fields[0].split(":")[1])
+
+    return json.loads(process.stdout.splitlines()[-1]), self_time * 1e-6
+
+
+@pytest.mark.parametrize("module", ["cascade", "cascade.cascade"])
+def test_lazy_imports(module):
+    modules, _ = import_cascade(module)
+
+    assert [module for module in LAZY_MODULES if module in modules] == []
+
+
+@pytest.mark.parametrize("module", ["cascade", "cascade.cascade"])
+def test_import_time(module):
+    # best of a few runs, to be robust to a busy machine
+    elapsed = min(import_cascade(module)[1] for _ in range(3))
+
+    assert 0 < elapsed < IMPORT_TIME_BUDGET
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from cascade.tools.statistics import (
+    barrier_statistics,
+    human_dynamics_statistics,
+    shoreline_periodicity,
+    stack_time_series,
+)
+
+
+def punctuated_shoreline(slow, fast, length=1000):
+    """shoreline positions [dam] that alternate between slow (0 m/yr) and fast (2 m/yr) retreat"""
+    rate = np.zeros(length)
+    for start in range(slow, length, slow + fast):
+        rate[start : start + fast] = 0.2  # dam/yr
+    return 20 + np.cumsum(rate)
+
+
+def test_shoreline_periodicity():
+    """
+    check that slow and fast periods are found in each series of a batch, and that the batch matches the series
+    analyzed one at a time (including a shorter, NaN-padded series)
+    """
+    shorelines = [
+        punctuated_shoreline(100, 100),
+        punctuated_shoreline(150, 50),
+        np.linspace(20, 80, 1000),  # steady retreat
+        punctuated_shoreline(100, 100, length=600),
+    ]
+    periodicity = shoreline_periodicity(stack_time_series(shorelines))
+
+    assert periodicity["Punc"].tolist() == [1, 1, 0, 1]
+    assert abs(periodicity["Periodicity"][0] - 200) < 5
+    assert abs(periodicity["Periodicity"][1] - 200) < 5
+    assert periodicity["AvgSlowDur"][1] > periodicity["AvgFastDur"][1]
+    assert periodicity["Periodicity"][2] == 0
+
+    for shoreline, expected in zip(shorelines, periodicity):
+        assert shoreline_periodicity(shoreline) == expected
+
+
+def barrier(nt, seed):
+    """a stand-in for the time series and dune domain of a Barrier3D model"""
+    rng = np.random.default_rng(seed)
+    return SimpleNamespace(
+        DuneDomain=rng.uniform(0, 0.3, (nt, 5, 2)),
+        DuneRestart=0.075,
+        BermEl=0.19,
+        InteriorWidth_AvgTS=list(30 - np.arange(nt) * 0.1),
+        h_b_TS=list(rng.uniform(0.1, 0.2, nt)),
+        x_s_TS=list(20 + np.arange(nt) * 0.2),
+        s_sf_TS=list(rng.uniform(0.01, 0.02, nt)),
+        QowTS=list(rng.uniform(0, 10, nt)),
+    )
+
+
+def test_barrier_statistics():
+    """
+    check the statistics of a single model, of a batch of models (including one that ends early), and the
+    combination of post-storm and human-modified time series
+    """
+    models = [barrier(20, 0), barrier(20, 1), barrier(12, 2)]
+    statistics = barrier_statistics(models[0], 20)
+
+    crest = np.maximum(models[0].DuneDomain.max(axis=2), models[0].DuneRestart)
+    assert np.allclose(statistics["DuneCrestMax"], (crest.max(axis=1) + 0.19) * 10)
+    assert np.allclose(statistics["sc_rate"], np.append(0, np.full(19, 2.0)))
+    assert statistics["bw_rate"][0] == 0
+
+    batch = barrier_statistics(models, 20)
+    for name, values in statistics.items():
+        assert batch[name].shape == (3, 20)
+        assert np.array_equal(batch[name][0], values)
+    assert np.all(np.isnan(batch["BarrierWidth"][2, 12:]))
+
+    post_storm_height = [None] + list(np.full(19, 0.05))
+    statistics = human_dynamics_statistics(
+        models[0], 10, 20, post_storm_ave_interior_height=post_storm_height
+    )
+    combined = statistics["combined_BarrierHeight"]
+    assert len(combined) == 39
+    assert np.array_equal(combined[::2], statistics["BarrierHeight"])
+    assert np.allclose(combined[1:18:2], 0.5)
+    assert np.all(np.isnan(combined[19::2]))
+    assert post_storm_height[0] is None  # the input is not modified
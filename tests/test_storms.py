@@ -0,0 +1,98 @@
+import random
+
+import numpy as np
+from barrier3d.tools.input_files import yearly_storms
+
+from cascade.storms import generate_storm_library, storm_events
+
+MODEL_YEARS = 2000
+
+
+def synthetic_storm_list(n_storms=500):
+    """storm list with the columns used by the storm generators (duration, Rhigh, period, Rlow; see `cascade.storms`)"""
+    rng = np.random.default_rng(0)
+    storm_list = np.zeros((n_storms, 7))
+    storm_list[:, 1] = rng.integers(4, 100, size=n_storms)  # duration [hr]
+    storm_list[:, 2] = rng.uniform(1.0, 4.0, size=n_storms)  # Rhigh [m NAVD88]
+    storm_list[:, 4] = rng.uniform(4.0, 14.0, size=n_storms)  # period [s]
+    storm_list[:, 6] = storm_list[:, 2] - rng.uniform(0.5, 1.5, size=n_storms)  # Rlow
+
+    return storm_list
+
+
+def test_members_reproducible(tmp_path):
+    """
+    check that a member's storm series only depends on the seed and its index: not on the call, nor on the number of
+    members generated alongside it
+    """
+    storm_list = synthetic_storm_list()
+    libraries = [
+        generate_storm_library(
+            tmp_path / name,
+            storm_list,
+            n_members,
+            model_years=100,
+            seed=2021,
+            members_per_block=2,
+        )
+        for name, n_members in (("a", 3), ("b", 3), ("c", 7))
+    ]
+
+    for member in range(3):
+        for library in libraries[1:]:
+            assert np.array_equal(library[member], libraries[0][member])
+    assert not np.array_equal(libraries[2][3], libraries[2][4])
+
+    other_seed = generate_storm_library(
+        tmp_path / "d", storm_list, 3, model_years=100, seed=2022
+    )
+    assert not np.array_equal(other_seed[0], libraries[0][0])
+
+
+def test_statistics_match_barrier3d(tmp_path):
+    """
+    check that the generated storm series have the format and statistics of Barrier3D's `yearly_storms` for the same
+    parameters: zero padding until StormStart, storms of the storm list ordered by year, and the same distribution of
+    the number of storms per year and of the storm variables
+    """
+    storm_list = synthetic_storm_list()
+    np.save(tmp_path / "storm-list.npy", storm_list)
+    parameters = dict(
+        mean_yearly_storms=8.3,
+        SD_yearly_storms=5.9,
+        MHW=0.46,
+        StormStart=2,
+        model_years=MODEL_YEARS,
+    )
+
+    np.random.seed(2021)
+    random.seed(2021)
+    expected = yearly_storms(
+        datadir=tmp_path, storm_list_name="storm-list.npy", bPlot=False, **parameters
+    )
+    storms = generate_storm_library(
+        tmp_path / "library", storm_list, 1, seed=2021, **parameters
+    )[0]
+
+    # every storm is one of the storms of the list (except for the first row, which is never selected)
+    events = storm_events(storm_list, np.arange(1, len(storm_list)), MHW=0.46)
+    for series in (expected, storms):
+        assert np.all(series[:2] == 0)
+        assert np.all(np.diff(series[2:, 0]) >= 0)
+        assert series[2, 0] >= 2 and series[-1, 0] < MODEL_YEARS
+        matches = np.isclose(series[2:, None, 1:], events[None, :, :]).all(axis=2)
+        assert np.all(matches.any(axis=1))
+
+    counts = [
+        np.bincount(series[2:, 0].astype(int), minlength=MODEL_YEARS)[2:]
+        for series in (expected, storms)
+    ]
+    assert abs(counts[1].mean() - counts[0].mean()) < 0.5
+    assert abs(counts[1].std() - counts[0].std()) < 0.5
+    assert np.mean(counts[1] == 0) > 0.05  # negative counts are set to zero
+
+    for column in range(1, 5):
+        spread = expected[2:, column].std()
+        assert (
+            abs(storms[2:, column].mean() - expected[2:, column].mean()) < 0.05 * spread
+        )